@@ -20,6 +20,7 @@ from oslo_log import log
 from paste import deploy
 
 from dci.api import config
+from dci.api import expose
 from dci.api import hooks
 from dci.api import middleware
 import dci.conf
@@ -40,11 +41,21 @@ def setup_app(pecan_config=None, extra_hooks=None):
         pecan_config = get_pecan_config()
 
     app_hooks = [hooks.ConfigHook(),
-                 hooks.PublicUrlHook()]
+                 hooks.PublicUrlHook(),
+                 hooks.DBReadRoutingHook(),
+                 hooks.MetricsHook(),
+                 hooks.TracingHook()]
     if extra_hooks:
         app_hooks.extend(extra_hooks)
 
     app_conf = dict(pecan_config.app)
+    if CONF.api.fast_json_renderer:
+        # NOTE: The controllers exposed with WSME render their results
+        # with the wsmejson renderer, replaced here.
+        renderers = dict(app_conf.get('custom_renderers', {}))
+        renderers['wsmejson'] = expose.JSONRenderer
+        app_conf['custom_renderers'] = renderers
+
     app = pecan.make_app(
         app_conf.pop('root'),
         force_canonical=getattr(pecan_config.app, 'force_canonical', True),
@@ -53,6 +64,12 @@ def setup_app(pecan_config=None, extra_hooks=None):
         **app_conf
     )
 
+    if CONF.compression.enabled:
+        app = middleware.CompressionMiddleware(app)
+
+    if CONF.profiler.enabled:
+        app = middleware.ProfilerMiddleware(app)
+
     return app
 
 
@@ -0,0 +1,156 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Request and result types shared by the bulk operations of the API."""
+
+from http import HTTPStatus
+
+from oslo_log import log
+from wsme import types as wtypes
+
+from dci.api.controllers import base
+from dci.api.controllers import types
+from dci.common import constants
+from dci.common import exception
+from dci.common.i18n import _LE
+from dci.common import utils
+from dci.conf import CONF
+
+
+LOG = log.getLogger(__name__)
+
+
+class BulkDeleteRequest(base.APIBase):
+    """API representation of a bulk delete request."""
+
+    uuids = [types.uuid]
+    """The UUIDs of the resources to delete."""
+
+
+class BulkItemResult(base.APIBase):
+    """API representation of the result of one item of a bulk request."""
+
+    index = int
+    """The position of the item in the request."""
+
+    uuid = wtypes.text
+    """The UUID of the resource."""
+
+    status_code = int
+    """The HTTP status code the item would get from the single API."""
+
+    error_message = wtypes.text
+    """The reason why the item failed."""
+
+    @classmethod
+    def from_error(cls, index, err, uuid=wtypes.Unset):
+        status_code = getattr(err, 'code', HTTPStatus.INTERNAL_SERVER_ERROR)
+        return cls(index=index, uuid=uuid, status_code=int(status_code),
+                   error_message=str(err))
+
+
+class BulkStageResult(base.APIBase):
+    """API representation of the progress of one stage of a bulk request."""
+
+    stage = wtypes.text
+    """The name of the stage, e.g. delete_virtual_networks."""
+
+    done = int
+    """The number of work items the stage processed."""
+
+    failed = int
+    """The number of work items which failed, among the processed ones."""
+
+    total = int
+    """The number of work items of the stage."""
+
+    @classmethod
+    def from_progress(cls, progress):
+        """Build the stage results from the ``{stage: [done, failed,
+        total]}`` progress of a bulk manager.
+        """
+        return [cls(stage=stage, done=done, failed=failed, total=total)
+                for stage, (done, failed, total) in progress.items()]
+
+
+class BulkResult(base.APIBase):
+    """API representation of the per-item results of a bulk request."""
+
+    results = [BulkItemResult]
+    """A list containing one result per requested item."""
+
+    stages = [BulkStageResult]
+    """The progress of every stage of the work, for the bulk requests
+    processed in stages, e.g. a slicing bulk delete.
+    """
+
+
+def bulk_create(context, obj_class, items, check):
+    """Check the items concurrently, then create them in one transaction.
+
+    :param obj_class: the versioned object class of the items.
+    :param items: a list of request bodies as dicts.
+    :param check: callable validating one item, e.g. a reachability check,
+                  items for which it raises are not created.
+    """
+    checks = utils.concurrent_map(check, items, CONF.api.bulk_max_workers)
+
+    results = [None] * len(items)
+    indexes = []
+    obj_list = []
+    for index, (item, (_result, err)) in enumerate(zip(items, checks)):
+        if err is not None:
+            LOG.error(_LE("Bulk create of %(obj)s item %(index)s failed, "
+                          "details %(err)s"),
+                      {'obj': obj_class.obj_name(), 'index': index,
+                       'err': err})
+            results[index] = BulkItemResult.from_error(index, err)
+            continue
+
+        item['state'] = constants.ACTIVE
+        indexes.append(index)
+        obj_list.append(obj_class(context, **item))
+
+    if obj_list:
+        try:
+            obj_class.bulk_create(context, obj_list)
+        except Exception as err:
+            LOG.error(_LE("Bulk create of %(obj)s failed, details %(err)s"),
+                      {'obj': obj_class.obj_name(), 'err': err})
+            for index in indexes:
+                results[index] = BulkItemResult.from_error(index, err)
+        else:
+            for index, obj in zip(indexes, obj_list):
+                results[index] = BulkItemResult(
+                    index=index, uuid=obj.uuid,
+                    status_code=int(HTTPStatus.CREATED))
+
+    return BulkResult(results=results)
+
+
+def bulk_delete(context, obj_class, uuids):
+    """Delete the resources in one transaction."""
+    deleted_uuids = set(obj_class.bulk_destroy(context, uuids))
+
+    results = []
+    for index, uuid in enumerate(uuids):
+        if uuid in deleted_uuids:
+            results.append(BulkItemResult(
+                index=index, uuid=uuid,
+                status_code=int(HTTPStatus.NO_CONTENT)))
+        else:
+            err = exception.ResourceNotFound(resource=obj_class.obj_name(),
+                                             msg='with uuid=%s' % uuid)
+            results.append(BulkItemResult.from_error(index, err, uuid=uuid))
+    return BulkResult(results=results)
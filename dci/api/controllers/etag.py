@@ -0,0 +1,75 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Entity tags and conditional GET support for the API resources."""
+
+from http import HTTPStatus
+import hashlib
+import json
+
+import pecan
+import wsme
+
+from dci.common import cache
+
+
+def generate_etag(resources):
+    """Return an entity tag built from the canonical JSON of the resources.
+
+    The whole serialised resources are hashed, so that the tag also changes
+    with their nested resources, e.g. the WAN nodes of a site, whose updates
+    leave the ``updated_at`` of the parent resource unchanged.
+
+    :param resources: a list of serialised resources.
+    """
+    body = json.dumps(resources, sort_keys=True, separators=(',', ':'),
+                      default=str)
+    return hashlib.sha1(body.encode('utf-8')).hexdigest()
+
+
+def get_resource(obj_name, key, loader):
+    """Return the entity tag and the serialised resource for a GET request.
+
+    The serialised resource is taken from the response cache, or built by
+    calling ``loader`` and cached when missing. The ``ETag`` response header
+    is set in both cases.
+
+    :param obj_name: name of the versioned object the resource is built of.
+    :param key: cache key of the resource, a UUID or the collection filters.
+    :param loader: callable returning a dict, or a list of dicts for a
+                   collection.
+    """
+    response_cache = cache.get_response_cache()
+    entry = response_cache.get(obj_name, key)
+    if entry is None:
+        resource = loader()
+        entry = (generate_etag(resource if isinstance(resource, list)
+                               else [resource]),
+                 resource)
+        response_cache.set(obj_name, key, entry)
+
+    resource_etag, resource = entry
+    pecan.response.etag = resource_etag
+    return resource_etag, resource
+
+
+def is_not_modified(resource_etag):
+    """Whether the request If-None-Match header matches the entity tag."""
+    return resource_etag in pecan.request.if_none_match
+
+
+def not_modified():
+    """Return an empty ``304 Not Modified`` response."""
+    return wsme.api.Response(None, status_code=HTTPStatus.NOT_MODIFIED,
+                             return_type=None)
@@ -0,0 +1,199 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Idempotency-Key support for the create requests.
+
+A client retrying a create request after a timeout or a dropped connection
+cannot tell whether the first attempt created the resource. When both
+attempts carry the same ``Idempotency-Key`` header, the key is recorded in
+the database by the first one, and the retry gets the resource it created,
+or waits for it while it is still running, instead of creating another.
+"""
+
+import datetime
+import hashlib
+import json
+
+from oslo_log import log
+from oslo_utils import timeutils
+
+from dci.common import exception
+from dci.common import executor
+from dci.common.i18n import _LI
+from dci.conf import CONF
+from dci.db import api as dbapi
+
+
+LOG = log.getLogger(__name__)
+
+HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+
+IN_PROGRESS = 'in_progress'
+COMPLETED = 'completed'
+FAILED = 'failed'
+
+_MAX_KEY_LENGTH = 255
+_POLL_INTERVAL = 0.5
+
+
+def _expiry(seconds):
+    return timeutils.utcnow() + datetime.timedelta(seconds=seconds)
+
+
+def get_key(headers):
+    """Return the Idempotency-Key of a request, or None."""
+    key = headers.get(HEADER)
+    if not key:
+        return None
+    if len(key) > _MAX_KEY_LENGTH:
+        raise exception.InvalidParameterValue(
+            err="%s must be at most %d characters long." % (
+                HEADER, _MAX_KEY_LENGTH))
+    return key
+
+
+def request_hash(req_body):
+    """Return the fingerprint of a request body."""
+    body = json.dumps(req_body, sort_keys=True, default=str)
+    return hashlib.sha256(body.encode('utf-8')).hexdigest()
+
+
+def completion(route):
+    """Return the update completing the Idempotency-Key of a resource of
+    ``route``, to make in the transaction creating the resource.
+    """
+    return route, {'state': COMPLETED,
+                   'expires_at': _expiry(CONF.api.idempotency_key_ttl)}
+
+
+def renew_lease(context, route, resource_uuid):
+    """Extend the lease of the Idempotency-Key creating a resource, so that
+    the retries wait for the process creating it instead of taking over.
+
+    :returns: whether the resource is created on behalf of a key which was
+              not taken over by a retry.
+    """
+    return dbapi.get_instance().idempotency_key_update_by_resource(
+        context, route, resource_uuid,
+        {'expires_at': _expiry(CONF.api.idempotency_lease_timeout)})
+
+
+def fail_resource(context, route, resource_uuid, err):
+    """Release the Idempotency-Key of a resource which was not created.
+
+    The key is left as it is once completed.
+    """
+    return dbapi.get_instance().idempotency_key_update_by_resource(
+        context, route, resource_uuid,
+        {'state': FAILED, 'error': str(err),
+         'expires_at': _expiry(CONF.api.idempotency_key_ttl)},
+        expected={'state': IN_PROGRESS})
+
+
+class IdempotentRequest(object):
+    """A create request carrying an Idempotency-Key.
+
+    :param route: the name of the create route, keys are scoped by route.
+    :param req_hash: the fingerprint of the request body, a key reused with
+                     another body is rejected.
+    """
+
+    def __init__(self, context, key, route, req_hash):
+        self.context = context
+        self.key = key
+        self.route = route
+        self.req_hash = req_hash
+        self.resource_uuid = None
+        self.dbapi = dbapi.get_instance()
+
+    def _take_over(self, record, resource_uuid):
+        LOG.info(_LI("Taking over Idempotency-Key %(key)s of %(route)s in "
+                     "state %(state)s"),
+                 {'key': self.key, 'route': self.route,
+                  'state': record.state})
+        # NOTE: Only one of the concurrent retries wins the update.
+        return self.dbapi.idempotency_key_update(
+            self.context, self.key, self.route,
+            {'state': IN_PROGRESS, 'resource_uuid': resource_uuid,
+             'error': None,
+             'expires_at': _expiry(CONF.api.idempotency_lease_timeout)},
+            expected={'state': record.state,
+                      'expires_at': record.expires_at})
+
+    def begin(self, resource_uuid):
+        """Record the key before the resource is created.
+
+        :param resource_uuid: the UUID of the resource to create.
+        :returns: None when the request should create the resource, or the
+                  UUID of the resource created by an earlier request with
+                  the same key.
+        :raises: IdempotencyKeyMismatch if the key was used with another
+                 request body, IdempotencyKeyInProgress if the earlier
+                 request is still running after
+                 ``[api] idempotency_wait_timeout`` seconds.
+        """
+        self.dbapi.idempotency_key_purge(self.context, timeutils.utcnow())
+        self.resource_uuid = resource_uuid
+        give_up_at = _expiry(CONF.api.idempotency_wait_timeout)
+        while True:
+            try:
+                self.dbapi.idempotency_key_create(self.context, {
+                    'idempotency_key': self.key,
+                    'route': self.route,
+                    'request_hash': self.req_hash,
+                    'state': IN_PROGRESS,
+                    'resource_uuid': resource_uuid,
+                    'expires_at': _expiry(
+                        CONF.api.idempotency_lease_timeout),
+                })
+                return None
+            except exception.IdempotencyKeyExists:
+                pass
+
+            record = self.dbapi.idempotency_key_get(self.context, self.key,
+                                                    self.route)
+            if record is None:
+                # NOTE: Purged in between, record it again.
+                continue
+            if record.request_hash != self.req_hash:
+                raise exception.IdempotencyKeyMismatch(key=self.key)
+            if record.state == COMPLETED:
+                return record.resource_uuid
+            if record.state == FAILED or (
+                    record.expires_at <= timeutils.utcnow()):
+                if self._take_over(record, resource_uuid):
+                    return None
+                continue
+            if timeutils.utcnow() >= give_up_at:
+                raise exception.IdempotencyKeyInProgress(key=self.key)
+            executor.sleep(_POLL_INTERVAL)
+
+    def completion(self):
+        """Return the update keeping the outcome of the request for the
+        retries, made in the transaction creating the resource.
+        """
+        return completion(self.route)
+
+    def fail(self, err):
+        """Release the key, so that a retry creates the resource.
+
+        The key is left as it is once completed, or taken over by a retry.
+        """
+        self.dbapi.idempotency_key_update(
+            self.context, self.key, self.route,
+            {'state': FAILED, 'error': str(err),
+             'expires_at': _expiry(CONF.api.idempotency_key_ttl)},
+            expected={'state': IN_PROGRESS,
+                      'resource_uuid': self.resource_uuid})
@@ -19,6 +19,8 @@ from wsme import types as wtypes
 from dci.api.controllers import base
 from dci.api.controllers import v1
 from dci.api import expose
+from dci.common import metrics
+from dci.conf import CONF
 
 
 class Root(base.APIBase):
@@ -43,12 +45,24 @@ class RootController(rest.RestController):
     _default_version = base.API_V1
     """The default API version"""
 
+    _custom_actions = {
+        'metrics': ['GET'],
+    }
+
     v1 = v1.Controller()
 
     @expose.expose(Root)
     def get(self):
         return Root.convert()
 
+    @pecan.expose(content_type='text/plain')
+    def metrics(self):
+        """Return the metrics of all the API workers for Prometheus."""
+        if not CONF.metrics.enabled:
+            pecan.abort(404)
+        pecan.response.content_type = 'text/plain; version=0.0.4'
+        return metrics.collect()
+
     @pecan.expose()
     def _route(self, args, request=None):
         """Overrides the default routing behavior.
@@ -57,6 +71,7 @@ class RootController(rest.RestController):
         API, if the version number is not specified in the url.
         """
 
-        if args[0] and args[0] not in self._versions:
+        if (args[0] and args[0] not in self._versions and
+                args[0] not in self._custom_actions):
             args = [self._default_version] + args
         return super(RootController, self)._route(args)
@@ -13,21 +13,29 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import datetime
 from http import HTTPStatus
 import pecan
 import wsme
 from wsme import types as wtypes
 
 from oslo_log import log
+from oslo_utils import importutils
+from oslo_utils import uuidutils
 
 from dci.api.controllers import base
+from dci.api.controllers import bulk
+from dci.api.controllers import etag
+from dci.api.controllers import idempotency
 from dci.api.controllers import link
 from dci.api.controllers import types
 from dci.api import expose
 from dci.common import constants
+from dci.common import deadline
 from dci.common import exception
+from dci.common.i18n import _LE
 from dci.common.i18n import _LI
-from dci import manager
+from dci.common import subnet_index
 from dci import objects
 
 
@@ -35,6 +43,14 @@ LOG = log.getLogger(__name__)
 
 NAME_PREFIX = 'dcictl-EVPNVPLSoSRv6BESlicing-'
 
+ROUTE = 'evpn_vpls_over_srv6_be_slicings'
+
+
+def _get_manager():
+    # NOTE: dci.manager pulls in taskflow and the driver stacks, import it
+    # on the first slicing operation rather than at the worker start.
+    return importutils.import_module('dci.manager')
+
 
 class EVPNVPLSoSRv6BESlicing(base.APIBase):
     """API representation of a EVPN VPLS over SRv6 BE network slicing.
@@ -78,9 +94,8 @@ class EVPNVPLSoSRv6BESlicing(base.APIBase):
             setattr(self, field, kwargs.get(field, wtypes.Unset))
 
     @classmethod
-    def convert_with_links(cls, obj_slicing):
-        api_evpn_vpls_over_srv6_be_slicing = \
-            cls(**obj_slicing.as_dict())
+    def convert_with_links(cls, slicing):
+        api_evpn_vpls_over_srv6_be_slicing = cls(**slicing)
         api_evpn_vpls_over_srv6_be_slicing.links = [
             link.Link.make_link('self', pecan.request.public_url,
                                 'evpn_vpls_over_srv6_be_slicings',
@@ -106,10 +121,131 @@ class EVPNVPLSoSRv6BESlicingCollection(base.APIBase):
         return collection
 
 
+class SlicingStageTiming(base.APIBase):
+    """API representation of the timing of one stage of a slicing flow."""
+
+    stage = wtypes.text
+    """The name of the flow task."""
+
+    state = wtypes.text
+    """The last state of the task, e.g. SUCCESS, FAILURE or REVERTED."""
+
+    site_uuid = wtypes.text
+    """UUID of the site the task works on."""
+
+    wan_node_uuid = wtypes.text
+    """UUID of the WAN node the task works on."""
+
+    started_at = datetime.datetime
+    """When the task (last) started."""
+
+    ended_at = datetime.datetime
+    """When the task ended."""
+
+    revert_started_at = datetime.datetime
+    """When the revert of the task started."""
+
+    revert_ended_at = datetime.datetime
+    """When the revert of the task ended."""
+
+    retries = int
+    """How many times the task was retried."""
+
+    reverts = int
+    """How many times the task was reverted."""
+
+    duration = float
+    """Seconds the task ran for."""
+
+    revert_duration = float
+    """Seconds the revert of the task ran for."""
+
+    @classmethod
+    def convert(cls, obj_timing):
+        api_timing = cls(**{field: obj_timing[field] for field in (
+            'stage', 'state', 'site_uuid', 'wan_node_uuid', 'started_at',
+            'ended_at', 'revert_started_at', 'revert_ended_at', 'retries',
+            'reverts')})
+        if obj_timing.ended_at:
+            api_timing.duration = (
+                obj_timing.ended_at - obj_timing.started_at).total_seconds()
+        if obj_timing.revert_started_at and obj_timing.revert_ended_at:
+            api_timing.revert_duration = (
+                obj_timing.revert_ended_at -
+                obj_timing.revert_started_at).total_seconds()
+        return api_timing
+
+
+class SlicingStageTimingCollection(base.APIBase):
+    """API representation of the stage timings of a slicing."""
+
+    stage_timings = [SlicingStageTiming]
+    """A list containing the stage timings of every flow run."""
+
+
+class SlicingStageTimingController(base.DCIController):
+    """REST controller for the stage timings of a network slicing."""
+
+    @expose.expose(SlicingStageTimingCollection, types.uuid,
+                   status_code=HTTPStatus.OK)
+    def get_all(self, slicing_uuid):
+        """Retrieve the stage timings of the flow runs of a slicing.
+
+        The timings of a failed creation are kept, so they can be read
+        even though the slicing does not exist.
+
+        :param slicing_uuid: uuid of a EVPN VPLS over SRv6 BE network
+                             slicing.
+        """
+        context = pecan.request.context
+        obj_timings = objects.SlicingStageTiming.list(context, slicing_uuid)
+        return SlicingStageTimingCollection(stage_timings=[
+            SlicingStageTiming.convert(obj_timing)
+            for obj_timing in obj_timings])
+
+
+class EVPNVPLSoSRv6BESlicingBulkDeleteRequest(bulk.BulkDeleteRequest):
+    """API representation of a bulk teardown of network slicings.
+
+    The slicings are selected by UUID, or by the sites they connect and
+    their state.
+    """
+
+    site_uuid = types.uuid
+    """Tear down every slicing connecting this site."""
+
+    east_site_uuid = types.uuid
+    """Tear down every slicing with this east site."""
+
+    west_site_uuid = types.uuid
+    """Tear down every slicing with this west site."""
+
+    state = wtypes.text
+    """Only tear down the slicings in this state."""
+
+
 class EVPNVPLSoSRv6BESlicingController(base.DCIController):
     """REST controller for EVPN VPLS over SRv6 BE network slicing Controller.
     """
 
+    _custom_actions = {
+        'bulk_delete': ['POST'],
+    }
+
+    stage_timings = SlicingStageTimingController()
+
+    @staticmethod
+    def _record_stage_timings(context, slicing_uuid, stage_timings):
+        if not stage_timings:
+            return
+        try:
+            objects.SlicingStageTiming.bulk_create(context, slicing_uuid,
+                                                   stage_timings)
+        except Exception as err:
+            LOG.error(_LE("Failed to record the stage timings of slicing "
+                          "%(uuid)s, details %(err)s"),
+                      {'uuid': slicing_uuid, 'err': err})
+
     @expose.expose(EVPNVPLSoSRv6BESlicing, wtypes.text,
                    status_code=HTTPStatus.OK)
     def get_one(self, uuid):
@@ -119,8 +255,12 @@ class EVPNVPLSoSRv6BESlicingController(base.DCIController):
         """
         LOG.info(_LI("[evpn_vpls_over_srv6_be_slicings: get_one] UUID = %s"), uuid)  # noqa
         context = pecan.request.context
-        obj_slicing = objects.EVPNVPLSoSRv6BESlicing.get(context, uuid)  # noqa
-        return EVPNVPLSoSRv6BESlicing.convert_with_links(obj_slicing)  # noqa
+        slicing_etag, slicing = etag.get_resource(
+            objects.EVPNVPLSoSRv6BESlicing.obj_name(), uuid,
+            lambda: objects.EVPNVPLSoSRv6BESlicing.get(context, uuid).as_dict())  # noqa
+        if etag.is_not_modified(slicing_etag):
+            return etag.not_modified()
+        return EVPNVPLSoSRv6BESlicing.convert_with_links(slicing)
 
     @expose.expose(EVPNVPLSoSRv6BESlicingCollection, wtypes.text,
                    wtypes.text, wtypes.text, status_code=HTTPStatus.OK)
@@ -138,9 +278,15 @@ class EVPNVPLSoSRv6BESlicingController(base.DCIController):
                      "filters = %s"), filters_dict)
 
         context = pecan.request.context
-        obj_slicings = \
-            objects.EVPNVPLSoSRv6BESlicing.list(context, filters=filters_dict)
-        return EVPNVPLSoSRv6BESlicingCollection.convert_with_links(obj_slicings)  # noqa
+        slicings_etag, slicings = etag.get_resource(
+            objects.EVPNVPLSoSRv6BESlicing.obj_name(),
+            tuple(sorted(filters_dict.items())),
+            lambda: [obj_slicing.as_dict() for obj_slicing in
+                     objects.EVPNVPLSoSRv6BESlicing.list(
+                         context, filters=filters_dict)])
+        if etag.is_not_modified(slicings_etag):
+            return etag.not_modified()
+        return EVPNVPLSoSRv6BESlicingCollection.convert_with_links(slicings)
 
     @expose.expose(EVPNVPLSoSRv6BESlicing, wtypes.text, body=types.jsontype,
                    status_code=HTTPStatus.ACCEPTED)
@@ -155,12 +301,41 @@ class EVPNVPLSoSRv6BESlicingController(base.DCIController):
                    status_code=HTTPStatus.CREATED)
     def post(self, req_body):
         """Create one EVPN VPLS over SRv6 BE network slicing.
+
+        A request retried with the same Idempotency-Key header gets the
+        slicing created by the first one.
         """
         req_body = req_body.as_dict()
         LOG.info(_LI("[evpn_vpls_over_srv6_be_slicings: port] Request "
                      "body = %s"), req_body)
         context = pecan.request.context
 
+        slicing_uuid = uuidutils.generate_uuid()
+        key = idempotency.get_key(pecan.request.headers)
+        if key is None:
+            return self._create(context, req_body, slicing_uuid)
+
+        request = idempotency.IdempotentRequest(
+            context, key, ROUTE, idempotency.request_hash(req_body))
+        created_uuid = request.begin(slicing_uuid)
+        if created_uuid is not None:
+            LOG.info(_LI("[evpn_vpls_over_srv6_be_slicings: post] "
+                         "Idempotency-Key %(key)s replayed, UUID = "
+                         "%(uuid)s"), {'key': key, 'uuid': created_uuid})
+            pecan.response.headers[idempotency.REPLAYED_HEADER] = 'true'
+            obj_slicing = objects.EVPNVPLSoSRv6BESlicing.get(context,
+                                                             created_uuid)
+            return EVPNVPLSoSRv6BESlicing.convert_with_links(
+                obj_slicing.as_dict())
+
+        try:
+            return self._create(context, req_body, slicing_uuid,
+                                request=request)
+        except Exception as err:
+            request.fail(err)
+            raise
+
+    def _create(self, context, req_body, slicing_uuid, request=None):
         try:
             obj_east_site = objects.Site.get(
                 context, uuid=req_body.get('east_site_uuid'))
@@ -175,45 +350,59 @@ class EVPNVPLSoSRv6BESlicingController(base.DCIController):
         if not obj_east_site.wan_nodes[0] or not obj_west_site.wan_nodes[0]:
             raise
 
-        ns_mgr = manager.NetworkSlicingManager(
-            obj_east_site, obj_west_site,
-            slicing_name=req_body.get('name'),
-            slicing_type=constants.L2VPN_SLICING)
-
-        flow_store = ns_mgr.execute_create_evpn_vpls_over_srv6_be_slicing_flow(
-            req_body.get('subnet_cidr'),
-            req_body.get('east_dcn_vn_subnet_allocation_pool'),
-            req_body.get('west_dcn_vn_subnet_allocation_pool'))
-
-        req_body['east_dcn_vn_uuid'] = flow_store['east_dcn_vn_uuid']
-        req_body['east_dcn_vn_vni'] = flow_store['east_dcn_vn_vni']
-        req_body['east_dcn_vn_route_target'] = flow_store['east_vn_rt']
-        req_body['east_access_vpn_vni'] = flow_store['east_access_vpn_vni']
-        req_body['east_access_vpn_route_target'] = flow_store['east_access_vpn_rt']  # noqa
-        req_body['east_access_vpn_route_distinguisher'] = flow_store['east_access_vpn_rd']  # noqa
-        req_body['east_wan_vpn_route_target'] = flow_store['east_wan_vpn_rt']
-        req_body['east_wan_vpn_route_distinguisher'] = flow_store['east_wan_vpn_rd']  # noqa
-        req_body['east_access_vpn_bridge_domain'] = flow_store['east_access_vpn_bd']  # noqa
-        req_body['east_wan_vpn_bridge_domain'] = flow_store['east_wan_vpn_bd']
-        req_body['east_splicing_vlan_id'] = flow_store['splicing_vlan_id']
-
-        req_body['west_dcn_vn_uuid'] = flow_store['west_dcn_vn_uuid']
-        req_body['west_dcn_vn_vni'] = flow_store['west_dcn_vn_vni']
-        req_body['west_dcn_vn_route_target'] = flow_store['west_vn_rt']
-        req_body['west_access_vpn_vni'] = flow_store['west_access_vpn_vni']
-        req_body['west_access_vpn_route_target'] = flow_store['west_access_vpn_rt']  # noqa
-        req_body['west_access_vpn_route_distinguisher'] = flow_store['west_access_vpn_rd']  # noqa
-        req_body['west_wan_vpn_route_target'] = flow_store['west_wan_vpn_rt']
-        req_body['west_wan_vpn_route_distinguisher'] = flow_store['west_wan_vpn_rd']  # noqa
-        req_body['west_access_vpn_bridge_domain'] = flow_store['west_access_vpn_bd']  # noqa
-        req_body['west_wan_vpn_bridge_domain'] = flow_store['west_wan_vpn_bd']
-        req_body['west_splicing_vlan_id'] = flow_store['splicing_vlan_id']
+        # Reject overlapping subnets before touching TF and the devices.
+        req_body['uuid'] = slicing_uuid
+        LOG.info(_LI("[evpn_vpls_over_srv6_be_slicings: post] UUID = %s"),
+                 req_body['uuid'])
+        index = subnet_index.get_subnet_index()
+        index.load(lambda: objects.EVPNVPLSoSRv6BESlicing.list(context))
+        index.reserve(req_body['uuid'],
+                      req_body.get('subnet_cidr'),
+                      obj_east_site.uuid,
+                      req_body.get('east_dcn_vn_subnet_allocation_pool'),
+                      obj_west_site.uuid,
+                      req_body.get('west_dcn_vn_subnet_allocation_pool'))
+
+        try:
+            ns_mgr = _get_manager().NetworkSlicingManager(
+                obj_east_site, obj_west_site,
+                slicing_name=req_body.get('name'),
+                slicing_type=constants.L2VPN_SLICING,
+                timeout=deadline.from_headers(pecan.request.headers))
+        except Exception:
+            index.release(req_body['uuid'])
+            raise
+
+        try:
+            flow_store = ns_mgr.execute_create_evpn_vpls_over_srv6_be_slicing_flow(  # noqa
+                req_body.get('subnet_cidr'),
+                req_body.get('east_dcn_vn_subnet_allocation_pool'),
+                req_body.get('west_dcn_vn_subnet_allocation_pool'),
+                slicing=dict(req_body),
+                idempotency_route=request and request.route)
+        except Exception:
+            index.release(req_body['uuid'])
+            raise
+        finally:
+            self._record_stage_timings(context, req_body['uuid'],
+                                       ns_mgr.stage_timings)
+
+        req_body.update(_get_manager().get_slicing_values(flow_store))
 
         req_body['state'] = constants.ACTIVE
 
         obj_slicing = objects.EVPNVPLSoSRv6BESlicing(context, **req_body)  # noqa
-        obj_slicing.create(context)
-        return EVPNVPLSoSRv6BESlicing.convert_with_links(obj_slicing)  # noqa
+        try:
+            # NOTE: The Idempotency-Key is completed along with the slicing,
+            # a retry never sees a created slicing with an unfinished key.
+            obj_slicing.create(
+                context, idempotency=request and request.completion())
+        except Exception:
+            index.release(req_body['uuid'])
+            raise
+        finally:
+            ns_mgr.release_flow()
+        return EVPNVPLSoSRv6BESlicing.convert_with_links(obj_slicing.as_dict())  # noqa
 
     @expose.expose(None, wtypes.text, status_code=HTTPStatus.NO_CONTENT)
     def delete(self, uuid):
@@ -236,10 +425,11 @@ class EVPNVPLSoSRv6BESlicingController(base.DCIController):
         except Exception as err:
             raise err
 
-        ns_mgr = manager.NetworkSlicingManager(
+        ns_mgr = _get_manager().NetworkSlicingManager(
             obj_east_site,
             obj_west_site,
-            obj_slicing.name)
+            obj_slicing.name,
+            timeout=deadline.from_headers(pecan.request.headers))
 
         ns_mgr.execute_delete_evpn_vpls_over_srv6_be_slicing_flow(
             obj_slicing.east_wan_vpn_bridge_domain,
@@ -250,3 +440,103 @@ class EVPNVPLSoSRv6BESlicingController(base.DCIController):
             obj_slicing.west_access_vpn_vni)
 
         obj_slicing.destroy(context)
+
+    def _select_slicings(self, context, req_body):
+        """Return the selected slicings and the requested missing UUIDs."""
+        if req_body.get('uuids'):
+            obj_slicings = []
+            missing_uuids = []
+            for uuid in req_body['uuids']:
+                try:
+                    obj_slicings.append(
+                        objects.EVPNVPLSoSRv6BESlicing.get(context, uuid))
+                except exception.ResourceNotFound:
+                    missing_uuids.append(uuid)
+            return obj_slicings, missing_uuids
+
+        filters_dict = {}
+        for key in ('state', 'east_site_uuid', 'west_site_uuid'):
+            if req_body.get(key):
+                filters_dict[key] = req_body[key]
+
+        site_uuid = req_body.get('site_uuid')
+        if not site_uuid:
+            if not filters_dict:
+                raise exception.InvalidParameterValue(
+                    err="One of uuids, site_uuid, east_site_uuid or "
+                        "west_site_uuid is required.")
+            return objects.EVPNVPLSoSRv6BESlicing.list(
+                context, filters=filters_dict), []
+
+        # NOTE: A site is either the east or the west end of a slicing.
+        obj_slicings = {}
+        for side in ('east_site_uuid', 'west_site_uuid'):
+            side_filters = dict(filters_dict, **{side: site_uuid})
+            for obj_slicing in objects.EVPNVPLSoSRv6BESlicing.list(
+                    context, filters=side_filters):
+                obj_slicings[obj_slicing.uuid] = obj_slicing
+        return list(obj_slicings.values()), []
+
+    @expose.expose(bulk.BulkResult,
+                   body=EVPNVPLSoSRv6BESlicingBulkDeleteRequest,
+                   status_code=HTTPStatus.OK)
+    def bulk_delete(self, req_body):
+        """Tear down many EVPN VPLS over SRv6 BE network slicings.
+
+        Every Tungsten Fabric cluster and WAN node is connected to once,
+        the virtual networks are deleted in parallel and each WAN node gets
+        a single delete commit for all the slicings it carries.
+        """
+        req_body = {key: getattr(req_body, key)
+                    for key in ('uuids', 'site_uuid', 'east_site_uuid',
+                                'west_site_uuid', 'state')
+                    if getattr(req_body, key) not in (None, wtypes.Unset)}
+        LOG.info(_LI("[evpn_vpls_over_srv6_be_slicings: bulk_delete] "
+                     "Request body = %s"), req_body)
+        context = pecan.request.context
+
+        obj_slicings, missing_uuids = self._select_slicings(context,
+                                                            req_body)
+
+        obj_sites = []
+        site_uuids = set()
+        for obj_slicing in obj_slicings:
+            site_uuids.add(obj_slicing.east_site_uuid)
+            site_uuids.add(obj_slicing.west_site_uuid)
+        for site_uuid in site_uuids:
+            try:
+                obj_sites.append(objects.Site.get(context, uuid=site_uuid))
+            except exception.ResourceNotFound:
+                pass
+
+        def _log_progress(stage, done, total):
+            LOG.info(_LI("[evpn_vpls_over_srv6_be_slicings: bulk_delete] "
+                         "%(stage)s %(done)d/%(total)d"),
+                     {'stage': stage, 'done': done, 'total': total})
+
+        bulk_mgr = _get_manager().BulkNetworkSlicingManager(
+            obj_sites, progress_callback=_log_progress)
+        errors = bulk_mgr.execute_bulk_delete_evpn_vpls_over_srv6_be_slicing_flow(  # noqa
+            obj_slicings)
+
+        deleted_uuids = set(objects.EVPNVPLSoSRv6BESlicing.bulk_destroy(
+            context, [uuid for uuid, err in errors.items() if err is None]))
+
+        results = []
+        uuids = [obj_slicing.uuid for obj_slicing in obj_slicings]
+        for index, uuid in enumerate(uuids + missing_uuids):
+            err = errors.get(uuid)
+            if err is None and uuid not in deleted_uuids:
+                err = exception.ResourceNotFound(
+                    resource=objects.EVPNVPLSoSRv6BESlicing.obj_name(),
+                    msg='with uuid=%s' % uuid)
+            if err is None:
+                results.append(bulk.BulkItemResult(
+                    index=index, uuid=uuid,
+                    status_code=int(HTTPStatus.NO_CONTENT)))
+            else:
+                results.append(bulk.BulkItemResult.from_error(
+                    index, err, uuid=uuid))
+        return bulk.BulkResult(
+            results=results,
+            stages=bulk.BulkStageResult.from_progress(bulk_mgr.progress))
@@ -20,6 +20,8 @@ import wsme
 from oslo_log import log
 
 from dci.api.controllers import base
+from dci.api.controllers import bulk
+from dci.api.controllers import etag
 from dci.api.controllers import link
 from dci.api.controllers import types
 from dci.api import expose
@@ -27,7 +29,7 @@ from dci.common import constants
 from dci.common.i18n import _LE
 from dci.common.i18n import _LI
 from dci import objects
-from dci.sdnc_manager.tungsten_fabric import vnc_api_client as tf_vnc_api
+from dci.sdnc_manager import api as sdnc_api
 
 
 LOG = log.getLogger(__name__)
@@ -100,8 +102,8 @@ class Site(base.APIBase):
             setattr(self, field, kwargs.get(field, types.unset))
 
     @classmethod
-    def convert_with_links(cls, obj_site):
-        api_site = cls(**obj_site.as_dict())
+    def convert_with_links(cls, site):
+        api_site = cls(**site)
         api_site.links = [
             link.Link.make_link('self', pecan.request.public_url,
                                 'sites', api_site.uuid)
@@ -127,19 +129,26 @@ class SiteController(base.DCIController):
     """REST controller for DCI site Controller.
     """
 
+    _custom_actions = {
+        'bulk_create': ['POST'],
+        'bulk_delete': ['POST'],
+    }
+
     def _ping_check(self, site):
 
         try:
-            tf_vnc_api.Client(host=site['tf_api_server_host'],
-                              port=site['tf_api_server_port'],
-                              username=site['tf_username'],
-                              password=site['tf_password'],
-                              project=site['os_project_name'])
+            sdnc_api.SDNControllerManager(sdnc_conn_ref=site)
         except Exception as err:
             LOG.error(_LE("Failed to PING Tungsten Fabric VNC API Server, "
                           "site login informations %s."), site)
             raise err
 
+    def _set_defaults(self, site):
+        site['os_project_name'] = site.get('os_project_name',
+                                           TF_DEFAULT_PROJECT)
+        site['tf_api_server_port'] = site.get('tf_api_server_port',
+                                              TF_DEFAULT_PORT)
+
     @expose.expose(Site, types.text)
     def get_one(self, uuid):
         """Get a single Site by UUID.
@@ -148,8 +157,12 @@ class SiteController(base.DCIController):
         """
         LOG.info(_LI("[sites: get_one] UUID = (%s)"), uuid)
         context = pecan.request.context
-        obj_site = objects.Site.get(context, uuid)
-        return Site.convert_with_links(obj_site)
+        site_etag, site = etag.get_resource(
+            objects.Site.obj_name(), uuid,
+            lambda: objects.Site.get(context, uuid).as_dict())
+        if etag.is_not_modified(site_etag):
+            return etag.not_modified()
+        return Site.convert_with_links(site)
 
     @expose.expose(SiteCollection, types.text)
     def get_all(self, state=None):
@@ -161,8 +174,13 @@ class SiteController(base.DCIController):
 
         LOG.info(_LI('[sites: get_all] filters = %s'), filters_dict)
         context = pecan.request.context
-        obj_sites = objects.Site.list(context, filters=filters_dict)
-        return SiteCollection.convert_with_links(obj_sites)
+        sites_etag, sites = etag.get_resource(
+            objects.Site.obj_name(), tuple(sorted(filters_dict.items())),
+            lambda: [obj_site.as_dict() for obj_site in
+                     objects.Site.list(context, filters=filters_dict)])
+        if etag.is_not_modified(sites_etag):
+            return etag.not_modified()
+        return SiteCollection.convert_with_links(sites)
 
     @expose.expose(Site, body=Site, status_code=HTTPStatus.CREATED)
     def post(self, req_body):
@@ -172,16 +190,13 @@ class SiteController(base.DCIController):
         LOG.info(_LI("[sites: port] Request body = %s"), req_body)
         context = pecan.request.context
 
-        req_body['os_project_name'] = req_body.get('os_project_name',
-                                                   TF_DEFAULT_PROJECT)
-        req_body['tf_api_server_port'] = req_body.get('tf_api_server_port',
-                                                      TF_DEFAULT_PORT)
+        self._set_defaults(req_body)
         self._ping_check(req_body)
 
         req_body['state'] = constants.ACTIVE
         obj_site = objects.Site(context, **req_body)
         obj_site.create(context)
-        return Site.convert_with_links(obj_site)
+        return Site.convert_with_links(obj_site.as_dict())
 
     @expose.expose(Site, types.text, body=Site,
                    status_code=HTTPStatus.ACCEPTED)
@@ -199,7 +214,7 @@ class SiteController(base.DCIController):
         self._ping_check(obj_site.as_dict())
 
         obj_site.save(context)
-        return Site.convert_with_links(obj_site)
+        return Site.convert_with_links(obj_site.as_dict())
 
     @expose.expose(None, types.text, status_code=HTTPStatus.NO_CONTENT)
     def delete(self, uuid):
@@ -211,3 +226,29 @@ class SiteController(base.DCIController):
         LOG.info('[site:delete] UUID = (%s)', uuid)
         obj_site = objects.Site.get(context, uuid)
         obj_site.destroy(context)
+
+    @expose.expose(bulk.BulkResult, body=SiteCollection,
+                   status_code=HTTPStatus.OK)
+    def bulk_create(self, req_body):
+        """Create a list of Sites.
+
+        The Tungsten Fabric API servers are checked concurrently, then all
+        the reachable sites are created in a single transaction.
+        """
+        sites = [site.as_dict() for site in req_body.sites or []]
+        LOG.info(_LI("[sites: bulk_create] Request body = %s"), sites)
+        context = pecan.request.context
+
+        for site in sites:
+            self._set_defaults(site)
+        return bulk.bulk_create(context, objects.Site, sites,
+                                self._ping_check)
+
+    @expose.expose(bulk.BulkResult, body=bulk.BulkDeleteRequest,
+                   status_code=HTTPStatus.OK)
+    def bulk_delete(self, req_body):
+        """Delete a list of Sites by UUID in a single transaction."""
+        uuids = req_body.uuids or []
+        LOG.info(_LI("[sites: bulk_delete] UUIDs = %s"), uuids)
+        context = pecan.request.context
+        return bulk.bulk_delete(context, objects.Site, uuids)
@@ -50,7 +50,9 @@ class TestController(base.DCIController):
             'netconf_host': obj_wan_node.netconf_host,
             'netconf_port': obj_wan_node.netconf_port,
             'netconf_username': obj_wan_node.netconf_username,
-            'netconf_password': obj_wan_node.netconf_password
+            'netconf_password': obj_wan_node.netconf_password,
+            'netconf_transport_profile':
+                obj_wan_node.netconf_transport_profile
         }
 
         device_manager = manager_api.DeviceManager(
@@ -13,12 +13,15 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import functools
 from http import HTTPStatus
 import pecan
 
 from oslo_log import log
 
 from dci.api.controllers import base
+from dci.api.controllers import bulk
+from dci.api.controllers import etag
 from dci.api.controllers import link
 from dci.api.controllers import types
 from dci.api import expose
@@ -61,6 +64,9 @@ class WANNode(base.APIBase):
     netconf_password = types.text
     """The NETCONF password."""
 
+    netconf_transport_profile = types.text
+    """The SSH transport profile of the NETCONF sessions, optional."""
+
     as_number = types.integer
     """AS Number."""
 
@@ -105,8 +111,8 @@ class WANNode(base.APIBase):
             setattr(self, field, kwargs.get(field, types.unset))
 
     @classmethod
-    def convert_with_links(cls, obj_wan_node):
-        api_wan_node = cls(**obj_wan_node.as_dict())
+    def convert_with_links(cls, wan_node):
+        api_wan_node = cls(**wan_node)
         api_wan_node.links = [
             link.Link.make_link('self', pecan.request.public_url,
                                 'wan_nodes', api_wan_node.uuid)
@@ -132,6 +138,35 @@ class WANNodeController(base.DCIController):
     """REST controller for WAN node Controller.
     """
 
+    _custom_actions = {
+        'bulk_create': ['POST'],
+        'bulk_delete': ['POST'],
+    }
+
+    def _check(self, context, req_body):
+        """Validate a WAN node and check that it is reachable."""
+        vendor = req_body.get('vendor')
+        if vendor not in constants.LIST_OF_VAILD_DEVICE_VENDOR:
+            msg = _LE("Invalid device vendor %(vendor)s, the optional "
+                      "vendor are %(list)s.") % {
+                          'vendor': vendor,
+                          'list': constants.LIST_OF_VAILD_DEVICE_VENDOR}
+            LOG.error(msg)
+            raise exception.InvalidRequestBody(msg)
+
+        if req_body.get('roles') \
+                and constants.WAN_NODE_ROLE_DCGW in req_body.get('roles'):
+            site_uuid = req_body['site_uuid']
+            try:
+                objects.Site.get(context, site_uuid)
+            except exception.ResourceNotFound as err:
+                raise err
+            except Exception as err:
+                raise err
+
+        dev_manager = manager_api.DeviceManager(device_conn_ref=req_body)
+        dev_manager.device_ping()
+
     @expose.expose(WANNode, types.text)
     def get_one(self, uuid):
         """Get a single WANNode by UUID.
@@ -140,8 +175,12 @@ class WANNodeController(base.DCIController):
         """
         LOG.info(_LI("[wan_nodes: get_one] UUID = (%s)"), uuid)
         context = pecan.request.context
-        obj_wan_node = objects.WANNode.get(context, uuid)
-        return WANNode.convert_with_links(obj_wan_node)
+        wan_node_etag, wan_node = etag.get_resource(
+            objects.WANNode.obj_name(), uuid,
+            lambda: objects.WANNode.get(context, uuid).as_dict())
+        if etag.is_not_modified(wan_node_etag):
+            return etag.not_modified()
+        return WANNode.convert_with_links(wan_node)
 
     @expose.expose(WANNodeCollection, types.text)
     def get_all(self, state=None):
@@ -153,8 +192,13 @@ class WANNodeController(base.DCIController):
 
         LOG.info(_LI('[wan_nodes: get_all] filters = %s'), filters_dict)
         context = pecan.request.context
-        obj_wan_nodes = objects.WANNode.list(context, filters=filters_dict)
-        return WANNodeCollection.convert_with_links(obj_wan_nodes)
+        wan_nodes_etag, wan_nodes = etag.get_resource(
+            objects.WANNode.obj_name(), tuple(sorted(filters_dict.items())),
+            lambda: [obj_wan_node.as_dict() for obj_wan_node in
+                     objects.WANNode.list(context, filters=filters_dict)])
+        if etag.is_not_modified(wan_nodes_etag):
+            return etag.not_modified()
+        return WANNodeCollection.convert_with_links(wan_nodes)
 
     @expose.expose(WANNode, body=WANNode,
                    status_code=HTTPStatus.CREATED)
@@ -165,32 +209,12 @@ class WANNodeController(base.DCIController):
         LOG.info(_LI("[wan_nodes: port] Request body = %s"), req_body)
         context = pecan.request.context
 
-        vendor = req_body.get('vendor')
-        if vendor not in constants.LIST_OF_VAILD_DEVICE_VENDOR:
-            msg = _LE("Invalid device vendor %(vendor)s, the optional "
-                      "vendor are %(list)s.") % {
-                          'vendor': vendor,
-                          'list': constants.LIST_OF_VAILD_DEVICE_VENDOR}
-            LOG.error(msg)
-            raise exception.InvalidRequestBody(msg)
-
-        if req_body.get('roles') \
-                and constants.WAN_NODE_ROLE_DCGW in req_body.get('roles'):
-            site_uuid = req_body['site_uuid']
-            try:
-                objects.Site.get(context, site_uuid)
-            except exception.ResourceNotFound as err:
-                raise err
-            except Exception as err:
-                raise err
-
-        dev_manager = manager_api.DeviceManager(device_conn_ref=req_body)
-        dev_manager.device_ping()
+        self._check(context, req_body)
 
         req_body['state'] = constants.ACTIVE
         obj_wan_node = objects.WANNode(context, **req_body)
         obj_wan_node.create(context)
-        return WANNode.convert_with_links(obj_wan_node)
+        return WANNode.convert_with_links(obj_wan_node.as_dict())
 
     @expose.expose(WANNode, types.text, body=WANNode,
                    status_code=HTTPStatus.ACCEPTED)
@@ -207,7 +231,7 @@ class WANNodeController(base.DCIController):
                 setattr(obj_wan_node, k, v)
 
         obj_wan_node.save(context)
-        return WANNode.convert_with_links(obj_wan_node)
+        return WANNode.convert_with_links(obj_wan_node.as_dict())
 
     @expose.expose(None, types.text, status_code=HTTPStatus.NO_CONTENT)
     def delete(self, uuid):
@@ -219,3 +243,28 @@ class WANNodeController(base.DCIController):
         LOG.info('[wan_node: delete] UUID = (%s)', uuid)
         obj_wan_node = objects.WANNode.get(context, uuid)
         obj_wan_node.destroy(context)
+
+    @expose.expose(bulk.BulkResult, body=WANNodeCollection,
+                   status_code=HTTPStatus.OK)
+    def bulk_create(self, req_body):
+        """Create a list of WANNodes.
+
+        The WAN nodes are pinged concurrently, then all the reachable ones
+        are created in a single transaction.
+        """
+        wan_nodes = [wan_node.as_dict()
+                     for wan_node in req_body.wan_nodes or []]
+        LOG.info(_LI("[wan_nodes: bulk_create] Request body = %s"),
+                 wan_nodes)
+        context = pecan.request.context
+        return bulk.bulk_create(context, objects.WANNode, wan_nodes,
+                                functools.partial(self._check, context))
+
+    @expose.expose(bulk.BulkResult, body=bulk.BulkDeleteRequest,
+                   status_code=HTTPStatus.OK)
+    def bulk_delete(self, req_body):
+        """Delete a list of WANNodes by UUID in a single transaction."""
+        uuids = req_body.uuids or []
+        LOG.info(_LI("[wan_nodes: bulk_delete] UUIDs = %s"), uuids)
+        context = pecan.request.context
+        return bulk.bulk_delete(context, objects.WANNode, uuids)
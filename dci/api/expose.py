@@ -12,11 +12,185 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+"""Exposure of the API controllers with WSME, and the renderer of their
+JSON responses.
+
+WSME renders a result by looking up its converter for every attribute of
+every item. The renderer below builds the converters of a result type once,
+as plain functions following ``wsme.rest.json.tojson``, and serialises the
+result with orjson when it is installed. The large collections are sent in
+chunks as they are serialised.
+"""
+
+import functools
+import json
+import threading
+
+import pecan
+from wsme import types as wtypes
+import wsme.rest.json
 import wsmeext.pecan as wsme_pecan
 
+from dci.conf import CONF
+
+try:
+    # NOTE: orjson is an optional runtime dependency, see the fast-json
+    # extra, the json module of the standard library is used without it.
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Number of the items of a streamed collection serialised per chunk.
+STREAM_CHUNK_SIZE = 200
+
+_CONVERTERS = {}
+_CONVERTERS_LOCK = threading.Lock()
+
 
 def expose(*args, **kwargs):
     """Ensure that only JSON, and not XML, is supported."""
     if 'rest_content_types' not in kwargs:
         kwargs['rest_content_types'] = ('json',)
     return wsme_pecan.wsexpose(*args, **kwargs)
+
+
+def dumps(data):
+    """Serialise primitives to compact JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+
+def _identity(value):
+    return value
+
+
+def _compile(datatype, compiling):
+    if wtypes.iscomplex(datatype):
+        attrs = []
+
+        def convert(value):
+            if value is None:
+                return None
+            data = {}
+            for key, name, convert_attr in attrs:
+                attr_value = getattr(value, key)
+                if attr_value is not wtypes.Unset:
+                    data[name] = convert_attr(attr_value)
+            return data
+
+        # NOTE: Registered before the converters of its attributes are
+        # built, for the types referring to themselves.
+        compiling[datatype] = convert
+        attrs.extend((attr.key, attr.name,
+                      _converter(attr.datatype, compiling))
+                     for attr in wtypes.list_attributes(datatype))
+        return convert
+
+    if isinstance(datatype, wtypes.ArrayType):
+        convert_item = _converter(datatype.item_type, compiling)
+
+        def convert(value):
+            if value is None:
+                return None
+            return [convert_item(item) for item in value]
+    elif isinstance(datatype, wtypes.DictType):
+        convert_key = _converter(datatype.key_type, compiling)
+        convert_value = _converter(datatype.value_type, compiling)
+
+        def convert(value):
+            if value is None:
+                return None
+            return {convert_key(k): convert_value(v)
+                    for k, v in value.items()}
+    elif wtypes.isusertype(datatype):
+        convert_base = _converter(datatype.basetype, compiling)
+
+        def convert(value):
+            if value is None:
+                return None
+            return convert_base(datatype.tobasetype(value))
+    elif datatype in (wtypes.text, int, float, bool):
+        convert = _identity
+    else:
+        convert = functools.partial(wsme.rest.json.tojson, datatype)
+    compiling[datatype] = convert
+    return convert
+
+
+def _converter(datatype, compiling):
+    convert = _CONVERTERS.get(datatype) or compiling.get(datatype)
+    if convert is None:
+        convert = _compile(datatype, compiling)
+    return convert
+
+
+def converter(datatype):
+    """Return the function converting a value of a WSME type to JSON
+    primitives, as ``wsme.rest.json.tojson`` does.
+    """
+    convert = _CONVERTERS.get(datatype)
+    if convert is None:
+        with _CONVERTERS_LOCK:
+            convert = _CONVERTERS.get(datatype)
+            if convert is None:
+                # NOTE: The converters are published once all of them are
+                # built, the readers do not take the lock.
+                compiling = {}
+                convert = _compile(datatype, compiling)
+                _CONVERTERS.update(compiling)
+    return convert
+
+
+def iter_collection(datatype, value, threshold):
+    """Return the JSON chunks of a collection of at least ``threshold``
+    items, None for the other results.
+
+    A collection is a complex type whose single attribute is a list.
+    """
+    if not threshold or not wtypes.iscomplex(datatype):
+        return None
+    attrs = wtypes.list_attributes(datatype)
+    if len(attrs) != 1 or not isinstance(attrs[0].datatype,
+                                         wtypes.ArrayType):
+        return None
+    items = getattr(value, attrs[0].key)
+    if items in (None, wtypes.Unset) or len(items) < threshold:
+        return None
+
+    convert_item = converter(attrs[0].datatype.item_type)
+    name = attrs[0].name
+
+    def generate():
+        yield b'{' + dumps(name) + b':['
+        for start in range(0, len(items), STREAM_CHUNK_SIZE):
+            chunk = b','.join(
+                dumps(convert_item(item))
+                for item in items[start:start + STREAM_CHUNK_SIZE])
+            yield b',' + chunk if start else chunk
+        yield b']}'
+
+    return generate()
+
+
+class JSONRenderer(object):
+    """Pecan renderer of the results of the exposed controllers, used in
+    place of the WSME one with ``[api] fast_json_renderer``.
+    """
+
+    def __init__(self, path, extra_vars):
+        pass
+
+    def render(self, template_path, namespace):
+        if 'faultcode' in namespace:
+            return wsme.rest.json.encode_error(None, namespace)
+
+        datatype = namespace['datatype']
+        result = namespace['result']
+        chunks = iter_collection(datatype, result,
+                                 CONF.api.json_stream_threshold)
+        if chunks is not None:
+            pecan.response.app_iter = chunks
+            return None
+        return dumps(converter(datatype)(result))
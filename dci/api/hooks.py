@@ -12,9 +12,23 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import hashlib
+import hmac
+import time
+
 from oslo_config import cfg
 from pecan import hooks
 
+from dci.common import cache
+from dci.common import metrics
+from dci.common import tracing
+from dci.db import api as dbapi
+
+# Upper bound of the clients tracked for reading their own writes.
+_MAX_RECENT_WRITERS = 4096
+_LAST_WRITE_COOKIE = 'dci_last_write'
+_SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
 
 class ConfigHook(hooks.PecanHook):
     """Attach the config object to the request so controllers can get to it."""
@@ -33,3 +47,125 @@ class PublicUrlHook(hooks.PecanHook):
     def before(self, state):
         state.request.public_url = (
             cfg.CONF.api.public_endpoint or state.request.host_url)
+
+
+class DBReadRoutingHook(hooks.PecanHook):
+    """Route the reads of a request to the primary or the slave database.
+
+    The requests mutating resources, and the requests of the clients that
+    recently did, read from the primary database during ``[api]
+    read_your_writes_window`` seconds. Every other read only query goes to
+    the slave database when one is configured.
+
+    With ``[api] read_your_writes_secret``, the time of the last write of a
+    client is returned in a signed cookie, honoured by every API worker.
+    Without it, the clients are tracked by address in this worker only,
+    which is best effort.
+    """
+
+    def __init__(self):
+        self._window = cfg.CONF.api.read_your_writes_window
+        self._secret = cfg.CONF.api.read_your_writes_secret
+        self._recent_writers = (
+            cache.LRUCache(_MAX_RECENT_WRITERS, ttl=self._window)
+            if self._window > 0 and not self._secret else None)
+
+    def _sign(self, written_at):
+        return hmac.new(self._secret.encode('utf-8'),
+                        written_at.encode('utf-8'),
+                        hashlib.sha256).hexdigest()
+
+    def _wrote_recently(self, request):
+        if self._window <= 0:
+            return False
+        if not self._secret:
+            return bool(self._recent_writers.get(request.client_addr))
+
+        written_at, _sep, signature = request.cookies.get(
+            _LAST_WRITE_COOKIE, '').partition(':')
+        if not hmac.compare_digest(signature, self._sign(written_at)):
+            return False
+        try:
+            elapsed = time.time() - float(written_at)
+        except ValueError:
+            return False
+        return 0 <= elapsed < self._window
+
+    def before(self, state):
+        request = state.request
+        read_from_primary = (request.method not in _SAFE_METHODS or
+                             self._wrote_recently(request))
+        request.read_routing_token = dbapi.set_read_from_primary(
+            read_from_primary)
+
+    def after(self, state):
+        request = state.request
+        if (self._window > 0 and request.method not in _SAFE_METHODS and
+                state.response.status_int < 400):
+            if self._secret:
+                written_at = '%.3f' % time.time()
+                state.response.set_cookie(
+                    _LAST_WRITE_COOKIE,
+                    '%s:%s' % (written_at, self._sign(written_at)),
+                    max_age=self._window, httponly=True)
+            else:
+                self._recent_writers.set(request.client_addr, True)
+        token = getattr(request, 'read_routing_token', None)
+        if token is not None:
+            dbapi.reset_read_from_primary(token)
+
+
+class MetricsHook(hooks.PecanHook):
+    """Record the latency of the API requests per route and status."""
+
+    def before(self, state):
+        state.request.started_at = time.monotonic()
+
+    def after(self, state):
+        if not cfg.CONF.metrics.enabled:
+            return
+
+        controller = getattr(state, 'controller', None)
+        controller_obj = getattr(controller, '__self__', None)
+        if controller_obj is not None:
+            route = '%s.%s' % (controller_obj.__class__.__name__,
+                               controller.__name__)
+        else:
+            route = 'unrouted'
+        metrics.get_registry().observe(
+            metrics.API_REQUEST + '_duration_seconds',
+            time.monotonic() - state.request.started_at,
+            {'route': route, 'method': state.request.method,
+             'status': state.response.status_int})
+
+
+class TracingHook(hooks.PecanHook):
+    """Run every API request in a server span, the root of its trace.
+
+    The caller trace is continued when the request carries a W3C
+    ``traceparent`` header, and the ``traceparent`` of the request span is
+    returned so that clients can correlate their own traces.
+    """
+
+    def before(self, state):
+        request = state.request
+        state.request.trace_span = tracing.start_span(
+            '%s %s' % (request.method, request.path), tracing.SERVER,
+            {'http.method': request.method,
+             'http.target': request.path_qs,
+             'net.peer.ip': request.client_addr},
+            traceparent=request.headers.get('traceparent'), root=True)
+
+    def on_error(self, state, exc):
+        trace_span = getattr(state.request, 'trace_span', None)
+        if trace_span is not None:
+            trace_span.record_exception(exc)
+
+    def after(self, state):
+        trace_span = getattr(state.request, 'trace_span', None)
+        if trace_span is None:
+            return
+        trace_span.set_attribute('http.status_code',
+                                 state.response.status_int)
+        state.response.headers['traceparent'] = trace_span.traceparent
+        tracing.end_span(trace_span)
@@ -12,9 +12,15 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+from dci.api.middleware import compression
 from dci.api.middleware import parsable_error
+from dci.api.middleware import profiler
 
 
+CompressionMiddleware = compression.CompressionMiddleware
 ParsableErrorMiddleware = parsable_error.ParsableErrorMiddleware
+ProfilerMiddleware = profiler.ProfilerMiddleware
 
-__all__ = ('ParsableErrorMiddleware',)
+__all__ = ('CompressionMiddleware',
+           'ParsableErrorMiddleware',
+           'ProfilerMiddleware')
@@ -0,0 +1,162 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+"""
+Middleware to compress the API responses with the content coding accepted
+by the client.
+
+gzip is preferred to deflate when the client accepts both equally. The
+bodies smaller than ``[compression] min_size`` are sent as they are, and
+the streamed ones are compressed as they are streamed. The entity tag of a
+compressed response is made weak, which keeps the conditional requests of
+the clients matching it.
+"""
+
+import zlib
+
+from dci.conf import CONF
+
+
+# The zlib window bits producing the gzip and the zlib (HTTP deflate)
+# formats.
+_WBITS = {
+    'gzip': 16 + zlib.MAX_WBITS,
+    'deflate': zlib.MAX_WBITS,
+}
+
+
+def choose_coding(accept_encoding):
+    """Return the content coding to use for an Accept-Encoding header, None
+    when the body must be sent as it is.
+    """
+    qualities = {}
+    for item in accept_encoding.split(','):
+        coding, _sep, params = item.partition(';')
+        quality = 1.0
+        for param in params.split(';'):
+            name, _sep, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.strip().lower()] = quality
+
+    chosen, chosen_quality = None, 0.0
+    for coding in ('gzip', 'deflate'):
+        quality = qualities.get(coding, qualities.get('*', 0.0))
+        if quality > chosen_quality:
+            chosen, chosen_quality = coding, quality
+    return chosen
+
+
+def _get_header(headers, name):
+    for header, value in headers:
+        if header.lower() == name:
+            return value
+    return None
+
+
+def _close(app_iter):
+    if hasattr(app_iter, 'close'):
+        app_iter.close()
+
+
+class CompressionMiddleware(object):
+    """Compress the responses for the clients accepting gzip or deflate."""
+
+    def __init__(self, app):
+        self.app = app
+
+    def _choose_coding(self, environ, status, headers):
+        content_type = _get_header(headers, 'content-type') or ''
+        if content_type.split(';')[0].strip().lower() not in \
+                CONF.compression.content_types:
+            return None
+
+        # NOTE: The responses of these media types differ with the
+        # Accept-Encoding of the request, compressed or not.
+        vary = _get_header(headers, 'vary')
+        if vary is None:
+            headers.append(('Vary', 'Accept-Encoding'))
+        elif 'accept-encoding' not in vary.lower():
+            headers[:] = [(h, v) for h, v in headers if h.lower() != 'vary']
+            headers.append(('Vary', vary + ', Accept-Encoding'))
+
+        if environ.get('REQUEST_METHOD') == 'HEAD' or \
+                status.split(' ')[0] in ('204', '304'):
+            return None
+        if _get_header(headers, 'content-encoding') is not None:
+            return None
+        if 'no-transform' in (_get_header(headers, 'cache-control') or ''):
+            return None
+        content_length = _get_header(headers, 'content-length')
+        if content_length is not None and \
+                int(content_length) < CONF.compression.min_size:
+            return None
+        return choose_coding(environ.get('HTTP_ACCEPT_ENCODING', ''))
+
+    def _compress_stream(self, app_iter, compressor):
+        try:
+            for chunk in app_iter:
+                data = compressor.compress(chunk)
+                if data:
+                    yield data
+            yield compressor.flush()
+        finally:
+            _close(app_iter)
+
+    def __call__(self, environ, start_response):
+        # Request for this state, modified by replacement_start_response()
+        # and used once the content coding of the response is chosen.
+        state = {'written': []}
+
+        def replacement_start_response(status, headers, exc_info=None):
+            state['status'] = status
+            state['headers'] = list(headers)
+            state['exc_info'] = exc_info
+            return state['written'].append
+
+        app_iter = self.app(environ, replacement_start_response)
+        if state['written']:
+            app_iter = state['written'] + list(app_iter)
+
+        status, headers = state['status'], state['headers']
+        coding = self._choose_coding(environ, status, headers)
+        if coding is None:
+            start_response(status, headers, state['exc_info'])
+            return app_iter
+
+        compressor = zlib.compressobj(CONF.compression.level, zlib.DEFLATED,
+                                      _WBITS[coding])
+        streamed = _get_header(headers, 'content-length') is None
+        headers = [(h, v) for h, v in headers
+                   if h.lower() not in ('content-length', 'etag')] + \
+            [('Content-Encoding', coding)]
+        etag = _get_header(state['headers'], 'etag')
+        if etag is not None:
+            headers.append(('ETag',
+                            etag if etag.startswith('W/') else 'W/' + etag))
+
+        if streamed:
+            start_response(status, headers, state['exc_info'])
+            return self._compress_stream(app_iter, compressor)
+
+        try:
+            body = b''.join(compressor.compress(chunk) for chunk in app_iter)
+            body += compressor.flush()
+        finally:
+            _close(app_iter)
+        headers.append(('Content-Length', str(len(body))))
+        start_response(status, headers, state['exc_info'])
+        return [body]
@@ -0,0 +1,242 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Middleware to profile single API requests on live workers.
+
+A request is profiled when it carries the trigger header or is picked by
+the sample rate. The profile is written to the spool directory, either as
+a pstats file readable with ``python -m pstats`` or as folded stacks ready
+for ``flamegraph.pl``.
+
+The eventlet hub runs the greenthreads of many requests in one OS thread,
+so only the greenlet of the profiled request is captured, and an API worker
+profiles one request at a time. The requests selected while another one
+is profiled are served without profiling.
+"""
+
+import collections
+import cProfile
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+
+import greenlet
+from oslo_log import log
+
+from dci.common.i18n import _LE
+from dci.common.i18n import _LI
+from dci.common.i18n import _LW
+from dci.conf import CONF
+
+
+LOG = log.getLogger(__name__)
+
+_UNSAFE_CHARS = re.compile(r'[^A-Za-z0-9_.-]+')
+# NOTE: A profiler hooks the whole OS thread, whose greenthreads serve the
+# other requests, so a worker profiles one request at a time.
+_PROFILING = threading.Lock()
+
+
+class _GreenletProfiler(object):
+    """Follow the switches of the greenlet which enables the profiler.
+
+    A ``greenlet.settrace`` hook, chained to the previous one, calls
+    ``_switched`` when the profiled greenlet is switched out or back in.
+    """
+
+    def __init__(self):
+        self.greenlet = None
+        self._previous_tracer = None
+
+    def _switched(self, running):
+        pass
+
+    def _trace(self, event, args):
+        if event in ('switch', 'throw'):
+            origin, target = args
+            if target is self.greenlet:
+                self._switched(True)
+            elif origin is self.greenlet:
+                self._switched(False)
+        if self._previous_tracer is not None:
+            self._previous_tracer(event, args)
+
+    def _hook(self):
+        self.greenlet = greenlet.getcurrent()
+        self._previous_tracer = greenlet.settrace(self._trace)
+
+    def _unhook(self):
+        greenlet.settrace(self._previous_tracer)
+
+
+class GreenletProfile(_GreenletProfiler):
+    """Profile one greenlet with cProfile.
+
+    cProfile is only enabled while the greenlet runs, not while the hub
+    runs the greenthreads of the other requests of the OS thread.
+    """
+
+    def __init__(self):
+        super(GreenletProfile, self).__init__()
+        self.profile = cProfile.Profile()
+
+    def _switched(self, running):
+        if running:
+            self.profile.enable()
+        else:
+            self.profile.disable()
+
+    def enable(self):
+        self._hook()
+        self.profile.enable()
+
+    def disable(self):
+        self.profile.disable()
+        self._unhook()
+
+    def dump_stats(self, path):
+        self.profile.dump_stats(path)
+
+
+class StackSampler(_GreenletProfiler):
+    """Sample the stack of one greenlet from a background thread.
+
+    The stack of the OS thread is sampled while the greenlet runs, and the
+    stack the greenlet is suspended at, e.g. waiting for a WAN node, while
+    the hub runs the other greenthreads. It follows the
+    ``enable``/``disable``/``dump_stats`` interface of ``cProfile.Profile``
+    and dumps the samples as folded stacks.
+    """
+
+    def __init__(self, interval):
+        super(StackSampler, self).__init__()
+        self.interval = interval
+        self.stacks = collections.Counter()
+        self.thread_id = None
+        self._running = True
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _switched(self, running):
+        self._running = running
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            if self._running:
+                frame = sys._current_frames().get(self.thread_id)
+            else:
+                frame = self.greenlet.gr_frame
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append('%s:%s:%d' % (code.co_filename, code.co_name,
+                                           code.co_firstlineno))
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def enable(self):
+        self.thread_id = threading.get_ident()
+        self._hook()
+        self._thread.start()
+
+    def disable(self):
+        self._stopped.set()
+        self._thread.join()
+        self._unhook()
+
+    def dump_stats(self, path):
+        with open(path, 'w') as f:
+            for stack, count in self.stacks.items():
+                f.write('%s %d\n' % (stack, count))
+
+
+class ProfilerMiddleware(object):
+    """Profile the requests selected by header or by sample rate."""
+
+    def __init__(self, app):
+        self.app = app
+
+    def _is_triggered(self, environ):
+        header = 'HTTP_' + CONF.profiler.trigger_header.upper().replace(
+            '-', '_')
+        value = environ.get(header)
+        if value is not None:
+            return (not CONF.profiler.trigger_secret or
+                    value == CONF.profiler.trigger_secret)
+        return random.random() < CONF.profiler.sample_rate
+
+    def _spool_path(self, environ, extension):
+        name = '%s-%d-%s-%s-%s.%s' % (
+            time.strftime('%Y%m%dT%H%M%S'), os.getpid(), uuid.uuid4().hex[:8],
+            environ.get('REQUEST_METHOD', ''),
+            _UNSAFE_CHARS.sub('_', environ.get('PATH_INFO', '')).strip('_'),
+            extension)
+        return os.path.join(CONF.profiler.spool_dir, name)
+
+    def _call_app(self, environ, start_response):
+        # NOTE: Consume the body here so that its rendering is profiled too.
+        app_iter = self.app(environ, start_response)
+        try:
+            return list(app_iter)
+        finally:
+            if hasattr(app_iter, 'close'):
+                app_iter.close()
+
+    def __call__(self, environ, start_response):
+        if not self._is_triggered(environ):
+            return self.app(environ, start_response)
+
+        if not _PROFILING.acquire(blocking=False):
+            LOG.warning(_LW("Not profiling %(method)s %(url)s, another "
+                            "request is being profiled"),
+                        {'method': environ.get('REQUEST_METHOD'),
+                         'url': environ.get('PATH_INFO')})
+            return self.app(environ, start_response)
+
+        try:
+            return self._profile(environ, start_response)
+        finally:
+            _PROFILING.release()
+
+    def _profile(self, environ, start_response):
+        if CONF.profiler.mode == 'sampling':
+            profiler = StackSampler(CONF.profiler.sampling_interval)
+            extension = 'folded'
+        else:
+            profiler = GreenletProfile()
+            extension = 'pstats'
+
+        profiler.enable()
+        try:
+            return self._call_app(environ, start_response)
+        finally:
+            profiler.disable()
+            path = self._spool_path(environ, extension)
+            try:
+                os.makedirs(CONF.profiler.spool_dir, exist_ok=True)
+                profiler.dump_stats(path)
+            except OSError as err:
+                LOG.error(_LE("Failed to write profile %(path)s, details "
+                              "%(err)s"), {'path': path, 'err': err})
+            else:
+                LOG.info(_LI("Profile of %(method)s %(url)s written to "
+                             "%(path)s"),
+                         {'method': environ.get('REQUEST_METHOD'),
+                          'url': environ.get('PATH_INFO'), 'path': path})
@@ -33,4 +33,6 @@ def main():
     server = dci_service.WSGIService('dci-controller-api',
                                      CONF.api.enable_ssl_api)
     launcher.launch_service(server, workers=server.workers)
+    if CONF.taskflow.persistence and CONF.taskflow.resume_on_start:
+        launcher.launch_service(dci_service.FlowResumeService(), workers=1)
     launcher.wait()
@@ -0,0 +1,32 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Report the drift between the slicings of the database and the real state
+of Tungsten Fabric and the WAN nodes.
+"""
+
+import json
+import sys
+
+from dci.common import service
+from dci import reconciler
+
+
+def main():
+    service.prepare_service(sys.argv)
+    drifts = reconciler.SlicingReconciler().run()
+    print(json.dumps(drifts, indent=2, sort_keys=True))
+    # NOTE: Non zero when drifts are found, e.g. to alert from cron.
+    return 1 if drifts else 0
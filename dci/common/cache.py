@@ -0,0 +1,121 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""In-process caches shared by the API and the object layer."""
+
+import collections
+import threading
+import time
+
+from dci.conf import CONF
+
+
+class LRUCache(object):
+    """A small thread-safe LRU cache with optional entry expiry.
+
+    :param maxsize: maximum number of entries, 0 disables the cache.
+    :param ttl: seconds an entry stays valid, 0 or None never expires.
+    """
+
+    def __init__(self, maxsize, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                expires_at, value = self._data[key]
+            except KeyError:
+                return default
+
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if self.maxsize <= 0:
+            return
+
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class ResourceCache(object):
+    """Serialised resources grouped by versioned object name.
+
+    Every entry of an object type is keyed with the current generation of
+    that type, so a single write invalidates both the single resources and
+    the collections built from them without scanning the cache.
+    """
+
+    def __init__(self, maxsize, ttl=None):
+        self._lru = LRUCache(maxsize, ttl)
+        self._generations = collections.defaultdict(int)
+
+    def generation(self, obj_name):
+        """Return the current generation of an object type.
+
+        A value read from the database is stored with the generation taken
+        before the read, so that a write racing with the read leaves it
+        behind instead of serving it.
+        """
+        return self._generations[obj_name]
+
+    def get(self, obj_name, key):
+        return self._lru.get((obj_name, self._generations[obj_name], key))
+
+    def set(self, obj_name, key, value, generation=None):
+        if generation is None:
+            generation = self._generations[obj_name]
+        self._lru.set((obj_name, generation, key), value)
+
+    def invalidate(self, obj_name):
+        self._generations[obj_name] += 1
+
+    def clear(self):
+        self._generations.clear()
+        self._lru.clear()
+
+
+_RESPONSE_CACHE = None
+
+
+def get_response_cache():
+    """Return the per-process cache of serialised API resources."""
+    global _RESPONSE_CACHE
+    if _RESPONSE_CACHE is None:
+        _RESPONSE_CACHE = ResourceCache(CONF.api.response_cache_size,
+                                        CONF.api.response_cache_ttl)
+    return _RESPONSE_CACHE
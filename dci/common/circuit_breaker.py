@@ -0,0 +1,139 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Circuit breakers of the NETCONF and Tungsten Fabric endpoints.
+
+After ``[circuit_breaker] failure_threshold`` consecutive failed
+connections the breaker of an endpoint opens, and the connections to it
+fail at once with CircuitOpen. After ``reset_timeout`` seconds the breaker
+is half open and lets a single probe connection through, which closes it
+again on success or reopens it on failure.
+"""
+
+import threading
+import time
+
+from oslo_log import log
+
+from dci.common import exception
+from dci.common.i18n import _LI
+from dci.common.i18n import _LW
+from dci.common import metrics
+from dci.conf import CONF
+
+
+LOG = log.getLogger(__name__)
+
+CLOSED = 'closed'
+HALF_OPEN = 'half_open'
+OPEN = 'open'
+
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitBreaker(object):
+    """The circuit breaker of one endpoint.
+
+    :param endpoint: the name of the endpoint, e.g. ``netconf:10.0.0.1:830``.
+    :param ignored_exceptions: exceptions raised by a reachable endpoint,
+                               e.g. authentication errors, which do not
+                               count as failures.
+    """
+
+    def __init__(self, endpoint, ignored_exceptions=()):
+        self.endpoint = endpoint
+        self.ignored_exceptions = tuple(ignored_exceptions)
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def _set_state(self, state):
+        if state != self.state:
+            if state == OPEN:
+                LOG.warning(_LW("Circuit breaker of %(endpoint)s opened "
+                                "after %(failures)d failed connections"),
+                            {'endpoint': self.endpoint,
+                             'failures': self.failures})
+            else:
+                LOG.info(_LI("Circuit breaker of %(endpoint)s is "
+                             "%(state)s"),
+                         {'endpoint': self.endpoint, 'state': state})
+            self.state = state
+        metrics.set_gauge(metrics.CIRCUIT_BREAKER + '_state',
+                          _STATE_VALUES[state], endpoint=self.endpoint)
+
+    def _before_call(self):
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            retry_after = CONF.circuit_breaker.reset_timeout - (
+                time.monotonic() - self.opened_at)
+            if self.state == OPEN and retry_after <= 0:
+                self._set_state(HALF_OPEN)
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return
+            raise exception.CircuitOpen(endpoint=self.endpoint,
+                                        retry_after=max(retry_after, 0))
+
+    def _on_success(self):
+        with self._lock:
+            self._probing = False
+            self.failures = 0
+            self._set_state(CLOSED)
+
+    def _on_failure(self):
+        with self._lock:
+            self._probing = False
+            self.failures += 1
+            if (self.state == HALF_OPEN or self.failures >=
+                    CONF.circuit_breaker.failure_threshold):
+                self.opened_at = time.monotonic()
+                self._set_state(OPEN)
+
+    def call(self, func, *args, **kwargs):
+        """Call ``func`` unless the breaker is open.
+
+        :raises: CircuitOpen if the endpoint is known to be unreachable.
+        """
+        if not CONF.circuit_breaker.enabled:
+            return func(*args, **kwargs)
+
+        self._before_call()
+        try:
+            result = func(*args, **kwargs)
+        except self.ignored_exceptions:
+            self._on_success()
+            raise
+        except Exception:
+            self._on_failure()
+            raise
+        self._on_success()
+        return result
+
+
+_BREAKERS = {}
+_BREAKERS_LOCK = threading.Lock()
+
+
+def get_breaker(endpoint, ignored_exceptions=()):
+    """Return the circuit breaker of an endpoint, shared by this process."""
+    with _BREAKERS_LOCK:
+        breaker = _BREAKERS.get(endpoint)
+        if breaker is None:
+            breaker = _BREAKERS[endpoint] = CircuitBreaker(
+                endpoint, ignored_exceptions)
+        return breaker
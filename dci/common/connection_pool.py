@@ -0,0 +1,114 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Per process pools of the idle NETCONF sessions and Tungsten Fabric
+clients.
+
+Opening a NETCONF session costs an SSH handshake and a NETCONF hello, and a
+Tungsten Fabric client a Keystone authentication and an IPAM read. Once an
+operation is done with one, it is kept idle, up to
+``[connection_pool] <name>_max_idle`` per endpoint, for the next operation
+on the same endpoint. Every connection is used by a single operation at a
+time, and the ones idle for ``idle_timeout`` seconds are closed.
+"""
+
+import collections
+import threading
+import time
+
+from oslo_log import log
+
+from dci.common.i18n import _LW
+from dci.conf import CONF
+
+
+LOG = log.getLogger(__name__)
+
+NETCONF = 'netconf'
+TF = 'tf'
+
+
+class ConnectionPool(object):
+    """The idle connections of one kind, keyed by endpoint.
+
+    :param name: the kind of the connections, e.g. ``netconf``.
+    :param close: callable closing a connection.
+    :param is_alive: optional callable telling whether a connection can
+                     still be used.
+    """
+
+    def __init__(self, name, close, is_alive=None):
+        self.name = name
+        self._close = close
+        self._is_alive = is_alive or (lambda conn: True)
+        self._idle = collections.defaultdict(list)
+        self._lock = threading.Lock()
+
+    @property
+    def max_idle(self):
+        return CONF.connection_pool[self.name + '_max_idle']
+
+    def _close_quietly(self, conn):
+        try:
+            self._close(conn)
+        except Exception as err:
+            LOG.warning(_LW("Failed to close an idle %(name)s connection, "
+                            "details %(err)s"),
+                        {'name': self.name, 'err': err})
+
+    def get(self, key):
+        """Take an idle connection to ``key``, None if there is none."""
+        found, expired = None, []
+        now = time.monotonic()
+        with self._lock:
+            idle = self._idle.get(key) or []
+            while idle:
+                conn, released_at = idle.pop()
+                if now - released_at < CONF.connection_pool.idle_timeout \
+                        and self._is_alive(conn):
+                    found = conn
+                    break
+                expired.append(conn)
+        for conn in expired:
+            self._close_quietly(conn)
+        return found
+
+    def put(self, key, conn):
+        """Keep a connection to ``key`` for the next operations, or close
+        it when the pool of ``key`` is full.
+        """
+        with self._lock:
+            idle = self._idle[key]
+            if len(idle) < self.max_idle:
+                idle.append((conn, time.monotonic()))
+                return
+        self._close_quietly(conn)
+
+    def size(self, key):
+        """Return the number of idle connections to ``key``."""
+        with self._lock:
+            return len(self._idle.get(key) or [])
+
+
+_POOLS = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def get_pool(name, close, is_alive=None):
+    """Return the pool of a kind of connections, shared by this process."""
+    with _POOLS_LOCK:
+        pool = _POOLS.get(name)
+        if pool is None:
+            pool = _POOLS[name] = ConnectionPool(name, close, is_alive)
+        return pool
@@ -0,0 +1,126 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Overall deadline of a request, shared by all the calls it makes.
+
+The deadline is held in a context variable, so the flow tasks, the NETCONF
+RPCs and the VNC API calls made on behalf of a request see the budget left
+and bound their own timeouts by it.
+"""
+
+import contextlib
+import contextvars
+import time
+
+from dci.common import exception
+from dci.conf import CONF
+
+
+HEADER = 'X-DCI-Request-Timeout'
+
+_CURRENT_DEADLINE = contextvars.ContextVar('dci_current_deadline',
+                                           default=None)
+
+
+class Deadline(object):
+    """A time budget of ``timeout`` seconds, starting now."""
+
+    def __init__(self, timeout):
+        self.timeout = timeout
+        self.expires_at = time.monotonic() + timeout
+        self.lifted = False
+
+    def remaining(self):
+        """Return the seconds left, or None once the deadline is lifted."""
+        if self.lifted:
+            return None
+        return self.expires_at - time.monotonic()
+
+
+def from_headers(headers):
+    """Return the timeout of a request, in seconds, or None.
+
+    It is the smallest of ``[api] request_timeout`` and of the timeout
+    requested by the client in the ``X-DCI-Request-Timeout`` header.
+    """
+    timeouts = []
+    if CONF.api.request_timeout:
+        timeouts.append(CONF.api.request_timeout)
+
+    value = headers.get(HEADER)
+    if value:
+        try:
+            requested = float(value)
+        except ValueError:
+            requested = 0
+        if requested <= 0:
+            raise exception.InvalidParameterValue(
+                err="%s must be a positive number of seconds, got %s." % (
+                    HEADER, value))
+        timeouts.append(requested)
+
+    return min(timeouts) if timeouts else None
+
+
+@contextlib.contextmanager
+def scope(current):
+    """Run the block with a deadline, None to run it without any.
+
+    :param current: a Deadline, as the deadline of a request outlives the
+                    scopes of the calls made on its behalf.
+    """
+    token = _CURRENT_DEADLINE.set(current)
+    try:
+        yield current
+    finally:
+        _CURRENT_DEADLINE.reset(token)
+
+
+def remaining():
+    """Return the seconds left to the current deadline, or None."""
+    current = _CURRENT_DEADLINE.get()
+    return None if current is None else current.remaining()
+
+
+def check(operation):
+    """Fail before starting an operation once the budget is spent.
+
+    :raises: DeadlineExceeded
+    """
+    left = remaining()
+    if left is not None and left <= 0:
+        raise exception.DeadlineExceeded(
+            timeout=_CURRENT_DEADLINE.get().timeout, operation=operation)
+
+
+def timeout(default, operation):
+    """Return the timeout of an operation, bounded by the budget left.
+
+    :param default: the timeout of the operation without a deadline.
+    :raises: DeadlineExceeded if the budget is already spent.
+    """
+    check(operation)
+    left = remaining()
+    if left is None:
+        return default
+    return min(default, left) if default else left
+
+
+def lift():
+    """Lift the current deadline, e.g. for the reverts of a flow, which
+    must run to completion whatever the budget left.
+    """
+    current = _CURRENT_DEADLINE.get()
+    if current is not None:
+        current.lifted = True
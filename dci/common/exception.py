@@ -154,6 +154,55 @@ class ResourceNotFound(NotFound):
     _msg_fmt = _("%(resource)s not found %(msg)s")
 
 
+class SubnetOverlap(DCIException):
+    _msg_fmt = _("%(kind)s %(value)s overlaps with the EVPN VPLS over SRv6 "
+                 "BE network slicing %(uuid)s on site %(site)s.")
+    code = HTTPStatus.CONFLICT
+
+
+class WANNodeQueueTimeout(DCIException):
+    _msg_fmt = _("Timed out after %(timeout)s seconds waiting for the work "
+                 "queue of WAN node %(wan_node)s.")
+    code = HTTPStatus.SERVICE_UNAVAILABLE
+
+
+class WANNodeWorkFailed(DCIException):
+    _msg_fmt = _("The %(operation)s operation on WAN node %(wan_node)s "
+                 "failed, details %(err)s")
+
+
+class DeadlineExceeded(DCIException):
+    _msg_fmt = _("The request timeout of %(timeout)s seconds expired before "
+                 "%(operation)s.")
+    code = HTTPStatus.GATEWAY_TIMEOUT
+
+
+class CircuitOpen(DCIException):
+    _msg_fmt = _("%(endpoint)s is unreachable, connections fail at once for "
+                 "another %(retry_after)d seconds.")
+    code = HTTPStatus.SERVICE_UNAVAILABLE
+
+
+class BridgeDomainExhausted(Conflict):
+    _msg_fmt = _("No free bridge domain found on the WAN nodes after "
+                 "%(draws)d draws.")
+
+
+class IdempotencyKeyExists(Conflict):
+    _msg_fmt = _("Idempotency-Key %(key)s is already recorded.")
+
+
+class IdempotencyKeyMismatch(DCIException):
+    _msg_fmt = _("Idempotency-Key %(key)s was used with a different request "
+                 "body.")
+    code = HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+class IdempotencyKeyInProgress(Conflict):
+    _msg_fmt = _("The request with Idempotency-Key %(key)s is still in "
+                 "progress, retry later.")
+
+
 class RecordAlreadyExists(DCIException):
     _msg_fmt = _("Database record with uuid %(uuid)s already exists.")
 
@@ -169,3 +218,18 @@ class SSHCLIExecutionError(DCIException):
 
 class L3VPNSRv6SlicingError(DCIException):
     _msg_fmt = _("%(err)s")
+
+
+class NETCONFCapabilityMissing(DCIException):
+    _msg_fmt = _("Device %(host)s does not support the NETCONF "
+                 "%(capability)s capability.")
+
+
+class NETCONFRPCFailed(DCIException):
+    _msg_fmt = _("The NETCONF %(operation)s RPC failed on device "
+                 "%(host)s.")
+
+
+class CoordinatedCommitFailed(DCIException):
+    _msg_fmt = _("The coordinated commit failed in its %(phase)s phase on "
+                 "%(failed)s, details %(err)s")
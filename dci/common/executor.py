@@ -0,0 +1,86 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Run the blocking calls off the eventlet hub.
+
+ncclient, paramiko and the other clients the API calls, e.g. through
+``utils.concurrent_map``, do blocking socket and crypto work. Called from a
+greenthread of the eventlet WSGI server, they stall every other request of
+the API worker until the peer answers. The calls are
+handed to the eventlet pool of native threads instead, and the greenthread
+yields until they return. See ``dci.device_manager.executor`` for the
+device drivers.
+"""
+
+import contextvars
+import threading
+import time
+
+import eventlet
+from eventlet import tpool
+import greenlet
+
+from dci.conf import CONF
+
+
+_SETUP_LOCK = threading.Lock()
+_POOL_SIZE = None
+
+
+def _in_greenthread():
+    # NOTE: Only the greenthreads spawned by the eventlet hub have a parent
+    # greenlet, the native threads, e.g. the ones of utils.concurrent_map
+    # or of mod_wsgi, can block without stalling other requests.
+    return greenlet.getcurrent().parent is not None
+
+
+def _setup_pool():
+    global _POOL_SIZE
+    if _POOL_SIZE != CONF.device.executor_pool_size:
+        with _SETUP_LOCK:
+            if _POOL_SIZE != CONF.device.executor_pool_size:
+                _POOL_SIZE = CONF.device.executor_pool_size
+                # NOTE: Takes effect when the pool starts, i.e. on the first
+                # call of every worker.
+                tpool.set_num_threads(_POOL_SIZE)
+
+
+def offloads():
+    """Whether :func:`execute` runs the calls of the caller in a native
+    thread, i.e. the caller is a greenthread and the tpool executor is
+    configured.
+    """
+    return CONF.device.executor == 'tpool' and _in_greenthread()
+
+
+def execute(func, *args, **kwargs):
+    """Call ``func`` in a native thread if the caller is a greenthread.
+
+    The call runs in a copy of the caller context, so that the current
+    trace span follows it.
+    """
+    if not offloads():
+        return func(*args, **kwargs)
+
+    _setup_pool()
+    return tpool.execute(contextvars.copy_context().run,
+                         func, *args, **kwargs)
+
+
+def sleep(seconds):
+    """Sleep without stalling the other greenthreads of the worker."""
+    if _in_greenthread():
+        eventlet.sleep(seconds)
+    else:
+        time.sleep(seconds)
@@ -0,0 +1,69 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+"""Periodic renewal of the database leases held by a process.
+
+The leases of the work items and of the slicing flows tell the other
+workers that their holder is alive. They are renewed from a native thread,
+which keeps running while the greenthreads of the API worker are blocked
+on a device or a database call.
+"""
+
+import threading
+
+from oslo_log import log
+
+from dci.common.i18n import _LW
+
+
+LOG = log.getLogger(__name__)
+
+
+class Heartbeat(object):
+    """Call ``beat`` every ``interval`` seconds until stopped.
+
+    It can be used as a context manager around the work holding a lease.
+    A failed beat is logged, and the next one is tried on time.
+    """
+
+    def __init__(self, interval, beat, name='heartbeat'):
+        self.interval = interval
+        self._beat = beat
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name,
+                                        daemon=True)
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                self._beat()
+            except Exception as err:
+                LOG.warning(_LW("Failed to renew the leases of %(name)s, "
+                                "details %(err)s"),
+                            {'name': self._thread.name, 'err': err})
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread.is_alive() and \
+                self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
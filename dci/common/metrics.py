@@ -0,0 +1,321 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Latency histograms, error counters and gauges in the Prometheus text
+format.
+
+Every process records its own metrics and periodically writes them to a
+file of ``[metrics] data_dir`` named after its PID. The worker answering
+``/metrics`` sums the files of all the workers of the ProcessLauncher.
+"""
+
+import contextlib
+import functools
+import glob
+import inspect
+import json
+import os
+import threading
+import time
+
+from oslo_log import log
+
+from dci.common.i18n import _LE
+from dci.conf import CONF
+
+
+LOG = log.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                   10.0, 30.0, 60.0, 120.0)
+
+API_REQUEST = 'dci_api_request'
+DB_CALL = 'dci_db_call'
+TF_CALL = 'dci_tf_call'
+NETCONF_RPC = 'dci_netconf_rpc'
+WAN_NODE_QUEUE = 'dci_wan_node_queue'
+CIRCUIT_BREAKER = 'dci_circuit_breaker'
+
+DESCRIPTIONS = {
+    API_REQUEST: 'API request handling, per route',
+    DB_CALL: 'database Connection calls',
+    TF_CALL: 'Tungsten Fabric VNC API calls',
+    NETCONF_RPC: 'NETCONF operations on the WAN nodes',
+    WAN_NODE_QUEUE: 'work queues of the WAN nodes',
+    CIRCUIT_BREAKER: 'circuit breakers of the endpoints (0 closed, 1 half '
+                     'open, 2 open)',
+}
+
+_FILE_PREFIX = 'metrics-'
+
+
+class Registry(object):
+    """The histograms and counters recorded by this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pid = os.getpid()
+        self._flushed_at = time.monotonic()
+        self._histograms = {}
+        self._counters = {}
+        self._gauges = {}
+
+    def _check_pid(self):
+        # NOTE: A forked worker must not report the metrics of its parent.
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._histograms.clear()
+            self._counters.clear()
+            self._gauges.clear()
+
+    def observe(self, name, value, labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._check_pid()
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = {
+                    'buckets': [0] * len(DEFAULT_BUCKETS),
+                    'sum': 0.0, 'count': 0}
+            for index, bound in enumerate(DEFAULT_BUCKETS):
+                if value <= bound:
+                    histogram['buckets'][index] += 1
+                    break
+            histogram['sum'] += value
+            histogram['count'] += 1
+        self._maybe_flush()
+
+    def inc(self, name, labels, amount=1):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._check_pid()
+            self._counters[key] = self._counters.get(key, 0) + amount
+        self._maybe_flush()
+
+    def set(self, name, value, labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._check_pid()
+            self._gauges[key] = (value, time.time())
+        self._maybe_flush()
+
+    def snapshot(self):
+        with self._lock:
+            self._check_pid()
+            return {
+                'histograms': [[name, list(labels), dict(
+                    histogram, buckets=list(histogram['buckets']))]
+                    for (name, labels), histogram in
+                    self._histograms.items()],
+                'counters': [[name, list(labels), value]
+                             for (name, labels), value in
+                             self._counters.items()],
+                'gauges': [[name, list(labels), value, set_at]
+                           for (name, labels), (value, set_at) in
+                           self._gauges.items()],
+            }
+
+    def _maybe_flush(self):
+        if time.monotonic() - self._flushed_at >= \
+                CONF.metrics.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Write the metrics of this process to the data directory."""
+        self._flushed_at = time.monotonic()
+        path = os.path.join(CONF.metrics.data_dir,
+                            '%s%d.json' % (_FILE_PREFIX, os.getpid()))
+        with self._flush_lock:
+            try:
+                os.makedirs(CONF.metrics.data_dir, exist_ok=True)
+                with open(path + '.tmp', 'w') as f:
+                    json.dump(self.snapshot(), f)
+                os.replace(path + '.tmp', path)
+            except OSError as err:
+                LOG.error(_LE("Failed to write the metrics to %(path)s, "
+                              "details %(err)s"),
+                          {'path': path, 'err': err})
+
+
+_REGISTRY = Registry()
+
+
+def get_registry():
+    """Return the metrics registry of this process."""
+    return _REGISTRY
+
+
+def reset_data_dir():
+    """Remove the metrics left by the workers of a previous run."""
+    for path in glob.glob(os.path.join(CONF.metrics.data_dir,
+                                       _FILE_PREFIX + '*')):
+        try:
+            os.remove(path)
+        except OSError as err:
+            LOG.error(_LE("Failed to remove the metrics %(path)s, details "
+                          "%(err)s"), {'path': path, 'err': err})
+
+
+@contextlib.contextmanager
+def timed(name, **labels):
+    """Record the duration of the block, and count it when it raises.
+
+    :param name: the metric family, e.g. ``metrics.DB_CALL``.
+    :param labels: the Prometheus labels of the sample.
+    """
+    if not CONF.metrics.enabled:
+        yield
+        return
+
+    start = time.monotonic()
+    try:
+        yield
+    except Exception:
+        _REGISTRY.inc(name + '_errors_total', labels)
+        raise
+    finally:
+        _REGISTRY.observe(name + '_duration_seconds',
+                          time.monotonic() - start, labels)
+
+
+def set_gauge(name, value, **labels):
+    """Set a gauge, e.g. the depth of a queue.
+
+    As every worker may see the same value, ``/metrics`` reports the value
+    set last by any worker rather than their sum.
+    """
+    if CONF.metrics.enabled:
+        _REGISTRY.set(name, value, labels)
+
+
+def instrument(name, label, methods=None):
+    """Class decorator timing the methods of a class.
+
+    :param name: the metric family, e.g. ``metrics.DB_CALL``.
+    :param label: the label holding the method name.
+    :param methods: the names of the methods to time, by default every
+                    public method defined by the class.
+    """
+    def _wrap(func, method):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed(name, **{label: method}):
+                return func(*args, **kwargs)
+        return wrapper
+
+    def decorator(cls):
+        for method in methods or [
+                attr for attr, value in vars(cls).items()
+                if not attr.startswith('_') and inspect.isfunction(value)]:
+            setattr(cls, method, _wrap(vars(cls)[method], method))
+        return cls
+    return decorator
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('\n', r'\n').replace(
+        '"', r'\"')
+
+
+def _format_labels(labels, extra=()):
+    labels = list(labels) + list(extra)
+    if not labels:
+        return ''
+    return '{%s}' % ','.join('%s="%s"' % (key, _escape(value))
+                             for key, value in labels)
+
+
+def _format_bound(bound):
+    return repr(float(bound))
+
+
+def collect():
+    """Return the metrics of all the workers in the Prometheus text format.
+    """
+    _REGISTRY.flush()
+
+    histograms = {}
+    counters = {}
+    gauges = {}
+    for path in glob.glob(os.path.join(CONF.metrics.data_dir,
+                                       _FILE_PREFIX + '*.json')):
+        try:
+            with open(path) as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError) as err:
+            LOG.error(_LE("Failed to read the metrics %(path)s, details "
+                          "%(err)s"), {'path': path, 'err': err})
+            continue
+
+        for name, labels, histogram in snapshot['histograms']:
+            key = (name, tuple(tuple(label) for label in labels))
+            total = histograms.setdefault(key, {
+                'buckets': [0] * len(DEFAULT_BUCKETS),
+                'sum': 0.0, 'count': 0})
+            for index, count in enumerate(histogram['buckets']):
+                total['buckets'][index] += count
+            total['sum'] += histogram['sum']
+            total['count'] += histogram['count']
+        for name, labels, value in snapshot['counters']:
+            key = (name, tuple(tuple(label) for label in labels))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, value, set_at in snapshot.get('gauges', []):
+            key = (name, tuple(tuple(label) for label in labels))
+            if key not in gauges or gauges[key][1] < set_at:
+                gauges[key] = (value, set_at)
+
+    lines = []
+    described = set()
+
+    def _describe(family, metric_type):
+        if family in described:
+            return
+        described.add(family)
+        if metric_type == 'gauge':
+            prefix, kind = family.rsplit('_', 1)[0], 'Current %s' % (
+                family.rsplit('_', 1)[1])
+        else:
+            prefix = family.rsplit('_', 2)[0]
+            kind = 'Latency in seconds' if metric_type == 'histogram' \
+                else 'Number of errors'
+        lines.append('# HELP %s %s of the %s.' % (
+            family, kind, DESCRIPTIONS.get(prefix, prefix)))
+        lines.append('# TYPE %s %s' % (family, metric_type))
+
+    for (name, labels), histogram in sorted(histograms.items()):
+        _describe(name, 'histogram')
+        cumulative = 0
+        for bound, count in zip(DEFAULT_BUCKETS, histogram['buckets']):
+            cumulative += count
+            lines.append('%s_bucket%s %d' % (
+                name, _format_labels(labels, [('le', _format_bound(bound))]),
+                cumulative))
+        lines.append('%s_bucket%s %d' % (
+            name, _format_labels(labels, [('le', '+Inf')]),
+            histogram['count']))
+        lines.append('%s_sum%s %s' % (name, _format_labels(labels),
+                                      repr(histogram['sum'])))
+        lines.append('%s_count%s %d' % (name, _format_labels(labels),
+                                        histogram['count']))
+
+    for (name, labels), value in sorted(counters.items()):
+        _describe(name, 'counter')
+        lines.append('%s%s %d' % (name, _format_labels(labels), value))
+
+    for (name, labels), (value, _set_at) in sorted(gauges.items()):
+        _describe(name, 'gauge')
+        lines.append('%s%s %s' % (name, _format_labels(labels), value))
+
+    return '\n'.join(lines) + '\n'
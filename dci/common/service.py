@@ -12,14 +12,21 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import threading
+
 from oslo_concurrency import processutils
 from oslo_log import log
 from oslo_service import service
 from oslo_service import wsgi
+from oslo_utils import importutils
 
 from dci.api import app
 from dci.common import config
 from dci.common import exception
+from dci.common.i18n import _
+from dci.common.i18n import _LE
+from dci.common import metrics
+from dci.common import tracing
 from dci.conf import CONF
 from dci import objects
 
@@ -35,8 +42,15 @@ def prepare_service(argv=None):
 
     argv = argv or []
     config.parse_args(argv)
+    if CONF.device.queue_lease_timeout >= CONF.device.queue_timeout:
+        raise exception.ConfigInvalid(
+            _("[device] queue_lease_timeout value of %(lease)d is invalid, "
+              "must be less than queue_timeout %(timeout)d.") %
+            {'lease': CONF.device.queue_lease_timeout,
+             'timeout': CONF.device.queue_timeout})
 
     log.setup(CONF, 'dci-controller')
+    tracing.setup_logging()
     objects.register_all()
 
 
@@ -44,6 +58,32 @@ def process_launcher():
     return service.ProcessLauncher(CONF, restart_method='mutate')
 
 
+class FlowResumeService(service.Service):
+    """Resume the slicing creation flows left by the dead API workers.
+
+    It runs in a process of its own, started with dci-controller-api, and
+    scans for the flows to resume every ``[taskflow] resume_interval``
+    seconds, so that it also picks up the flows of the API workers the
+    launcher respawned.
+    """
+
+    def start(self):
+        super(FlowResumeService, self).start()
+        self.tg.add_timer(CONF.taskflow.resume_interval,
+                          self._resume_slicing_flows)
+
+    @staticmethod
+    def _resume_slicing_flows():
+        # NOTE: The driver stacks are only loaded by this process.
+        resume = importutils.import_module('dci.task_flows.resume')
+        try:
+            resume.resume_slicing_flows()
+        except Exception as err:
+            # NOTE: Keep the timer running, the next scan retries.
+            LOG.error(_LE("Failed to scan for the slicing flows to "
+                          "resume, details %(err)s"), {'err': err})
+
+
 class WSGIService(service.ServiceBase):
     """Provides ability to launch DCI Controller API from wsgi app."""
 
@@ -54,6 +94,8 @@ class WSGIService(service.ServiceBase):
         :returns: None
         """
         self.name = name
+        if CONF.metrics.enabled:
+            metrics.reset_data_dir()
         self.app = app.load_app()
         self.workers = (CONF.api.api_workers or
                         processutils.get_worker_count())
@@ -72,6 +114,18 @@ class WSGIService(service.ServiceBase):
         :returns: None
         """
         self.server.start()
+        if CONF.connection_pool.warm_up:
+            # NOTE: Runs in every worker, beside the requests it serves.
+            threading.Thread(target=self._warm_up, name='warm-up',
+                             daemon=True).start()
+
+    @staticmethod
+    def _warm_up():
+        try:
+            importutils.import_module('dci.warm_up').warm_up()
+        except Exception as err:
+            LOG.error(_LE("Failed to warm up the connection pools, details "
+                          "%s"), err)
 
     def stop(self):
         """Stop serving this API.
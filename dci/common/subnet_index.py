@@ -0,0 +1,227 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Index of the slicing subnets and allocation pools of every site."""
+
+import bisect
+import collections
+import ipaddress
+import threading
+import time
+
+from oslo_log import log
+
+from dci.common import exception
+from dci.common.i18n import _LW
+from dci.conf import CONF
+
+
+LOG = log.getLogger(__name__)
+
+
+SUBNET = 'subnet_cidr'
+POOL = 'allocation_pool'
+
+
+def parse_subnet_cidr(subnet_cidr):
+    """Return the IP version and the address range of a CIDR."""
+    try:
+        network = ipaddress.ip_network(subnet_cidr, strict=False)
+    except ValueError as err:
+        raise exception.InvalidParameterValue(err=err)
+    return (network.version, int(network.network_address),
+            int(network.broadcast_address))
+
+
+def parse_allocation_pool(allocation_pool):
+    """Return the IP version and the address range of a ``start,end`` pool.
+    """
+    try:
+        start_ip, end_ip = [ipaddress.ip_address(ip.strip())
+                            for ip in allocation_pool.split(',')]
+    except ValueError as err:
+        raise exception.InvalidParameterValue(err=err)
+    if start_ip.version != end_ip.version or start_ip > end_ip:
+        raise exception.InvalidParameterValue(
+            err="Invalid allocation pool %s." % allocation_pool)
+    return start_ip.version, int(start_ip), int(end_ip)
+
+
+class IntervalIndex(object):
+    """Closed integer intervals sorted by start, each with an owner.
+
+    Alongside the intervals a running maximum of their ends is kept, so
+    whether a range overlaps any interval is answered with one bisection,
+    even when the stored intervals overlap each other.
+    """
+
+    def __init__(self):
+        self._intervals = []
+        self._max_ends = []
+
+    def __len__(self):
+        return len(self._intervals)
+
+    def _refresh_max_ends(self, position):
+        del self._max_ends[position:]
+        max_end = self._max_ends[-1] if self._max_ends else None
+        for _start, end, _owner in self._intervals[position:]:
+            max_end = end if max_end is None else max(max_end, end)
+            self._max_ends.append(max_end)
+
+    def add(self, start, end, owner):
+        interval = (start, end, owner)
+        position = bisect.bisect_left(self._intervals, interval)
+        self._intervals.insert(position, interval)
+        self._refresh_max_ends(position)
+
+    def remove(self, start, end, owner):
+        interval = (start, end, owner)
+        position = bisect.bisect_left(self._intervals, interval)
+        if self._intervals[position:position + 1] == [interval]:
+            del self._intervals[position]
+            self._refresh_max_ends(position)
+
+    def overlaps(self, start, end):
+        """Whether [start, end] overlaps any interval, in O(log n)."""
+        position = bisect.bisect_right(self._intervals, (end, float('inf')))
+        return position > 0 and self._max_ends[position - 1] >= start
+
+    def find_overlap(self, start, end):
+        """Return the owner of an interval overlapping [start, end]."""
+        if not self.overlaps(start, end):
+            return None
+        position = bisect.bisect_right(self._intervals, (end, float('inf')))
+        for _start, interval_end, owner in reversed(
+                self._intervals[:position]):
+            if interval_end >= start:
+                return owner
+
+
+class SubnetIndex(object):
+    """Subnets and allocation pools of the slicings, grouped by site.
+
+    The index is loaded from the database on first use, then kept up to
+    date as the slicings of this process are created and deleted. It is
+    rebuilt every ``[api] subnet_index_ttl`` seconds to pick up the
+    slicings created through other API workers.
+    """
+
+    def __init__(self, ttl=None):
+        self.ttl = ttl
+        self._lock = threading.RLock()
+        self._loaded_at = None
+        self._indexes = collections.defaultdict(IntervalIndex)
+        self._entries = collections.defaultdict(list)
+        self._reservations = {}
+
+    def _entries_of(self, subnet_cidr, east_site_uuid, east_pool,
+                    west_site_uuid, west_pool):
+        version, start, end = parse_subnet_cidr(subnet_cidr)
+        entries = []
+        for site_uuid, pool in ((east_site_uuid, east_pool),
+                                (west_site_uuid, west_pool)):
+            entries.append((site_uuid, SUBNET, subnet_cidr,
+                            version, start, end))
+            pool_version, pool_start, pool_end = \
+                parse_allocation_pool(pool)
+            if (pool_version != version or pool_start < start
+                    or pool_end > end):
+                raise exception.InvalidParameterValue(
+                    err="Allocation pool %s is not in subnet %s." % (
+                        pool, subnet_cidr))
+            entries.append((site_uuid, POOL, pool,
+                            pool_version, pool_start, pool_end))
+        return entries
+
+    def _add(self, owner, entries):
+        for site_uuid, kind, _value, version, start, end in entries:
+            self._indexes[(site_uuid, kind, version)].add(start, end, owner)
+        self._entries[owner].extend(entries)
+
+    def _is_stale(self):
+        return self._loaded_at is None or (
+            self.ttl and time.monotonic() - self._loaded_at > self.ttl)
+
+    def load(self, loader):
+        """(Re)build the index when it is not loaded yet or has expired.
+
+        :param loader: callable returning every slicing object.
+        """
+        with self._lock:
+            if not self._is_stale():
+                return
+            self._indexes.clear()
+            self._entries.clear()
+            for owner, entries in self._reservations.items():
+                self._add(owner, entries)
+            for obj_slicing in loader():
+                try:
+                    self.add_slicing(obj_slicing)
+                except exception.InvalidParameterValue as err:
+                    LOG.warning(_LW("Slicing %(uuid)s is not indexed, "
+                                    "details %(err)s"),
+                                {'uuid': obj_slicing.uuid, 'err': err})
+            self._loaded_at = time.monotonic()
+
+    def add_slicing(self, obj_slicing):
+        """Index a slicing, replacing a reservation made with its UUID."""
+        with self._lock:
+            self.release(obj_slicing.uuid)
+            self._add(obj_slicing.uuid, self._entries_of(
+                obj_slicing.subnet_cidr,
+                obj_slicing.east_site_uuid,
+                obj_slicing.east_dcn_vn_subnet_allocation_pool,
+                obj_slicing.west_site_uuid,
+                obj_slicing.west_dcn_vn_subnet_allocation_pool))
+
+    def release(self, owner):
+        """Remove the slicing or the reservation of an owner."""
+        with self._lock:
+            self._reservations.pop(owner, None)
+            for site_uuid, kind, _value, version, start, end in \
+                    self._entries.pop(owner, []):
+                self._indexes[(site_uuid, kind, version)].remove(
+                    start, end, owner)
+
+    def reserve(self, owner, subnet_cidr, east_site_uuid, east_pool,
+                west_site_uuid, west_pool):
+        """Reserve the subnet and pools of a new slicing.
+
+        :param owner: the UUID the slicing is going to be created with.
+        :raises: SubnetOverlap if the subnet or a pool overlaps the one of
+                 an existing slicing on the same site.
+        """
+        entries = self._entries_of(subnet_cidr, east_site_uuid, east_pool,
+                                   west_site_uuid, west_pool)
+        with self._lock:
+            for site_uuid, kind, value, version, start, end in entries:
+                index = self._indexes.get((site_uuid, kind, version))
+                if index is not None and index.overlaps(start, end):
+                    raise exception.SubnetOverlap(
+                        kind=kind, value=value, site=site_uuid,
+                        uuid=index.find_overlap(start, end))
+            self._add(owner, entries)
+            self._reservations[owner] = entries
+
+
+_SUBNET_INDEX = None
+
+
+def get_subnet_index():
+    """Return the per-process index of the slicing subnets."""
+    global _SUBNET_INDEX
+    if _SUBNET_INDEX is None:
+        _SUBNET_INDEX = SubnetIndex(CONF.api.subnet_index_ttl)
+    return _SUBNET_INDEX
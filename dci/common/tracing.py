@@ -0,0 +1,349 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Trace spans compatible with OpenTelemetry.
+
+The spans use W3C trace context identifiers and are exported in the OTLP
+JSON encoding, either appended to a local file or posted to an OTLP/HTTP
+collector. The current span is held in a context variable, so it follows
+the request through the flow tasks down to the device calls.
+"""
+
+import contextlib
+import contextvars
+import functools
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from urllib import request as urllib_request
+
+from oslo_log import log
+
+from dci.common.i18n import _LE
+from dci.conf import CONF
+
+
+LOG = log.getLogger(__name__)
+
+SERVER = 'SPAN_KIND_SERVER'
+CLIENT = 'SPAN_KIND_CLIENT'
+INTERNAL = 'SPAN_KIND_INTERNAL'
+
+_TRACEPARENT = re.compile(
+    r'^00-(?P<trace_id>[0-9a-f]{32})-(?P<span_id>[0-9a-f]{16})-[0-9a-f]{2}$')
+
+_CURRENT_SPAN = contextvars.ContextVar('dci_current_span', default=None)
+
+
+def _new_id(n_bytes):
+    return os.urandom(n_bytes).hex()
+
+
+def _attribute_value(value):
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+class Span(object):
+    """An operation of a trace, serialised as an OTLP span."""
+
+    def __init__(self, name, kind=INTERNAL, parent=None, trace_id=None,
+                 parent_span_id=None, attributes=None):
+        self.name = name
+        self.kind = kind
+        self.trace_id = parent.trace_id if parent else (
+            trace_id or _new_id(16))
+        self.span_id = _new_id(8)
+        self.parent_span_id = parent.span_id if parent else parent_span_id
+        self.attributes = dict(attributes or {})
+        self.status = None
+        self.start_time = time.time_ns()
+        self.end_time = None
+        # The span current when this one started, restored when it ends.
+        self.previous = None
+
+    @property
+    def traceparent(self):
+        return '00-%s-%s-01' % (self.trace_id, self.span_id)
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def record_exception(self, err):
+        self.status = {'code': 'STATUS_CODE_ERROR', 'message': str(err)}
+        self.attributes['exception.type'] = type(err).__name__
+
+    def end(self):
+        if self.end_time is None:
+            self.end_time = time.time_ns()
+            _get_exporter().export(self)
+
+    def to_otlp(self):
+        otlp_span = {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'name': self.name,
+            'kind': self.kind,
+            'startTimeUnixNano': str(self.start_time),
+            'endTimeUnixNano': str(self.end_time),
+            'attributes': [{'key': key, 'value': _attribute_value(value)}
+                           for key, value in self.attributes.items()],
+        }
+        if self.parent_span_id:
+            otlp_span['parentSpanId'] = self.parent_span_id
+        if self.status:
+            otlp_span['status'] = self.status
+        return otlp_span
+
+
+def current_span():
+    """Return the span of the running operation, or None."""
+    return _CURRENT_SPAN.get()
+
+
+def start_span(name, kind=INTERNAL, attributes=None, traceparent=None,
+               root=False):
+    """Start a span as a child of the current one and make it current.
+
+    :param traceparent: optional W3C ``traceparent`` header of the caller,
+                        used when there is no current span.
+    :param root: start a new trace even if there is a current span.
+    :returns: the span, to be passed to ``end_span``, or None when tracing
+              is disabled.
+    """
+    if not CONF.tracing.enabled:
+        return None
+
+    parent = None if root else _CURRENT_SPAN.get()
+    trace_id = parent_span_id = None
+    if parent is None and traceparent:
+        match = _TRACEPARENT.match(traceparent.strip().lower())
+        if match:
+            trace_id = match.group('trace_id')
+            parent_span_id = match.group('span_id')
+
+    new_span = Span(name, kind, parent=parent, trace_id=trace_id,
+                    parent_span_id=parent_span_id, attributes=attributes)
+    new_span.previous = parent
+    _CURRENT_SPAN.set(new_span)
+    return new_span
+
+
+def end_span(started_span, err=None):
+    """End a span started by ``start_span`` and restore its parent."""
+    if started_span is None:
+        return
+    if err is not None:
+        started_span.record_exception(err)
+    started_span.end()
+    # NOTE: Restore the parent even if a child span was left unended.
+    _CURRENT_SPAN.set(started_span.previous)
+
+
+@contextlib.contextmanager
+def span(name, kind=INTERNAL, **attributes):
+    """Run the block in a child span of the current one."""
+    new_span = start_span(name, kind, attributes)
+    try:
+        yield new_span
+    except Exception as err:
+        end_span(new_span, err)
+        raise
+    else:
+        end_span(new_span)
+
+
+class TracedProxy(object):
+    """Wrap a client so that each of its method calls runs in a span.
+
+    :param client: the wrapped client, e.g. a VncApi or ncclient Manager.
+    :param prefix: the prefix of the span names, e.g. ``vnc_api``.
+    :param attributes: the attributes of every span, e.g. the peer host.
+    """
+
+    def __init__(self, client, prefix, attributes=None):
+        self._client = client
+        self._prefix = prefix
+        self._attributes = attributes or {}
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not callable(attr) or name.startswith('_'):
+            return attr
+
+        @functools.wraps(attr)
+        def wrapper(*args, **kwargs):
+            with span('%s.%s' % (self._prefix, name), CLIENT,
+                      **self._attributes):
+                return attr(*args, **kwargs)
+        return wrapper
+
+    def __setattr__(self, name, value):
+        if name.startswith('_'):
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self._client, name, value)
+
+    def __enter__(self):
+        self._client.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        return self._client.__exit__(*exc_info)
+
+
+def traced_client(client, prefix, **attributes):
+    """Return the client wrapped by a TracedProxy when tracing is enabled.
+    """
+    if not CONF.tracing.enabled:
+        return client
+    return TracedProxy(client, prefix, attributes)
+
+
+class TraceContextFilter(logging.Filter):
+    """Add the current trace and span IDs to the log records."""
+
+    def filter(self, record):
+        current = _CURRENT_SPAN.get()
+        record.trace_id = current.trace_id if current else '-'
+        record.span_id = current.span_id if current else '-'
+        return True
+
+
+class TraceContextFormatter(logging.Formatter):
+    """Wrap the formatter of a handler to add the trace and span IDs.
+
+    The IDs are added to the first line of the records logged in a span,
+    whichever of the context and default format strings formats them,
+    unless the configured format already has them.
+    """
+
+    def __init__(self, formatter):
+        super(TraceContextFormatter, self).__init__()
+        self.formatter = formatter
+
+    def format(self, record):
+        text = self.formatter.format(record)
+        current = _CURRENT_SPAN.get()
+        if current is None or current.span_id in text:
+            return text
+        first_line, newline, rest = text.partition('\n')
+        return '%s [trace %s span %s]%s%s' % (
+            first_line, current.trace_id, current.span_id, newline, rest)
+
+
+def setup_logging():
+    """Add the trace and span IDs to the log lines of this process.
+
+    Every handler of the root logger gets a filter setting the
+    ``trace_id`` and ``span_id`` attributes of the records, usable in the
+    format strings, and its formatter is wrapped to add them to the lines
+    otherwise.
+    """
+    if not CONF.tracing.enabled:
+        return
+
+    log_filter = TraceContextFilter()
+    for handler in logging.getLogger().handlers:
+        handler.addFilter(log_filter)
+        if not isinstance(handler.formatter, TraceContextFormatter):
+            handler.setFormatter(TraceContextFormatter(
+                handler.formatter or logging.Formatter()))
+
+
+class BatchExporter(object):
+    """Export the finished spans in batches from a background thread."""
+
+    def __init__(self):
+        self._queue = queue.Queue(CONF.tracing.max_queue_size)
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _ensure_thread(self):
+        # NOTE: Threads do not survive the fork of the API workers.
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._pid = os.getpid()
+                    threading.Thread(target=self._run, daemon=True).start()
+
+    def export(self, finished_span):
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(finished_span)
+        except queue.Full:
+            LOG.debug("Trace span %s dropped, the export queue is full.",
+                      finished_span.name)
+
+    def _run(self):
+        while True:
+            time.sleep(CONF.tracing.export_interval)
+            spans = []
+            while True:
+                try:
+                    spans.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if spans:
+                try:
+                    self._write(self._to_otlp(spans))
+                except Exception as err:
+                    LOG.error(_LE("Failed to export %(count)d trace spans, "
+                                  "details %(err)s"),
+                              {'count': len(spans), 'err': err})
+
+    @staticmethod
+    def _to_otlp(spans):
+        return {'resourceSpans': [{
+            'resource': {'attributes': [
+                {'key': 'service.name',
+                 'value': _attribute_value(CONF.tracing.service_name)},
+                {'key': 'process.pid',
+                 'value': _attribute_value(os.getpid())}]},
+            'scopeSpans': [{
+                'scope': {'name': 'dci-controller'},
+                'spans': [finished_span.to_otlp() for finished_span in spans],
+            }],
+        }]}
+
+    @staticmethod
+    def _write(document):
+        if CONF.tracing.exporter == 'otlp_http':
+            req = urllib_request.Request(
+                CONF.tracing.otlp_endpoint,
+                data=json.dumps(document).encode('utf-8'),
+                headers={'Content-Type': 'application/json'})
+            urllib_request.urlopen(req, timeout=10).close()
+        else:
+            with open(CONF.tracing.file_path, 'a') as f:
+                f.write(json.dumps(document) + '\n')
+
+
+_EXPORTER = None
+
+
+def _get_exporter():
+    global _EXPORTER
+    if _EXPORTER is None:
+        _EXPORTER = BatchExporter()
+    return _EXPORTER
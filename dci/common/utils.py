@@ -12,9 +12,14 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from concurrent import futures
+import contextvars
+import eventlet
 import netaddr
 import random
 
+from dci.common import executor
+
 
 def get_shortened_ipv6(address):
     addr = netaddr.IPAddress(address, version=6)
@@ -40,3 +45,38 @@ def generate_random_bridge_domain():
 
 def generate_random_vlan_id():
     return str(random.randint(3, 4095))
+
+
+def concurrent_map(func, items, max_workers):
+    """Call ``func`` on every item, at most ``max_workers`` at once.
+
+    Called from an eventlet greenthread, the calls are handed from a pool of
+    greenthreads to the native threads of ``dci.common.executor``, so that the
+    API worker keeps serving the other requests while they run. Otherwise,
+    e.g. from a native thread, they run in a pool of native threads.
+
+    :returns: a list of ``(result, error)`` tuples in the order of ``items``,
+              ``error`` is the exception raised by ``func`` or None.
+    """
+
+    def _call(item):
+        try:
+            return func(item), None
+        except Exception as err:
+            return None, err
+
+    if not items:
+        return []
+
+    pool_size = max(1, min(max_workers, len(items)))
+    if executor.offloads():
+        pool = eventlet.GreenPool(pool_size)
+        return list(pool.imap(
+            lambda item: executor.execute(_call, item), items))
+
+    # NOTE: Every call runs in a copy of the caller context, so that the
+    # current trace span follows the work into the pool threads.
+    with futures.ThreadPoolExecutor(max_workers=pool_size) as pool:
+        calls = [pool.submit(contextvars.copy_context().run, _call, item)
+                 for item in items]
+        return [call.result() for call in calls]
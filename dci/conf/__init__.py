@@ -1,9 +1,27 @@
 from oslo_config import cfg
 
 from dci.conf import api
+from dci.conf import circuit_breaker
+from dci.conf import compression
+from dci.conf import connection_pool
 from dci.conf import db
+from dci.conf import device
+from dci.conf import metrics
+from dci.conf import netconf_transport
+from dci.conf import profiler
+from dci.conf import taskflow
+from dci.conf import tracing
 
 CONF = cfg.CONF
 
 api.register_opts(CONF)
+circuit_breaker.register_opts(CONF)
+compression.register_opts(CONF)
+connection_pool.register_opts(CONF)
 db.register_opts(CONF)
+device.register_opts(CONF)
+metrics.register_opts(CONF)
+netconf_transport.register_opts(CONF)
+profiler.register_opts(CONF)
+taskflow.register_opts(CONF)
+tracing.register_opts(CONF)
@@ -56,6 +56,115 @@ opts = [
     cfg.BoolOpt('enable_mock_for_ue_ip',
                 default=False,
                 help="Mock Test UE IP for WSGI definition of API."),
+    cfg.IntOpt('response_cache_size',
+               default=1024,
+               min=0,
+               help=_('Maximum number of serialised resources kept in the '
+                      'per-worker response cache used to answer conditional '
+                      'GET requests. Set to 0 to disable the cache.')),
+    cfg.IntOpt('response_cache_ttl',
+               default=5,
+               min=0,
+               help=_('Number of seconds a cached resource is served before '
+                      'it is reloaded from the database. This bounds how '
+                      'long a write made through another API worker can go '
+                      'unnoticed. Set to 0 to never expire entries.')),
+    cfg.IntOpt('inventory_cache_size',
+               default=1024,
+               min=0,
+               help=_('Maximum number of sites and WAN nodes kept in the '
+                      'per-worker inventory cache, which spares the slicing '
+                      'requests the database reads of their sites. Set to 0 '
+                      'to disable the cache.')),
+    cfg.IntOpt('inventory_cache_ttl',
+               default=5,
+               min=0,
+               help=_('Number of seconds a cached site or WAN node is used '
+                      'before it is read again from the database. This '
+                      'bounds how long a write made through another API '
+                      'worker can go unnoticed. Set to 0 to never expire '
+                      'entries.')),
+    cfg.IntOpt('read_your_writes_window',
+               default=5,
+               min=0,
+               help=_('When [database] slave_connection is configured, read '
+                      'only requests are served from the slave database. '
+                      'A client that created, updated or deleted a resource '
+                      'reads from the primary database for this number of '
+                      'seconds afterwards, so it sees its own writes despite '
+                      'replication lag. The time of its last write is '
+                      'returned in a signed cookie when '
+                      'read_your_writes_secret is set. Otherwise clients are '
+                      'identified by address and tracked per API worker, '
+                      'which is best effort: a read served by another '
+                      'worker, or a client sharing its address, e.g. behind '
+                      'a proxy, does not see it. Set to 0 to always read '
+                      'from the slave database.')),
+    cfg.StrOpt('read_your_writes_secret',
+               secret=True,
+               help=_('Secret signing the cookie carrying the time of the '
+                      'last write of a client, so that any API worker of any '
+                      'host routes its reads to the primary database. It '
+                      'must be the same on all the hosts.')),
+    cfg.IntOpt('bulk_max_workers',
+               default=16,
+               min=1,
+               help=_('Maximum number of items of a bulk request that are '
+                      'processed concurrently, e.g. the reachability checks '
+                      'of the sites and WAN nodes being created.')),
+    cfg.IntOpt('subnet_index_ttl',
+               default=60,
+               min=0,
+               help=_('Number of seconds after which the per-worker index of '
+                      'the slicing subnets and allocation pools, used to '
+                      'reject overlapping slicings, is rebuilt from the '
+                      'database. This bounds how long a slicing created '
+                      'through another API worker can go unnoticed. Set to '
+                      '0 to never rebuild the index.')),
+    cfg.IntOpt('request_timeout',
+               default=0,
+               min=0,
+               help=_('Overall time budget, in seconds, of the slicing '
+                      'create and delete requests. The flow tasks, the '
+                      'NETCONF RPCs and the VNC API calls get the budget '
+                      'left, and the flow reverts at once when it is spent. '
+                      'Clients can lower it with the X-DCI-Request-Timeout '
+                      'header. Set to 0 to not bound the requests.')),
+    cfg.IntOpt('idempotency_key_ttl',
+               default=86400,
+               min=1,
+               help=_('Number of seconds the outcome of a create request '
+                      'sent with an Idempotency-Key header is kept. A retry '
+                      'of the request with the same key in that time gets '
+                      'the resource created by the first one instead of '
+                      'creating another one.')),
+    cfg.IntOpt('idempotency_lease_timeout',
+               default=900,
+               min=1,
+               help=_('Number of seconds a request with an Idempotency-Key '
+                      'header holds its key while it runs. The key of a '
+                      'request whose API worker died is taken over by a '
+                      'retry after that time. It should exceed the longest '
+                      'slicing creation.')),
+    cfg.IntOpt('idempotency_wait_timeout',
+               default=30,
+               min=0,
+               help=_('Number of seconds a retry waits for the outcome of '
+                      'a request with the same Idempotency-Key which is '
+                      'still running, before it fails with 409 Conflict.')),
+    cfg.BoolOpt('fast_json_renderer',
+                default=True,
+                help=_('Render the JSON responses with converters compiled '
+                       'once per resource type, and with orjson when it is '
+                       'installed, instead of the WSME JSON renderer. The '
+                       'documents are the same, without the blanks.')),
+    cfg.IntOpt('json_stream_threshold',
+               default=1000,
+               min=0,
+               help=_('Number of items from which a collection is rendered '
+                      'and sent in chunks, without a Content-Length, as it '
+                      'is serialised. Requires fast_json_renderer. Set to '
+                      '0 to never stream the collections.')),
 ]
 
 opt_group = cfg.OptGroup(name='api',
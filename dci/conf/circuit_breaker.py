@@ -0,0 +1,56 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from oslo_config import cfg
+
+from dci.common.i18n import _
+
+
+opts = [
+    cfg.BoolOpt('enabled',
+                default=True,
+                help=_('Fail the connections to a NETCONF server or a '
+                       'Tungsten Fabric VNC API server at once while it is '
+                       'known to be unreachable, instead of waiting for the '
+                       'connect timeout on every request.')),
+    cfg.IntOpt('failure_threshold',
+               default=3,
+               min=1,
+               help=_('Number of consecutive failed connections after which '
+                      'the circuit breaker of an endpoint opens.')),
+    cfg.IntOpt('reset_timeout',
+               default=30,
+               min=1,
+               help=_('Number of seconds an open circuit breaker fails the '
+                      'connections at once, before it lets one probe '
+                      'connection through to check if the endpoint is '
+                      'back.')),
+]
+
+opt_group = cfg.OptGroup(name='circuit_breaker',
+                         title='Options for the circuit breakers of the '
+                               'device and SDN controller endpoints')
+
+CIRCUIT_BREAKER_OPTS = (opts)
+
+
+def register_opts(conf):
+    conf.register_group(opt_group)
+    conf.register_opts(opts, group=opt_group)
+
+
+def list_opts():
+    return {
+        opt_group: CIRCUIT_BREAKER_OPTS
+    }
@@ -0,0 +1,57 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+from oslo_config import cfg
+
+from dci.common.i18n import _
+
+
+opts = [
+    cfg.BoolOpt('enabled',
+                default=True,
+                help=_('Compress the responses of the API for the clients '
+                       'accepting the gzip or deflate content coding.')),
+    cfg.IntOpt('min_size',
+               default=1024,
+               min=0,
+               help=_('Number of bytes from which a response body is '
+                      'compressed. The smaller ones are sent as they are, '
+                      'their compression saving less than it costs. The '
+                      'streamed collections are always compressed.')),
+    cfg.IntOpt('level',
+               default=6,
+               min=1,
+               max=9,
+               help=_('Compression level, from 1, the fastest, to 9, the '
+                      'smallest.')),
+    cfg.ListOpt('content_types',
+                default=['application/json'],
+                help=_('Media types of the responses to compress.')),
+]
+
+opt_group = cfg.OptGroup(name='compression',
+                         title='Options for the compression of the API '
+                               'responses')
+
+COMPRESSION_OPTS = (opts)
+
+
+def register_opts(conf):
+    conf.register_group(opt_group)
+    conf.register_opts(opts, group=opt_group)
+
+
+def list_opts():
+    return {
+        opt_group: COMPRESSION_OPTS
+    }
@@ -0,0 +1,75 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from oslo_config import cfg
+
+from dci.common.i18n import _
+
+
+opts = [
+    cfg.IntOpt('netconf_max_idle',
+               default=1,
+               min=0,
+               help=_('Number of idle NETCONF sessions every API worker '
+                      'keeps open per WAN node for the next operations. 0 '
+                      'closes every session at the end of its '
+                      'operation.')),
+    cfg.IntOpt('tf_max_idle',
+               default=2,
+               min=0,
+               help=_('Number of idle Tungsten Fabric VNC API clients every '
+                      'API worker keeps authenticated per Tungsten Fabric '
+                      'project for the next calls. 0 authenticates a new '
+                      'client for every operation.')),
+    cfg.IntOpt('idle_timeout',
+               default=300,
+               min=1,
+               help=_('Number of seconds after which an idle NETCONF '
+                      'session or Tungsten Fabric client is closed instead '
+                      'of being reused.')),
+    cfg.BoolOpt('warm_up',
+                default=False,
+                help=_('When an API worker starts, authenticate a Tungsten '
+                       'Fabric client for every active site and open a '
+                       'NETCONF session to every active WAN node, so that '
+                       'the first requests find them in the pools.')),
+    cfg.IntOpt('warm_up_timeout',
+               default=60,
+               min=1,
+               help=_('Number of seconds the warm-up of an API worker may '
+                      'take, the connections still opening are then given '
+                      'up.')),
+    cfg.IntOpt('warm_up_concurrency',
+               default=8,
+               min=1,
+               help=_('Number of connections the warm-up of an API worker '
+                      'opens at once.')),
+]
+
+opt_group = cfg.OptGroup(name='connection_pool',
+                         title='Options for the pools of the NETCONF '
+                               'sessions and Tungsten Fabric clients')
+
+CONNECTION_POOL_OPTS = (opts)
+
+
+def register_opts(conf):
+    conf.register_group(opt_group)
+    conf.register_opts(opts, group=opt_group)
+
+
+def list_opts():
+    return {
+        opt_group: CONNECTION_POOL_OPTS
+    }
@@ -0,0 +1,132 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from oslo_config import cfg
+
+from dci.common.i18n import _
+
+
+opts = [
+    cfg.StrOpt('executor',
+               default='tpool',
+               choices=[('tpool', _('Run the device driver calls made by '
+                                    'the eventlet greenthreads of the API '
+                                    'in the eventlet pool of native '
+                                    'threads.')),
+                        ('inline', _('Run the device driver calls in the '
+                                     'calling thread.'))],
+               help=_('How the blocking NETCONF and SSH work of the device '
+                      'drivers is run. With tpool, a slow WAN node only '
+                      'holds a native thread instead of stalling every '
+                      'request served by the same API worker.')),
+    cfg.IntOpt('executor_pool_size',
+               default=20,
+               min=1,
+               help=_('Number of native threads of every API worker running '
+                      'the device driver calls when executor is tpool. '
+                      'Further calls wait for a free thread.')),
+    cfg.IntOpt('netconf_connect_timeout',
+               default=120,
+               min=1,
+               help=_('Number of seconds to wait for the NETCONF session of '
+                      'a WAN node to be established.')),
+    cfg.IntOpt('netconf_rpc_timeout',
+               default=30,
+               min=1,
+               help=_('Number of seconds to wait for the reply of a NETCONF '
+                      'RPC.')),
+    cfg.BoolOpt('netconf_pipelining',
+                default=True,
+                help=_('Send the NETCONF RPCs which do not depend on each '
+                       'other, e.g. the discard-changes, edit-config and '
+                       'validate of a configuration change or the '
+                       'get-configs of the state of a WAN node, on one '
+                       'session before waiting for their replies. This '
+                       'saves round trips on high latency management '
+                       'links.')),
+    cfg.BoolOpt('coordinated_commit',
+                default=False,
+                help=_('Commit the VPNs of the east and west WAN nodes of a '
+                       'slicing together: both changes are validated in '
+                       'parallel, then committed with a confirmed commit on '
+                       'both WAN nodes, and confirmed only when both '
+                       'confirmed commits succeeded. Otherwise the WAN nodes '
+                       'roll them back by themselves, instead of the '
+                       'change of the first WAN node being deleted by '
+                       'another edit-config. The WAN nodes must support the '
+                       'NETCONF :confirmed-commit capability.')),
+    cfg.IntOpt('confirmed_commit_timeout',
+               default=120,
+               min=1,
+               help=_('Number of seconds a WAN node waits for the confirm '
+                      'of a coordinated commit before rolling it back.')),
+    cfg.BoolOpt('serialize_mutations',
+                default=True,
+                help=_('Queue the configuration changes of every WAN node '
+                       'in the database and apply them one at a time, in '
+                       'order, across all the API workers, instead of '
+                       'letting concurrent requests collide on the lock of '
+                       'the device running datastore.')),
+    cfg.BoolOpt('queue_coalescing',
+                default=True,
+                help=_('Let a change join an identical change still waiting '
+                       'in the queue of the WAN node, e.g. the retries of a '
+                       'slicing delete, rather than apply it twice.')),
+    cfg.FloatOpt('queue_poll_interval',
+                 default=0.5,
+                 min=0.01,
+                 help=_('Number of seconds between two checks of the queue '
+                        'of a WAN node by a waiting change.')),
+    cfg.IntOpt('queue_timeout',
+               default=300,
+               min=1,
+               help=_('Maximum number of seconds a change waits for its '
+                      'turn in the queue of a WAN node before it fails.')),
+    cfg.IntOpt('queue_lease_timeout',
+               default=60,
+               min=3,
+               help=_('Number of seconds after which a change that is not '
+                      'refreshed by its worker, e.g. because the worker '
+                      'died, is dropped from the queue. The worker refreshes '
+                      'a running change every third of it. It must be '
+                      'shorter than queue_timeout, so that the changes '
+                      'queued behind a dead worker get their turn.')),
+    cfg.IntOpt('state_cache_refresh_interval',
+               default=300,
+               min=0,
+               help=_('Number of seconds the per-worker snapshot of the '
+                      'bridge domains, EVPN instances and VNIs of a WAN '
+                      'node is used before it is read again in full with '
+                      'a get-config. The commits made by the worker update '
+                      'it in between, so this bounds how long a change made '
+                      'by another worker or on the device itself can go '
+                      'unnoticed. Set to 0 to disable the snapshots and the '
+                      'bridge domain pre-checks of the slicing creations.')),
+]
+
+opt_group = cfg.OptGroup(name='device',
+                         title='Options for the device drivers')
+
+DEVICE_OPTS = (opts)
+
+
+def register_opts(conf):
+    conf.register_group(opt_group)
+    conf.register_opts(opts, group=opt_group)
+
+
+def list_opts():
+    return {
+        opt_group: DEVICE_OPTS
+    }
@@ -0,0 +1,53 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from oslo_config import cfg
+
+from dci.common.i18n import _
+
+
+opts = [
+    cfg.BoolOpt('enabled',
+                default=False,
+                help=_('Record latency histograms and error counters of the '
+                       'API routes, the database, the Tungsten Fabric and '
+                       'the NETCONF calls, and serve them on /metrics in '
+                       'the Prometheus text format.')),
+    cfg.StrOpt('data_dir',
+               default='/var/lib/dci-controller/metrics',
+               help=_('Directory where every API worker writes its metrics, '
+                      'so that /metrics aggregates all the workers. It is '
+                      'emptied when dci-controller-api starts.')),
+    cfg.IntOpt('flush_interval',
+               default=5,
+               min=0,
+               help=_('Maximum number of seconds between two writes of the '
+                      'metrics of a worker to the data directory.')),
+]
+
+opt_group = cfg.OptGroup(name='metrics',
+                         title='Options for the metrics of the API')
+
+METRICS_OPTS = (opts)
+
+
+def register_opts(conf):
+    conf.register_group(opt_group)
+    conf.register_opts(opts, group=opt_group)
+
+
+def list_opts():
+    return {
+        opt_group: METRICS_OPTS
+    }
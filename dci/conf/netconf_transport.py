@@ -0,0 +1,104 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import copy
+
+from oslo_config import cfg
+
+from dci.common.i18n import _
+
+
+opts = [
+    cfg.IntOpt('connect_timeout',
+               min=1,
+               help=_('Number of seconds to wait for the NETCONF session to '
+                      'be established. Defaults to [device] '
+                      'netconf_connect_timeout.')),
+    cfg.IntOpt('rpc_timeout',
+               min=1,
+               help=_('Number of seconds to wait for the reply of a NETCONF '
+                      'RPC. Defaults to [device] netconf_rpc_timeout.')),
+    cfg.IntOpt('keepalive_interval',
+               default=0,
+               min=0,
+               help=_('Number of seconds without traffic after which an SSH '
+                      'keepalive is sent on the NETCONF session, so that '
+                      'firewalls and NAT devices keep it open. 0 disables '
+                      'the keepalives.')),
+    cfg.ListOpt('kex_algorithms',
+                default=[],
+                help=_('SSH key exchange algorithms to offer, in order of '
+                       'preference, e.g. ecdh-sha2-nistp256 to avoid the '
+                       'costly Diffie-Hellman group exchanges on '
+                       'constrained routers. Empty offers the paramiko '
+                       'defaults.')),
+    cfg.ListOpt('ciphers',
+                default=[],
+                help=_('SSH ciphers to offer, in order of preference, e.g. '
+                       'aes128-ctr. Empty offers the paramiko defaults.')),
+    cfg.BoolOpt('compression',
+                default=False,
+                help=_('Compress the SSH transport, which helps the large '
+                       'get-config replies on slow management links.')),
+    cfg.BoolOpt('tcp_nodelay',
+                default=True,
+                help=_('Disable the Nagle algorithm on the TCP connection, '
+                       'so that the small RPCs are not delayed waiting for '
+                       'the acknowledgement of the previous ones.')),
+]
+
+opt_group = cfg.OptGroup(name='netconf_transport',
+                         title='Options for the default SSH transport '
+                               'profile of the NETCONF sessions')
+
+NETCONF_TRANSPORT_OPTS = (opts)
+
+# The group of the profile ``name`` is named PROFILE_GROUP % name.
+PROFILE_GROUP = 'netconf_transport:%s'
+
+
+def _profile_opt(opt):
+    # NOTE: The options a profile leaves unset take the value of the
+    # [netconf_transport] group.
+    opt = copy.deepcopy(opt)
+    opt.default = None
+    return opt
+
+
+PROFILE_OPTS = [_profile_opt(opt) for opt in opts]
+
+
+def register_opts(conf):
+    conf.register_group(opt_group)
+    conf.register_opts(opts, group=opt_group)
+
+
+def register_profile(conf, name):
+    """Register the options of a named profile and return its group.
+
+    The profiles are the ``[netconf_transport:<name>]`` sections named by
+    the ``netconf_transport_profile`` of the WAN nodes.
+    """
+    group = cfg.OptGroup(name=PROFILE_GROUP % name,
+                         title='Options for the %s SSH transport profile of '
+                               'the NETCONF sessions' % name)
+    conf.register_group(group)
+    conf.register_opts(PROFILE_OPTS, group=group)
+    return conf[group.name]
+
+
+def list_opts():
+    return {
+        opt_group: NETCONF_TRANSPORT_OPTS
+    }
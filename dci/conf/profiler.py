@@ -0,0 +1,73 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from oslo_config import cfg
+
+from dci.common.i18n import _
+
+
+opts = [
+    cfg.BoolOpt('enabled',
+                default=False,
+                help=_('Enable the per-request profiling middleware of the '
+                       'API. Profiled requests are selected by the trigger '
+                       'header or by the sample rate.')),
+    cfg.StrOpt('trigger_header',
+               default='X-DCI-Profile',
+               help=_('Name of the request header which asks for the '
+                      'request to be profiled.')),
+    cfg.StrOpt('trigger_secret',
+               secret=True,
+               help=_('When set, the trigger header only profiles the '
+                      'request if its value equals this secret.')),
+    cfg.FloatOpt('sample_rate',
+                 default=0.0,
+                 min=0.0,
+                 max=1.0,
+                 help=_('Fraction of the requests profiled without the '
+                        'trigger header, from 0.0 to 1.0.')),
+    cfg.StrOpt('mode',
+               default='cprofile',
+               choices=[('cprofile', _('Deterministic profiling with '
+                                       'cProfile, written as a pstats '
+                                       'file.')),
+                        ('sampling', _('Stack sampling of the request '
+                                       'thread, written as flamegraph-ready '
+                                       'folded stacks.'))],
+               help=_('How the profiled requests are captured.')),
+    cfg.FloatOpt('sampling_interval',
+                 default=0.005,
+                 min=0.0001,
+                 help=_('Seconds between two stack samples in sampling '
+                        'mode.')),
+    cfg.StrOpt('spool_dir',
+               default='/var/lib/dci-controller/profiles',
+               help=_('Directory the profiles are written to.')),
+]
+
+opt_group = cfg.OptGroup(name='profiler',
+                         title='Options for the API profiling middleware')
+
+PROFILER_OPTS = (opts)
+
+
+def register_opts(conf):
+    conf.register_group(opt_group)
+    conf.register_opts(opts, group=opt_group)
+
+
+def list_opts():
+    return {
+        opt_group: PROFILER_OPTS
+    }
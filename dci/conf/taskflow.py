@@ -0,0 +1,62 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from oslo_config import cfg
+
+from dci.common.i18n import _
+
+
+opts = [
+    cfg.BoolOpt('persistence',
+                default=True,
+                help=_('Record the progress of the slicing creation flows '
+                       'in the taskflow logbook tables of the controller '
+                       'database, so that a flow interrupted by the death '
+                       'of its API worker can be resumed from its last '
+                       'completed task.')),
+    cfg.BoolOpt('resume_on_start',
+                default=True,
+                help=_('Run, from the start of dci-controller-api, a '
+                       'process resuming the slicing creation flows whose '
+                       'API worker died, on any host, every '
+                       'resume_interval seconds.')),
+    cfg.IntOpt('resume_interval',
+               default=60,
+               min=1,
+               help=_('Number of seconds between two scans for the slicing '
+                      'creation flows to resume.')),
+    cfg.IntOpt('lease_timeout',
+               default=60,
+               min=3,
+               help=_('Number of seconds after which the slicing creation '
+                      'flow of a worker which stopped renewing its lease, '
+                      'e.g. because it died, may be resumed by another '
+                      'process. The leases are renewed every third of it.')),
+]
+
+opt_group = cfg.OptGroup(name='taskflow',
+                         title='Options for the slicing flows')
+
+TASKFLOW_OPTS = (opts)
+
+
+def register_opts(conf):
+    conf.register_group(opt_group)
+    conf.register_opts(opts, group=opt_group)
+
+
+def list_opts():
+    return {
+        opt_group: TASKFLOW_OPTS
+    }
@@ -0,0 +1,73 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from oslo_config import cfg
+
+from dci.common.i18n import _
+
+
+opts = [
+    cfg.BoolOpt('enabled',
+                default=False,
+                help=_('Record trace spans for the API requests, the slicing '
+                       'flow tasks, and the Tungsten Fabric VNC API and '
+                       'ncclient calls. The W3C traceparent request header '
+                       'is honoured, and the trace and span IDs are added '
+                       'to the log records as the trace_id and span_id '
+                       'attributes, shown by the default context format '
+                       'string.')),
+    cfg.StrOpt('exporter',
+               default='file',
+               choices=[('file', _('Append the spans to a local file, one '
+                                   'OTLP JSON document per line.')),
+                        ('otlp_http', _('Post the spans in the OTLP/HTTP '
+                                        'JSON encoding to a collector.'))],
+               help=_('Where the finished spans are exported to.')),
+    cfg.StrOpt('file_path',
+               default='/var/log/dci-controller/traces.jsonl',
+               help=_('File the spans are appended to by the file '
+                      'exporter.')),
+    cfg.URIOpt('otlp_endpoint',
+               default='http://127.0.0.1:4318/v1/traces',
+               help=_('OTLP/HTTP traces endpoint of the collector.')),
+    cfg.StrOpt('service_name',
+               default='dci-controller-api',
+               help=_('The service.name resource attribute of the spans.')),
+    cfg.FloatOpt('export_interval',
+                 default=5.0,
+                 min=0.1,
+                 help=_('Seconds between two exports of the finished '
+                        'spans.')),
+    cfg.IntOpt('max_queue_size',
+               default=2048,
+               min=1,
+               help=_('Maximum number of finished spans waiting to be '
+                      'exported, the spans beyond are dropped.')),
+]
+
+opt_group = cfg.OptGroup(name='tracing',
+                         title='Options for the distributed tracing')
+
+TRACING_OPTS = (opts)
+
+
+def register_opts(conf):
+    conf.register_group(opt_group)
+    conf.register_opts(opts, group=opt_group)
+
+
+def list_opts():
+    return {
+        opt_group: TRACING_OPTS
+    }
@@ -13,6 +13,7 @@
 #    under the License.
 
 import abc
+import contextvars
 
 from oslo_config import cfg
 from oslo_db import api as db_api
@@ -23,12 +24,41 @@ IMPL = db_api.DBAPI.from_config(cfg.CONF,
                                 backend_mapping=_BACKEND_MAPPING,
                                 lazy=True)
 
+# NOTE: A context variable, so that every greenthread serving a request
+# has its own routing.
+_READ_FROM_PRIMARY = contextvars.ContextVar('read_from_primary',
+                                            default=False)
+
 
 def get_instance():
     """Return a DB API instance."""
     return IMPL
 
 
+def set_read_from_primary(value):
+    """Route the reads of the current context to the primary database.
+
+    By default the read only queries run against the slave database when
+    ``[database] slave_connection`` is configured.
+
+    :returns: a token restoring the previous routing, see
+              :func:`reset_read_from_primary`.
+    """
+    return _READ_FROM_PRIMARY.set(value)
+
+
+def reset_read_from_primary(token):
+    """Restore the routing the token of :func:`set_read_from_primary` was
+    returned with.
+    """
+    _READ_FROM_PRIMARY.reset(token)
+
+
+def is_read_from_primary():
+    """Whether the reads of the current context go to the primary database."""
+    return _READ_FROM_PRIMARY.get()
+
+
 class Connection(object, metaclass=abc.ABCMeta):
     """Base class for storage system connections."""
 
@@ -57,6 +87,14 @@ class Connection(object, metaclass=abc.ABCMeta):
     def site_delete(self, context, uuid):
         """delete a DCI site."""
 
+    @abc.abstractmethod
+    def site_bulk_create(self, context, values_list):
+        """Create DCI sites in a single transaction."""
+
+    @abc.abstractmethod
+    def site_bulk_delete(self, context, uuids):
+        """delete DCI sites in a single transaction."""
+
     # wan_nodes
     @abc.abstractmethod
     def wan_node_create(self, context, values):
@@ -78,10 +116,24 @@ class Connection(object, metaclass=abc.ABCMeta):
     def wan_node_delete(self, context, uuid):
         """delete a WAN node."""
 
+    @abc.abstractmethod
+    def wan_node_bulk_create(self, context, values_list):
+        """Create WAN nodes in a single transaction."""
+
+    @abc.abstractmethod
+    def wan_node_bulk_delete(self, context, uuids):
+        """delete WAN nodes in a single transaction."""
+
     # evpn_vpls_over_srv6_be_slicings
     @abc.abstractmethod
-    def evpn_vpls_over_srv6_be_slicing_create(self, context, values):
-        """Create a new EVPN VPLS over SRv6 BE network slicing."""
+    def evpn_vpls_over_srv6_be_slicing_create(self, context, values,
+                                              idempotency=None):
+        """Create a new EVPN VPLS over SRv6 BE network slicing.
+
+        :param idempotency: optional ``(route, values)`` update of the
+                            Idempotency-Key record of the slicing, made in
+                            the same transaction.
+        """
 
     @abc.abstractmethod
     def evpn_vpls_over_srv6_be_slicing_get(self, context, uuid):
@@ -98,3 +150,112 @@ class Connection(object, metaclass=abc.ABCMeta):
     @abc.abstractmethod
     def evpn_vpls_over_srv6_be_slicing_delete(self, context, uuid):
         """delete a WAN node."""
+
+    @abc.abstractmethod
+    def evpn_vpls_over_srv6_be_slicing_bulk_delete(self, context, uuids):
+        """delete EVPN VPLS over SRv6 BE network slicings in a single
+        transaction.
+        """
+
+    # slicing_stage_timings
+    @abc.abstractmethod
+    def slicing_stage_timing_bulk_create(self, context, values_list):
+        """Create the stage timings of a slicing flow run."""
+
+    @abc.abstractmethod
+    def slicing_stage_timing_list(self, context, slicing_uuid):
+        """Get the stage timings of a slicing."""
+
+    # wan_node_work_items
+    @abc.abstractmethod
+    def wan_node_work_item_create(self, context, values):
+        """Enqueue a work item for a WAN node."""
+
+    @abc.abstractmethod
+    def wan_node_work_item_get(self, context, item_id):
+        """Get a work item, or None if it has been purged."""
+
+    @abc.abstractmethod
+    def wan_node_work_item_update(self, context, item_id, values):
+        """Update a work item."""
+
+    @abc.abstractmethod
+    def wan_node_work_item_delete(self, context, item_id):
+        """Remove a work item from the queue."""
+
+    @abc.abstractmethod
+    def wan_node_work_item_list_pending(self, context, wan_node_uuid, now):
+        """Get the queued and running unexpired work items of a WAN node,
+        in queue order.
+        """
+
+    @abc.abstractmethod
+    def wan_node_work_item_purge(self, context, now):
+        """Delete the work items expired before now."""
+
+    # idempotency_keys
+    @abc.abstractmethod
+    def idempotency_key_create(self, context, values):
+        """Record the Idempotency-Key of a request.
+
+        :raises: IdempotencyKeyExists if the key is already recorded for the
+                 route.
+        """
+
+    @abc.abstractmethod
+    def idempotency_key_get(self, context, idempotency_key, route):
+        """Get the record of an Idempotency-Key, or None."""
+
+    @abc.abstractmethod
+    def idempotency_key_update(self, context, idempotency_key, route, values,
+                               expected=None):
+        """Update the record of an Idempotency-Key.
+
+        :param expected: only update the record if its columns still have
+                         these values, e.g. its state and expiry.
+        :returns: whether the record was updated.
+        """
+
+    @abc.abstractmethod
+    def idempotency_key_update_by_resource(self, context, route,
+                                           resource_uuid, values,
+                                           expected=None):
+        """Update the record of the Idempotency-Key creating a resource.
+
+        :param expected: optional column values the record must have.
+        :returns: whether a record was updated.
+        """
+
+    @abc.abstractmethod
+    def idempotency_key_purge(self, context, now):
+        """Delete the Idempotency-Key records expired before now."""
+
+    # flow_leases
+    @abc.abstractmethod
+    def flow_lease_create(self, context, values):
+        """Record the lease of a slicing flow.
+
+        :returns: whether it was recorded, False if the flow already has a
+                  lease.
+        """
+
+    @abc.abstractmethod
+    def flow_lease_list(self, context):
+        """Get the leases of all the slicing flows."""
+
+    @abc.abstractmethod
+    def flow_lease_renew(self, context, holder, flow_uuids, expires_at):
+        """Extend the leases of the slicing flows of a holder."""
+
+    @abc.abstractmethod
+    def flow_lease_take_over(self, context, flow_uuid, holder, now,
+                             expires_at):
+        """Give an expired lease of a slicing flow to a new holder.
+
+        :returns: whether the lease was taken over, False if it was renewed
+                  or taken over by another holder in between.
+        """
+
+    @abc.abstractmethod
+    def flow_lease_delete(self, context, flow_uuids):
+        """Delete the leases of slicing flows."""
@@ -0,0 +1,31 @@
+"""add flow leases
+
+Revision ID: 2b8d5e7f1a36
+Revises: 9a4f2c7d1e58
+Create Date: 2026-10-20 09:14:52.318207
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2b8d5e7f1a36'
+down_revision = '9a4f2c7d1e58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('flow_leases',
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('flow_uuid', sa.String(length=36), nullable=False),
+    sa.Column('holder', sa.String(length=255), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('flow_uuid')
+    )
+
+
+def downgrade():
+    op.drop_table('flow_leases')
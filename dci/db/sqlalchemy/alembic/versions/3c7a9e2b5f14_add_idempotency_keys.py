@@ -0,0 +1,35 @@
+"""add idempotency keys
+
+Revision ID: 3c7a9e2b5f14
+Revises: 8b3e6f0d2c91
+Create Date: 2026-10-19 21:02:11.804615
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c7a9e2b5f14'
+down_revision = '8b3e6f0d2c91'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('idempotency_keys',
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('idempotency_key', sa.String(length=255), nullable=False),
+    sa.Column('route', sa.String(length=64), nullable=False),
+    sa.Column('request_hash', sa.String(length=64), nullable=False),
+    sa.Column('state', sa.String(length=16), nullable=False),
+    sa.Column('resource_uuid', sa.String(length=36), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('idempotency_key', 'route')
+    )
+
+
+def downgrade():
+    op.drop_table('idempotency_keys')
@@ -0,0 +1,44 @@
+"""add slicing stage timings
+
+Revision ID: 5d2f8c1e4a7b
+Revises: ec0a59a3db83
+Create Date: 2026-10-19 18:02:11.204871
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d2f8c1e4a7b'
+down_revision = 'ec0a59a3db83'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('slicing_stage_timings',
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('slicing_uuid', sa.String(length=36), nullable=False),
+    sa.Column('stage', sa.String(length=64), nullable=False),
+    sa.Column('state', sa.String(length=16), nullable=False),
+    sa.Column('site_uuid', sa.String(length=36), nullable=True),
+    sa.Column('wan_node_uuid', sa.String(length=36), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=False),
+    sa.Column('ended_at', sa.DateTime(), nullable=True),
+    sa.Column('revert_started_at', sa.DateTime(), nullable=True),
+    sa.Column('revert_ended_at', sa.DateTime(), nullable=True),
+    sa.Column('retries', sa.Integer(), nullable=False),
+    sa.Column('reverts', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_slicing_stage_timings_slicing_uuid'),
+                    'slicing_stage_timings', ['slicing_uuid'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_slicing_stage_timings_slicing_uuid'),
+                  table_name='slicing_stage_timings')
+    op.drop_table('slicing_stage_timings')
@@ -0,0 +1,35 @@
+"""add taskflow logbook
+
+Revision ID: 6e1d4b8a9c23
+Revises: 3c7a9e2b5f14
+Create Date: 2026-10-19 21:48:05.217340
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from taskflow.persistence.backends.sqlalchemy import tables
+
+
+# revision identifiers, used by Alembic.
+revision = '6e1d4b8a9c23'
+down_revision = '3c7a9e2b5f14'
+branch_labels = None
+depends_on = None
+
+
+# NOTE: The logbooks, flowdetails and atomdetails tables of the taskflow
+# persistence backend are created from the schema of the pinned taskflow
+# release, rather than by its own migrations, which would share the
+# alembic_version table of the controller database.
+def _taskflow_metadata():
+    metadata = sa.MetaData()
+    tables.fetch(metadata)
+    return metadata
+
+
+def upgrade():
+    _taskflow_metadata().create_all(op.get_bind())
+
+
+def downgrade():
+    _taskflow_metadata().drop_all(op.get_bind())
@@ -0,0 +1,40 @@
+"""add wan node work items
+
+Revision ID: 8b3e6f0d2c91
+Revises: 5d2f8c1e4a7b
+Create Date: 2026-10-19 20:14:37.552190
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b3e6f0d2c91'
+down_revision = '5d2f8c1e4a7b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('wan_node_work_items',
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('wan_node_uuid', sa.String(length=36), nullable=False),
+    sa.Column('operation', sa.String(length=255), nullable=False),
+    sa.Column('coalesce_key', sa.String(length=255), nullable=True),
+    sa.Column('state', sa.String(length=16), nullable=False),
+    sa.Column('holder', sa.String(length=255), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_wan_node_work_items_wan_node_uuid'),
+                    'wan_node_work_items', ['wan_node_uuid'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_wan_node_work_items_wan_node_uuid'),
+                  table_name='wan_node_work_items')
+    op.drop_table('wan_node_work_items')
@@ -0,0 +1,26 @@
+"""add wan node netconf transport profile
+
+Revision ID: 9a4f2c7d1e58
+Revises: 6e1d4b8a9c23
+Create Date: 2026-10-19 23:02:41.806153
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a4f2c7d1e58'
+down_revision = '6e1d4b8a9c23'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('wan_nodes',
+                  sa.Column('netconf_transport_profile',
+                            sa.String(length=255), nullable=True))
+
+
+def downgrade():
+    op.drop_column('wan_nodes', 'netconf_transport_profile')
@@ -28,6 +28,7 @@ from sqlalchemy.orm.exc import NoResultFound
 
 from dci.common import exception
 from dci.common.i18n import _
+from dci.common import metrics
 from dci.db import api
 from dci.db.sqlalchemy import models
 
@@ -43,7 +44,11 @@ def get_backend():
     return Connection()
 
 
-def _session_for_read():
+def _session_for_read(use_slave=False):
+    # NOTE: The async reader runs on the slave_connection engine when it
+    # is configured and falls back to the primary otherwise.
+    if use_slave and not api.is_read_from_primary():
+        return enginefacade.reader.async_.using(_CONTEXT)
     return enginefacade.reader.using(_CONTEXT)
 
 
@@ -70,12 +75,19 @@ def model_query(context, model, *args, **kwargs):
       if set to False or absent, then will not do query filter with context's
       project_id.
     :type project_only: bool
+
+    :keyword use_slave:
+      If set to True, then the query is run against the slave database when
+      it is configured and the current request has not been routed to the
+      primary one to read its own writes.
+    :type use_slave: bool
     """
 
     if kwargs.pop("project_only", False):
         kwargs["project_id"] = context.tenant
 
-    with _session_for_read() as session:
+    use_slave = kwargs.pop("use_slave", False)
+    with _session_for_read(use_slave=use_slave) as session:
         query = sqlalchemyutils.model_query(
             model, session, args, **kwargs)
         return query
@@ -122,6 +134,7 @@ def _resource_refs(resource_dict, resource_class):
     return resource_ref
 
 
+@metrics.instrument(metrics.DB_CALL, 'method')
 class Connection(api.Connection):
     """SqlAlchemy connection."""
 
@@ -132,7 +145,8 @@ class Connection(api.Connection):
     def site_get(self, context, uuid):
         query = model_query(
             context,
-            models.Site).filter_by(uuid=uuid)
+            models.Site,
+            use_slave=True).filter_by(uuid=uuid)
         try:
             return query.one()
         except NoResultFound:
@@ -149,7 +163,7 @@ class Connection(api.Connection):
         if limit == 0:
             return []
 
-        query_prefix = model_query(context, models.Site)
+        query_prefix = model_query(context, models.Site, use_slave=True)
         filters = copy.deepcopy(filters)
 
         exact_match_filter_names = ['state']
@@ -164,7 +178,7 @@ class Connection(api.Connection):
 
     def site_list(self, context, limit=None, marker=None, sort_key=None,
                   sort_dir=None):
-        query = model_query(context, models.Site)
+        query = model_query(context, models.Site, use_slave=True)
         return _paginate_query(context, models.Site, query,
                                limit, marker, sort_key, sort_dir)
 
@@ -179,7 +193,8 @@ class Connection(api.Connection):
             if 'name' in e.columns:
                 raise exception.DuplicateDeviceName(name=values['name'])
 
-    def site_create(self, context, values):
+    @staticmethod
+    def _site_ref(values):
         if not values.get('uuid'):
             values['uuid'] = uuidutils.generate_uuid()
 
@@ -190,6 +205,10 @@ class Connection(api.Connection):
 
         site = models.Site()
         site.update(values)
+        return site
+
+    def site_create(self, context, values):
+        site = self._site_ref(values)
 
         with _session_for_write() as session:
             try:
@@ -201,6 +220,24 @@ class Connection(api.Connection):
             site['wan_nodes'] = []
             return site
 
+    def site_bulk_create(self, context, values_list):
+        """Create DCI sites in a single transaction.
+
+        Either all the sites are created or none of them.
+        """
+        sites = [self._site_ref(values) for values in values_list]
+
+        with _session_for_write() as session:
+            try:
+                session.add_all(sites)
+                session.flush()
+            except db_exc.DBDuplicateEntry as e:
+                raise exception.RecordAlreadyExists(uuid=e.value)
+
+            for site in sites:
+                site['wan_nodes'] = []
+            return sites
+
     @oslo_db_api.retry_on_deadlock
     def _do_update_site(self, context, uuid, values):
         with _session_for_write():
@@ -227,11 +264,20 @@ class Connection(api.Connection):
                     resource='Site',
                     msg='with uuid=%s' % uuid)
 
+    @oslo_db_api.retry_on_deadlock
+    def site_bulk_delete(self, context, uuids):
+        """Delete DCI sites in a single transaction.
+
+        :returns: the UUIDs of the deleted sites, unknown UUIDs are skipped.
+        """
+        return self._bulk_delete(context, models.Site, uuids)
+
     # wan_nodes
     def wan_node_get(self, context, uuid):
         query = model_query(
             context,
-            models.WANNode).filter_by(uuid=uuid)
+            models.WANNode,
+            use_slave=True).filter_by(uuid=uuid)
         try:
             return query.one()
         except NoResultFound:
@@ -248,7 +294,7 @@ class Connection(api.Connection):
         if limit == 0:
             return []
 
-        query_prefix = model_query(context, models.WANNode)
+        query_prefix = model_query(context, models.WANNode, use_slave=True)
         filters = copy.deepcopy(filters)
 
         exact_match_filter_names = ['state',
@@ -264,7 +310,7 @@ class Connection(api.Connection):
 
     def wan_node_list(self, context, limit=None, marker=None, sort_key=None,
                       sort_dir=None):
-        query = model_query(context, models.WANNode)
+        query = model_query(context, models.WANNode, use_slave=True)
         return _paginate_query(context, models.WANNode, query,
                                limit, marker, sort_key, sort_dir)
 
@@ -279,12 +325,17 @@ class Connection(api.Connection):
             if 'name' in e.columns:
                 raise exception.DuplicateDeviceName(name=values['name'])
 
-    def wan_node_create(self, context, values):
+    @staticmethod
+    def _wan_node_ref(values):
         if not values.get('uuid'):
             values['uuid'] = uuidutils.generate_uuid()
 
         wan_node = models.WANNode()
         wan_node.update(values)
+        return wan_node
+
+    def wan_node_create(self, context, values):
+        wan_node = self._wan_node_ref(values)
 
         with _session_for_write() as session:
             try:
@@ -294,6 +345,21 @@ class Connection(api.Connection):
                 raise exception.RecordAlreadyExists(uuid=values['uuid'])
             return wan_node
 
+    def wan_node_bulk_create(self, context, values_list):
+        """Create WAN nodes in a single transaction.
+
+        Either all the WAN nodes are created or none of them.
+        """
+        wan_nodes = [self._wan_node_ref(values) for values in values_list]
+
+        with _session_for_write() as session:
+            try:
+                session.add_all(wan_nodes)
+                session.flush()
+            except db_exc.DBDuplicateEntry as e:
+                raise exception.RecordAlreadyExists(uuid=e.value)
+            return wan_nodes
+
     @oslo_db_api.retry_on_deadlock
     def _do_update_wan_node(self, context, uuid, values):
         with _session_for_write():
@@ -320,11 +386,21 @@ class Connection(api.Connection):
                     resource='WANNode',
                     msg='with uuid=%s' % uuid)
 
+    @oslo_db_api.retry_on_deadlock
+    def wan_node_bulk_delete(self, context, uuids):
+        """Delete WAN nodes in a single transaction.
+
+        :returns: the UUIDs of the deleted WAN nodes, unknown UUIDs are
+                  skipped.
+        """
+        return self._bulk_delete(context, models.WANNode, uuids)
+
     # evpn_vpls_over_srv6_be_slicing
     def evpn_vpls_over_srv6_be_slicing_get(self, context, uuid):
         query = model_query(
             context,
-            models.EVPNVPLSoSRv6BESlicing).filter_by(uuid=uuid)
+            models.EVPNVPLSoSRv6BESlicing,
+            use_slave=True).filter_by(uuid=uuid)
         try:
             return query.one()
         except NoResultFound:
@@ -344,7 +420,8 @@ class Connection(api.Connection):
         if limit == 0:
             return []
 
-        query_prefix = model_query(context, models.EVPNVPLSoSRv6BESlicing)
+        query_prefix = model_query(context, models.EVPNVPLSoSRv6BESlicing,
+                                   use_slave=True)
         filters = copy.deepcopy(filters)
 
         exact_match_filter_names = ['state',
@@ -363,7 +440,8 @@ class Connection(api.Connection):
     def evpn_vpls_over_srv6_be_slicing_list(self, context, limit=None,
                                             marker=None, sort_key=None,
                                             sort_dir=None):
-        query = model_query(context, models.EVPNVPLSoSRv6BESlicing)
+        query = model_query(context, models.EVPNVPLSoSRv6BESlicing,
+                            use_slave=True)
         return _paginate_query(context, models.EVPNVPLSoSRv6BESlicing, query,
                                limit, marker, sort_key, sort_dir)
 
@@ -380,7 +458,8 @@ class Connection(api.Connection):
             if 'name' in e.columns:
                 raise exception.DuplicateDeviceName(name=values['name'])
 
-    def evpn_vpls_over_srv6_be_slicing_create(self, context, values):
+    def evpn_vpls_over_srv6_be_slicing_create(self, context, values,
+                                              idempotency=None):
         if not values.get('uuid'):
             values['uuid'] = uuidutils.generate_uuid()
 
@@ -393,6 +472,10 @@ class Connection(api.Connection):
                 session.flush()
             except db_exc.DBDuplicateEntry:
                 raise exception.RecordAlreadyExists(uuid=values['uuid'])
+            if idempotency is not None:
+                route, key_values = idempotency
+                self.idempotency_key_update_by_resource(
+                    context, route, values['uuid'], key_values)
             return evpn_vpls_over_srv6_be_slicing
 
     @oslo_db_api.retry_on_deadlock
@@ -420,3 +503,217 @@ class Connection(api.Connection):
                 raise exception.ResourceNotFound(
                     resource='EVPNVPLSoSRv6BESlicing',
                     msg='with uuid=%s' % uuid)
+
+    @oslo_db_api.retry_on_deadlock
+    def evpn_vpls_over_srv6_be_slicing_bulk_delete(self, context, uuids):
+        """Delete EVPN VPLS over SRv6 BE network slicings in a single
+        transaction.
+
+        :returns: the UUIDs of the deleted slicings, unknown UUIDs are
+                  skipped.
+        """
+        return self._bulk_delete(context, models.EVPNVPLSoSRv6BESlicing,
+                                 uuids)
+
+    # slicing_stage_timings
+    def slicing_stage_timing_bulk_create(self, context, values_list):
+        timing_refs = []
+        for values in values_list:
+            timing_ref = models.SlicingStageTiming()
+            timing_ref.update(values)
+            timing_refs.append(timing_ref)
+
+        with _session_for_write() as session:
+            session.add_all(timing_refs)
+            session.flush()
+            return timing_refs
+
+    def slicing_stage_timing_list(self, context, slicing_uuid):
+        query = model_query(context, models.SlicingStageTiming,
+                            use_slave=True).filter_by(
+                                slicing_uuid=slicing_uuid)
+        return query.order_by(models.SlicingStageTiming.started_at,
+                              models.SlicingStageTiming.id).all()
+
+    # wan_node_work_items
+    def wan_node_work_item_create(self, context, values):
+        item_ref = models.WANNodeWorkItem()
+        item_ref.update(values)
+
+        with _session_for_write() as session:
+            session.add(item_ref)
+            session.flush()
+            return item_ref
+
+    def wan_node_work_item_get(self, context, item_id):
+        # NOTE: The queue is polled by the other workers, never read it from
+        # the slave database.
+        query = model_query(context, models.WANNodeWorkItem).filter_by(
+            id=item_id)
+        return query.first()
+
+    @oslo_db_api.retry_on_deadlock
+    def wan_node_work_item_update(self, context, item_id, values):
+        with _session_for_write():
+            model_query(context, models.WANNodeWorkItem).filter_by(
+                id=item_id).update(values, synchronize_session=False)
+
+    @oslo_db_api.retry_on_deadlock
+    def wan_node_work_item_delete(self, context, item_id):
+        with _session_for_write():
+            model_query(context, models.WANNodeWorkItem).filter_by(
+                id=item_id).delete(synchronize_session=False)
+
+    def wan_node_work_item_list_pending(self, context, wan_node_uuid, now):
+        model = models.WANNodeWorkItem
+        query = model_query(context, model).filter(
+            model.wan_node_uuid == wan_node_uuid,
+            model.state.in_(['queued', 'running']),
+            model.expires_at > now)
+        return query.order_by(model.id).all()
+
+    @oslo_db_api.retry_on_deadlock
+    def wan_node_work_item_purge(self, context, now):
+        with _session_for_write():
+            model_query(context, models.WANNodeWorkItem).filter(
+                models.WANNodeWorkItem.expires_at <= now).delete(
+                    synchronize_session=False)
+
+    # idempotency_keys
+    def idempotency_key_create(self, context, values):
+        key_ref = models.IdempotencyKey()
+        key_ref.update(values)
+
+        with _session_for_write() as session:
+            try:
+                session.add(key_ref)
+                session.flush()
+            except db_exc.DBDuplicateEntry:
+                raise exception.IdempotencyKeyExists(
+                    key=values['idempotency_key'])
+            return key_ref
+
+    def idempotency_key_get(self, context, idempotency_key, route):
+        query = model_query(context, models.IdempotencyKey).filter_by(
+            idempotency_key=idempotency_key, route=route)
+        return query.first()
+
+    @oslo_db_api.retry_on_deadlock
+    def idempotency_key_update(self, context, idempotency_key, route, values,
+                               expected=None):
+        with _session_for_write():
+            query = model_query(context, models.IdempotencyKey).filter_by(
+                idempotency_key=idempotency_key, route=route)
+            if expected:
+                query = query.filter_by(**expected)
+            return query.update(values, synchronize_session=False) == 1
+
+    def idempotency_key_update_by_resource(self, context, route,
+                                           resource_uuid, values,
+                                           expected=None):
+        # NOTE: Joins the transaction of the caller, if any.
+        with _session_for_write():
+            query = model_query(context, models.IdempotencyKey).filter_by(
+                route=route, resource_uuid=resource_uuid)
+            if expected:
+                query = query.filter_by(**expected)
+            return query.update(values, synchronize_session=False) == 1
+
+    @oslo_db_api.retry_on_deadlock
+    def idempotency_key_purge(self, context, now):
+        with _session_for_write():
+            model_query(context, models.IdempotencyKey).filter(
+                models.IdempotencyKey.expires_at <= now).delete(
+                    synchronize_session=False)
+
+    # flow_leases
+    def flow_lease_create(self, context, values):
+        lease_ref = models.FlowLease()
+        lease_ref.update(values)
+
+        with _session_for_write() as session:
+            try:
+                session.add(lease_ref)
+                session.flush()
+            except db_exc.DBDuplicateEntry:
+                return False
+            return True
+
+    def flow_lease_list(self, context):
+        # NOTE: The leases are renewed by the other workers, never read
+        # them from the slave database.
+        return model_query(context, models.FlowLease).all()
+
+    @oslo_db_api.retry_on_deadlock
+    def flow_lease_renew(self, context, holder, flow_uuids, expires_at):
+        if not flow_uuids:
+            return
+        with _session_for_write():
+            model_query(context, models.FlowLease).filter(
+                models.FlowLease.holder == holder,
+                models.FlowLease.flow_uuid.in_(flow_uuids)).update(
+                    {'expires_at': expires_at}, synchronize_session=False)
+
+    @oslo_db_api.retry_on_deadlock
+    def flow_lease_take_over(self, context, flow_uuid, holder, now,
+                             expires_at):
+        with _session_for_write():
+            query = model_query(context, models.FlowLease).filter(
+                models.FlowLease.flow_uuid == flow_uuid,
+                models.FlowLease.expires_at <= now)
+            return query.update({'holder': holder, 'expires_at': expires_at},
+                                synchronize_session=False) == 1
+
+    @oslo_db_api.retry_on_deadlock
+    def flow_lease_delete(self, context, flow_uuids):
+        if not flow_uuids:
+            return
+        with _session_for_write():
+            model_query(context, models.FlowLease).filter(
+                models.FlowLease.flow_uuid.in_(flow_uuids)).delete(
+                    synchronize_session=False)
+
+    @staticmethod
+    def _exact_filter(model, query, filters, legal_keys=None):
+        """Applies exact match filtering to a query.
+
+        Returns the updated query, or None when a list filter is empty and
+        nothing can match. Modifies filters argument to remove filters
+        consumed.
+        """
+        if filters is None:
+            filters = {}
+        if legal_keys is None:
+            legal_keys = []
+
+        filter_dict = {}
+        for key in legal_keys:
+            if key not in filters:
+                continue
+
+            value = filters.pop(key)
+            if isinstance(value, (list, tuple, set, frozenset)):
+                if not value:
+                    return None
+                column_attr = getattr(model, key)
+                query = query.filter(column_attr.in_(value))
+            else:
+                filter_dict[key] = value
+
+        if filter_dict:
+            query = query.filter_by(**filter_dict)
+        return query
+
+    @staticmethod
+    def _bulk_delete(context, model, uuids):
+        if not uuids:
+            return []
+
+        with _session_for_write():
+            query = model_query(context, model).filter(
+                model.uuid.in_(uuids))
+            found = [ref.uuid for ref in query.with_for_update()]
+            if found:
+                model_query(context, model).filter(
+                    model.uuid.in_(found)).delete(synchronize_session=False)
+        return found
@@ -19,6 +19,8 @@ from alembic import config as alembic_config
 import alembic.migration as alembic_migration
 from oslo_db import exception as db_exc
 from oslo_db.sqlalchemy import enginefacade
+import sqlalchemy as sa
+from taskflow.persistence.backends.sqlalchemy import tables
 
 from dci.db.sqlalchemy import models
 
@@ -66,6 +68,10 @@ def create_schema(config=None, engine=None):
                                       " control. Use upgrade() instead")
 
     models.Base.metadata.create_all(engine)
+    # The logbook tables of the slicing flows.
+    flow_metadata = sa.MetaData()
+    tables.fetch(flow_metadata)
+    flow_metadata.create_all(engine)
     stamp('head', config=config)
 
 
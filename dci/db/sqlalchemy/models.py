@@ -17,12 +17,14 @@
 import urllib.parse as urlparse
 
 from sqlalchemy import Column
+from sqlalchemy import DateTime
 from sqlalchemy import Enum
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy import ForeignKey
 from sqlalchemy import Integer
 from sqlalchemy.orm import relationship
 from sqlalchemy import String
+from sqlalchemy import Text
 
 from oslo_db import options as db_options
 from oslo_db.sqlalchemy import models
@@ -112,6 +114,7 @@ class WANNode(Base):
     netconf_port = Column(Integer, nullable=False)
     netconf_username = Column(String(36), nullable=False)
     netconf_password = Column(String(36), nullable=False)
+    netconf_transport_profile = Column(String(255), nullable=True)
     as_number = Column(Integer, nullable=True)
     roles = Column(db_types.JsonEncodedList, nullable=False)
     site_uuid = Column(String(36), ForeignKey('sites.uuid'))
@@ -190,3 +193,61 @@ class EVPNVPLSoSRv6BESlicing(Base):
     west_access_vpn_bridge_domain = Column(String(16), nullable=False)
     west_wan_vpn_bridge_domain = Column(String(16), nullable=False)
     west_splicing_vlan_id = Column(String(16), nullable=False)
+
+
+class SlicingStageTiming(Base):
+    """Represents the timing of one stage of a slicing flow run."""
+
+    __tablename__ = 'slicing_stage_timings'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    slicing_uuid = Column(String(36), nullable=False, index=True)
+    stage = Column(String(64), nullable=False)
+    state = Column(String(16), nullable=False)
+    site_uuid = Column(String(36), nullable=True)
+    wan_node_uuid = Column(String(36), nullable=True)
+    started_at = Column(DateTime, nullable=False)
+    ended_at = Column(DateTime, nullable=True)
+    revert_started_at = Column(DateTime, nullable=True)
+    revert_ended_at = Column(DateTime, nullable=True)
+    retries = Column(Integer, nullable=False, default=0)
+    reverts = Column(Integer, nullable=False, default=0)
+
+
+class WANNodeWorkItem(Base):
+    """Represents a device mutation in the work queue of a WAN node."""
+
+    __tablename__ = 'wan_node_work_items'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    wan_node_uuid = Column(String(36), nullable=False, index=True)
+    operation = Column(String(255), nullable=False)
+    coalesce_key = Column(String(255), nullable=True)
+    state = Column(String(16), nullable=False)
+    holder = Column(String(255), nullable=False)
+    error = Column(Text, nullable=True)
+    expires_at = Column(DateTime, nullable=False)
+
+
+class IdempotencyKey(Base):
+    """Represents the Idempotency-Key of a create request of a route."""
+
+    __tablename__ = 'idempotency_keys'
+
+    idempotency_key = Column(String(255), primary_key=True)
+    route = Column(String(64), primary_key=True)
+    request_hash = Column(String(64), nullable=False)
+    state = Column(String(16), nullable=False)
+    resource_uuid = Column(String(36), nullable=False)
+    error = Column(Text, nullable=True)
+    expires_at = Column(DateTime, nullable=False)
+
+
+class FlowLease(Base):
+    """Represents the lease of the process running a slicing flow."""
+
+    __tablename__ = 'flow_leases'
+
+    flow_uuid = Column(String(36), primary_key=True)
+    holder = Column(String(255), nullable=False)
+    expires_at = Column(DateTime, nullable=False)
@@ -16,6 +16,7 @@ from oslo_log import log
 from oslo_utils import importutils
 
 from dci.common.i18n import _LE
+from dci.device_manager import executor
 
 
 LOG = log.getLogger(__name__)
@@ -41,18 +42,27 @@ class DeviceManager(object):
               "netconf_port": 22,
               "netconf_username": "usernmae",
               "netconf_password": "password",
+              "netconf_transport_profile": "edge",
             }
+
+            ``netconf_transport_profile`` is optional, see
+            ``[netconf_transport]``.
         """
 
         try:
             device_vendor = device_conn_ref['vendor']
             device_driver = DEVICE_DRIVER_MAPPING[device_vendor]
-            self.driver_handle = importutils.import_object(
-                device_driver,
-                host=device_conn_ref['netconf_host'],
-                port=device_conn_ref['netconf_port'],
-                username=device_conn_ref['netconf_username'],
-                password=device_conn_ref['netconf_password'])
+            # NOTE: The driver calls are run off the eventlet hub, see
+            # dci.device_manager.executor.
+            self.driver_handle = executor.ExecutorProxy(
+                importutils.import_object(
+                    device_driver,
+                    host=device_conn_ref['netconf_host'],
+                    port=device_conn_ref['netconf_port'],
+                    username=device_conn_ref['netconf_username'],
+                    password=device_conn_ref['netconf_password'],
+                    transport_profile=device_conn_ref.get(
+                        'netconf_transport_profile', None)))
         except Exception as err:
             LOG.error(_LE("Device driver instantiation failed, "
                           "details %s"), err)
@@ -0,0 +1,123 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Commit a change on several WAN nodes together, on all or on none.
+
+Committed one after the other, the WAN nodes take the sum of their commit
+times, and a failure on the last one leaves the change on the others until
+the flow revert deletes it with another edit-config. The change is instead
+loaded and validated on every WAN node in parallel, then committed with a
+confirmed commit on all of them, and confirmed only once every confirmed
+commit succeeded. Otherwise the confirmed commits are cancelled, or rolled
+back by the WAN nodes themselves when their session closes or
+``[device] confirmed_commit_timeout`` expires.
+"""
+
+import collections
+import time
+
+from oslo_log import log
+
+from dci.common import exception
+from dci.common.i18n import _LE
+from dci.common.i18n import _LI
+from dci.common import utils
+
+
+LOG = log.getLogger(__name__)
+
+PREPARE = 'prepare'
+COMMIT_CONFIRMED = 'commit-confirmed'
+CONFIRM = 'confirm'
+
+# :param name: the name of the WAN node, e.g. its UUID.
+# :param driver: the device driver of the WAN node.
+# :param prepare: callable loading the change with the driver, e.g. a
+#                 partial of ``prepare_create_...`` driver method.
+Participant = collections.namedtuple('Participant',
+                                     ['name', 'driver', 'prepare'])
+
+
+def _call_all(participants, func):
+    """Call ``func`` on every participant in parallel.
+
+    From a greenthread of the API worker, every participant gets a
+    greenthread handing ``func`` to a native thread of
+    ``dci.common.executor``, so that a slow WAN node does not stall the
+    other requests of the worker. The phases of one participant may run in
+    different native threads, its driver keeps the commit session between
+    them.
+
+    :returns: the participants which failed, with their errors.
+    """
+    outcomes = utils.concurrent_map(func, participants,
+                                    max(1, len(participants)))
+    return [(participant, err)
+            for participant, (_result, err) in zip(participants, outcomes)
+            if err is not None]
+
+
+def _fail(phase, failed, rolled_back):
+    for participant, err in failed:
+        LOG.error(_LE("The %(phase)s phase of the coordinated commit failed "
+                      "on WAN node %(name)s, details %(err)s"),
+                  {'phase': phase, 'name': participant.name, 'err': err})
+    raise exception.CoordinatedCommitFailed(
+        phase=phase,
+        failed=', '.join(participant.name for participant, _err in failed),
+        err=failed[0][1],
+        rolled_back=[participant.name for participant in rolled_back])
+
+
+def commit(participants):
+    """Commit a change on all the participants, or on none of them.
+
+    :param participants: a list of `Participant`.
+    :raises: CoordinatedCommitFailed, its ``rolled_back`` keyword argument
+             listing the names of the participants left without the change.
+             The change of the others, if any, failed its confirm and must
+             be deleted.
+    """
+    started_at = time.monotonic()
+
+    failed = _call_all(participants,
+                       lambda participant: participant.prepare())
+    if failed:
+        failed_names = set(participant.name for participant, _err in failed)
+        _call_all([participant for participant in participants
+                   if participant.name not in failed_names],
+                  lambda participant: participant.driver.abort_commit())
+        _fail(PREPARE, failed, participants)
+
+    failed = _call_all(
+        participants,
+        lambda participant: participant.driver.commit_confirmed())
+    if failed:
+        # NOTE: Cancels the confirmed commits which succeeded, a failed
+        # one is rolled back when its session closes.
+        _call_all(participants,
+                  lambda participant: participant.driver.abort_commit())
+        _fail(COMMIT_CONFIRMED, failed, participants)
+
+    failed = _call_all(
+        participants,
+        lambda participant: participant.driver.confirm_commit())
+    if failed:
+        _fail(CONFIRM, failed, [])
+
+    LOG.info(_LI("Coordinated commit on WAN nodes %(names)s done in "
+                 "%(elapsed).1fs"),
+             {'names': ', '.join(participant.name
+                                 for participant in participants),
+              'elapsed': time.monotonic() - started_at})
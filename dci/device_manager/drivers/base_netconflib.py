@@ -14,15 +14,23 @@
 
 from oslo_log import log
 
-from ncclient import manager
 from ncclient.operations import errors as nccli_oper_excepts
 from ncclient.transport import errors as nccli_trans_excepts
 
 import lxml.etree as ET
 import xmltodict
 
+from dci.common import circuit_breaker
+from dci.common import connection_pool
 from dci.common import constants
+from dci.common import deadline
+from dci.common import exception
 from dci.common.i18n import _LI
+from dci.common.i18n import _LW
+from dci.common import metrics
+from dci.common import tracing
+from dci.conf import CONF
+from dci.device_manager.drivers import netconf_transport
 
 
 LOG = log.getLogger(__name__)
@@ -126,83 +134,279 @@ class NETCONFParser(object):
         return elem.tag
 
 
+def _close_session(client, host=None):
+    if not client.connected:
+        return
+    if host:
+        LOG.info(_LI("Disconnect to device [%s] by ncclient."), host)
+    try:
+        client.close_session()
+    except Exception as err:
+        LOG.warning(_LW("Failed to close a NETCONF session, details %s"),
+                    err)
+
+
+def _get_session_pool():
+    return connection_pool.get_pool(
+        connection_pool.NETCONF, _close_session,
+        is_alive=lambda client: client.connected)
+
+
 class BaseNETCONFLib(object):
 
-    def __init__(self, vendor, host, port, username, password):
+    def __init__(self, vendor, host, port, username, password,
+                 transport_profile=None):
 
         self.vendor = vendor
         self.host = host
         self.port = port
         self.username = username
         self.password = password
+        self.profile = netconf_transport.TransportProfile(transport_profile)
         self._client = None
+        # Whether a confirmed commit of the session awaits its confirm.
+        self._confirming = False
+
+    @property
+    def pool_key(self):
+        return '%s:%s:%s:%s' % (self.host, self.port, self.username,
+                                self.profile.name or '')
 
     def connect(self):
         if not self._client or not self._client.connected:
+            # NOTE: Reuse an idle session of an earlier operation, see
+            # dci.common.connection_pool.
+            self._client = _get_session_pool().get(self.pool_key)
+            if self._client is not None:
+                return
+
             link_device_params = {
                 'host': self.host,
                 'port': self.port,
                 'username': self.username,
                 'password': self.password,
-                'timeout': 120,
+                'timeout': deadline.timeout(
+                    self.profile.connect_timeout, 'NETCONF connect'),
                 'allow_agent': False,
                 'look_for_keys': False,
                 'hostkey_verify': False,
                 'device_params': {'name': constants.DEVICE_VENDOR_MAPPING[self.vendor]}  # noqa
             }
             LOG.info(_LI("Connect to device [%s] by ncclient."), self.host)
+            breaker = circuit_breaker.get_breaker(
+                'netconf:%s:%s' % (self.host, self.port),
+                ignored_exceptions=(nccli_trans_excepts.AuthenticationError,))
             try:
-                self._client = manager.connect(**link_device_params)
+                with metrics.timed(metrics.NETCONF_RPC,
+                                   operation='connect', host=self.host), \
+                        tracing.span('ncclient.connect', tracing.CLIENT,
+                                     **{'net.peer.name': self.host}):
+                    self._client = tracing.traced_client(
+                        breaker.call(netconf_transport.connect, self.profile,
+                                     **link_device_params),
+                        'ncclient', **{'net.peer.name': self.host})
             except nccli_trans_excepts.AuthenticationError as err:
                 raise err
             except Exception as err:
                 raise err
 
-    def disconnect(self):
-        if self._client.connected:
-            LOG.info(_LI("Disconnect to device [%s] by ncclient."), self.host)
-            try:
-                self._client.close_session()
-            except Exception as err:
-                raise err
-        self._client = None
+    def disconnect(self, reuse=True):
+        """End the use of the session.
+
+        :param reuse: keep the session open in the pool of the process for
+                      the next operations on the device. Unset it when the
+                      state of the session is unknown, e.g. after an error,
+                      or when closing it matters, e.g. to roll back a
+                      confirmed commit.
+        """
+        client, self._client = self._client, None
+        if client is None:
+            return
+        if reuse and not self._confirming and client.connected:
+            _get_session_pool().put(self.pool_key, client)
+            return
+        self._confirming = False
+        _close_session(client, self.host)
 
     def _execute(self, rpc_op, rpc_db, rpc_req_data,
                  def_oper, test_option, err_option, lock):
 
-        # NOTE(fanguiju): Use the `ncclient.manager.connect` Context Manager.
-        with self._client:
-            try:
-                if rpc_op == 'get':
-                    rpc_reply = self._client.get(
-                        filter=rpc_req_data)
-
-                elif rpc_op == 'get-config':
-                    rpc_reply = self._client.get_config(
-                        source=rpc_db,
-                        filter=rpc_req_data)
-
-                elif rpc_op == 'edit-config':
-                    rpc_reply = self.edit_config(config=rpc_req_data,
-                                                 target=rpc_db,
-                                                 default_operation=def_oper,
-                                                 test_option=test_option,
-                                                 error_option=err_option,
-                                                 is_locked=lock)
-                else:
-                    rpc_reply = self._client.dispatch(ET.fromstring(rpc_req_data))  # noqa
-            except nccli_trans_excepts.TransportError as err:
-                raise err
-            except nccli_oper_excepts.TimeoutExpiredError as err:
-                raise err
-            except Exception as err:
-                raise err
+        # NOTE: Bound the RPC by the budget left to the request.
+        self._client.timeout = deadline.timeout(
+            self.profile.rpc_timeout, 'NETCONF %s' % rpc_op)
+
+        # NOTE: The session is closed, or kept for the next operations, by
+        # the disconnect of the caller.
+        try:
+            if rpc_op == 'get':
+                rpc_reply = self._client.get(
+                    filter=rpc_req_data)
+
+            elif rpc_op == 'get-config':
+                rpc_reply = self._client.get_config(
+                    source=rpc_db,
+                    filter=rpc_req_data)
+
+            elif rpc_op == 'edit-config':
+                rpc_reply = self.edit_config(config=rpc_req_data,
+                                             target=rpc_db,
+                                             default_operation=def_oper,
+                                             test_option=test_option,
+                                             error_option=err_option,
+                                             is_locked=lock)
+            else:
+                rpc_reply = self._client.dispatch(ET.fromstring(rpc_req_data))  # noqa
+        except nccli_trans_excepts.TransportError as err:
+            raise err
+        except nccli_oper_excepts.TimeoutExpiredError as err:
+            raise err
+        except Exception as err:
+            raise err
         return rpc_reply
 
+    def _wait_for_replies(self, rpcs):
+        """Wait for the replies of the RPCs sent in async mode, in order.
+
+        :raises: the error of the first RPC which failed.
+        """
+        replies = []
+        for rpc in rpcs:
+            if not rpc.event.wait(self._client.timeout):
+                raise nccli_oper_excepts.TimeoutExpiredError(
+                    "ncclient timed out while waiting for an rpc reply.")
+            if rpc.error is not None:
+                raise rpc.error
+            if not rpc.reply.ok:
+                raise rpc.reply.error
+            replies.append(rpc.reply)
+        return replies
+
+    def pipeline(self, calls):
+        """Send several RPCs on the session before waiting for their
+        replies, with the ``async_mode`` of ncclient.
+
+        The server processes the RPCs of a session in order, but it still
+        processes the next ones when an RPC fails. Only pipeline the RPCs
+        whose failure does not make the next ones harmful.
+
+        :param calls: a list of ``(method, kwargs)``, the method being an
+            operation of the ncclient manager, e.g. ``get_config``.
+        :returns: the replies, in order.
+        """
+        if not CONF.device.netconf_pipelining:
+            return [getattr(self._client, method)(**kwargs)
+                    for method, kwargs in calls]
+
+        self._client.async_mode = True
+        try:
+            rpcs = [getattr(self._client, method)(**kwargs)
+                    for method, kwargs in calls]
+        finally:
+            self._client.async_mode = False
+        return self._wait_for_replies(rpcs)
+
     def edit_config(self, config, target, error_option, is_locked=True):
         # NOTE(fanguiju): Implemented by device driver.
         raise NotImplementedError()
 
+    def load_candidate(self, config, test_option, error_option):
+        """Replace the candidate datastore with the running one and the
+        change, validated.
+        """
+        # NOTE: Implemented by device driver.
+        raise NotImplementedError()
+
+    def _require_capabilities(self, *capabilities):
+        for capability in capabilities:
+            if capability not in self._client.server_capabilities:
+                raise exception.NETCONFCapabilityMissing(
+                    host=self.host, capability=capability)
+
+    def _set_rpc_timeout(self, operation):
+        # NOTE: Bound the RPC by the budget left to the request.
+        self._client.timeout = deadline.timeout(
+            self.profile.rpc_timeout, 'NETCONF %s' % operation)
+
+    def _commit(self, operation, **kwargs):
+        self._set_rpc_timeout(operation)
+        with metrics.timed(metrics.NETCONF_RPC, operation=operation,
+                           host=self.host):
+            rpc_reply = self._client.commit(**kwargs)
+        if not rpc_reply.ok:
+            raise exception.NETCONFRPCFailed(operation=operation,
+                                             host=self.host)
+
+    def prepare_commit(self, rpc_command):
+        """First phase of a coordinated commit: lock the running datastore
+        and load the edit-config ``rpc_command`` in the candidate one.
+
+        The session stays open and locked, call `commit_confirmed` then
+        `confirm_commit`, or `abort_commit`.
+        """
+        parser = NETCONFParser(rpc_command)
+        if parser.get_operation() != 'edit-config':
+            raise exception.InvalidParameterValue(
+                err="Only edit-config RPCs can be committed, got %s." %
+                    parser.get_operation())
+        config = ET.tostring(parser.get_data(), pretty_print=True)
+        if isinstance(config, bytes):
+            config = config.decode('UTF-8')
+
+        self._require_capabilities(':rollback-on-error', ':candidate',
+                                   ':validate', ':confirmed-commit')
+        self._set_rpc_timeout('lock')
+        self._client.lock(target='running')
+        try:
+            self.load_candidate(config, parser.get_test_option(),
+                                parser.get_error_option())
+        except Exception:
+            self.abort_commit()
+            raise
+
+    def commit_confirmed(self):
+        """Second phase of a coordinated commit: commit the candidate
+        datastore, until ``[device] confirmed_commit_timeout`` seconds
+        pass or the session closes without a confirm.
+        """
+        # NOTE: Set first, a commit whose reply is lost may be applied.
+        self._confirming = True
+        self._commit('commit-confirmed', confirmed=True,
+                     timeout=str(CONF.device.confirmed_commit_timeout))
+
+    def confirm_commit(self):
+        """Last phase of a coordinated commit: make the confirmed commit
+        permanent and unlock the running datastore.
+        """
+        self._commit('confirm')
+        self._confirming = False
+        self._client.unlock(target='running')
+
+    def abort_commit(self):
+        """Give up a coordinated commit: cancel the confirmed commit, or
+        discard the candidate datastore, and unlock the running datastore.
+
+        The errors are only logged, the WAN node rolls the confirmed commit
+        back by itself anyway once the session closes.
+        """
+        if self._client is None:
+            return
+        if self._confirming:
+            calls = [('cancel_commit', {}), ('unlock', {'target': 'running'})]
+        else:
+            calls = [('discard_changes', {}),
+                     ('unlock', {'target': 'running'})]
+        self._confirming = False
+        # NOTE: The cleanup runs whatever the budget left to the request.
+        self._client.timeout = self.profile.rpc_timeout
+        for method, kwargs in calls:
+            try:
+                getattr(self._client, method)(**kwargs)
+            except Exception as err:
+                LOG.warning(_LW("Failed to %(method)s on device %(host)s, "
+                                "details %(err)s"),
+                            {'method': method, 'host': self.host,
+                             'err': err})
+
     def executor(self, rpc_command, lock=True, result_format='xml'):
         """NETCONF executor.
 
@@ -231,6 +435,38 @@ class BaseNETCONFLib(object):
         else:
             return None
 
+    def executor_many(self, rpc_commands, result_format='xml'):
+        """NETCONF executor of several get and get-config RPCs, pipelined
+        on one session.
+
+        :param rpc_commands: list of xmlstring.
+        :returns: the results, in order.
+        """
+        calls = []
+        for rpc_command in rpc_commands:
+            parser = NETCONFParser(rpc_command)
+            rpc_op = parser.get_operation()
+            rpc_req_data = ET.tostring(parser.get_data()).decode('UTF-8')
+            if rpc_op == 'get':
+                calls.append(('get', {'filter': rpc_req_data}))
+            elif rpc_op == 'get-config':
+                calls.append(('get_config', {'source': parser.get_datastore(),
+                                             'filter': rpc_req_data}))
+            else:
+                raise exception.InvalidParameterValue(
+                    err="Only get and get-config RPCs can be pipelined, "
+                        "got %s." % rpc_op)
+
+        # NOTE: Bound the RPCs by the budget left to the request.
+        self._client.timeout = deadline.timeout(
+            self.profile.rpc_timeout, 'NETCONF pipeline')
+
+        with metrics.timed(metrics.NETCONF_RPC, operation='pipeline',
+                           host=self.host):
+            rpc_replies = self.pipeline(calls)
+        return [self._return_result(rpc_reply, result_format)
+                for rpc_reply in rpc_replies]
+
     def _return_result(self, rpc_reply, result_format):
 
         if result_format == 'xml':
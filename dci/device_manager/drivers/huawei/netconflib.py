@@ -15,7 +15,9 @@
 from oslo_log import log
 
 from dci.common import constants
+from dci.common import exception
 from dci.common.i18n import _LI
+from dci.common import metrics
 from dci.device_manager.drivers import base_netconflib
 
 LOG = log.getLogger(__name__)
@@ -23,9 +25,11 @@ LOG = log.getLogger(__name__)
 
 class HuaweiNETCONFLib(base_netconflib.BaseNETCONFLib):
 
-    def __init__(self, host, port, username, password):
-        super(HuaweiNETCONFLib, self).__init__(constants.HUAWEI, host, port,
-                                               username, password)
+    def __init__(self, host, port, username, password,
+                 transport_profile=None):
+        super(HuaweiNETCONFLib, self).__init__(
+            constants.HUAWEI, host, port, username, password,
+            transport_profile=transport_profile)
 
     def _check_reply(self, rpc_reply):
         xml_str = rpc_reply.xml
@@ -36,6 +40,25 @@ class HuaweiNETCONFLib(base_netconflib.BaseNETCONFLib):
             LOG.info(_LI("NETCONF Client edit-config execute unccessfully."))
             return False
 
+    def load_candidate(self, config, test_option, error_option):
+        # NOTE: The discard-changes, edit-config and validate RPCs are
+        # pipelined, the commit is only sent once they all succeeded.
+        with metrics.timed(metrics.NETCONF_RPC,
+                           operation='edit-config', host=self.host):
+            _discard_reply, rpc_reply, _validate_reply = self.pipeline([
+                ('discard_changes', {}),
+                ('edit_config', {'config': config,
+                                 'target': 'candidate',
+                                 'default_operation': 'merge',
+                                 'test_option': test_option,
+                                 'error_option': error_option}),
+                ('validate', {'source': 'candidate'}),
+            ])
+
+        if not self._check_reply(rpc_reply):
+            raise exception.NETCONFRPCFailed(operation='edit-config',
+                                             host=self.host)
+
     def edit_config(self, config, target, default_operation, test_option, error_option, is_locked=True):  # noqa
 
         if ":rollback-on-error" not in self._client.server_capabilities \
@@ -59,22 +82,11 @@ class HuaweiNETCONFLib(base_netconflib.BaseNETCONFLib):
             raise
 
         with self._client.locked(target='running'):
-
-            self._client.discard_changes()
-            rpc_reply = self._client.edit_config(
-                config=config,
-                target='candidate',
-                default_operation='merge',
-                test_option=test_option,
-                error_option=error_option)
-
-            if self._check_reply(rpc_reply):
-                self._client.validate(source='candidate')
+            self.load_candidate(config, test_option, error_option)
+            with metrics.timed(metrics.NETCONF_RPC,
+                               operation='commit', host=self.host):
                 rpc_reply = self._client.commit(confirmed=False)
 
-            else:
-                raise
-
         if not self._check_reply(rpc_reply):
             raise
 
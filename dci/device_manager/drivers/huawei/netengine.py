@@ -17,13 +17,16 @@ Driver for HUAWEI NetEngine.
 """
 
 import jinja2
+import lxml.etree as ET
 import os
 
 from oslo_log import log
 
 from dci.common.i18n import _LE
+from dci.conf import CONF
 from dci.device_manager.base_driver import DeviceDriver
 from dci.device_manager.drivers.huawei import netconflib
+from dci.device_manager import state_cache
 
 LOG = log.getLogger(__name__)
 
@@ -31,11 +34,16 @@ LOG = log.getLogger(__name__)
 class NetEngineDriver(DeviceDriver):
     """Executes commands relating to HUAWEI NetEngine Driver."""
 
-    def __init__(self, host, port, username, password, *args, **kwargs):
+    def __init__(self, host, port, username, password,
+                 transport_profile=None, *args, **kwargs):
         super(NetEngineDriver, self).__init__(*args, **kwargs)
 
         self.netconf_cli = netconflib.HuaweiNETCONFLib(
-            host, port, username, password)
+            host, port, username, password,
+            transport_profile=transport_profile)
+        self.state_key = '%s:%s' % (host, port)
+        # Changes to the device state of the prepared coordinated commit.
+        self._pending_changes = None
 
     def _get_rpc_command_from_template_file(self, file_name, kwargs={}):
         """Get RPC Command from specified template file.
@@ -67,10 +75,111 @@ class NetEngineDriver(DeviceDriver):
 
     def _send_rpc_command_to_device(self, rpc_command):
         self.netconf_cli.connect()
-        result = self.netconf_cli.executor(rpc_command)
+        try:
+            result = self.netconf_cli.executor(rpc_command)
+        except Exception:
+            # NOTE: The state of the session is unknown, do not reuse it.
+            self.netconf_cli.disconnect(reuse=False)
+            raise
+        self.netconf_cli.disconnect()
+        return result
+
+    def _send_rpc_commands_to_device(self, rpc_commands):
+        self.netconf_cli.connect()
+        try:
+            results = self.netconf_cli.executor_many(rpc_commands)
+        except Exception:
+            self.netconf_cli.disconnect(reuse=False)
+            raise
         self.netconf_cli.disconnect()
+        return results
+
+    def _commit_rpc_command_to_device(self, rpc_command, added=None,
+                                      removed=None):
+        """Send an edit-config and apply its changes to the cached device
+        state, see `get_device_state`.
+        """
+        cache = state_cache.get_device_state_cache()
+        try:
+            result = self._send_rpc_command_to_device(rpc_command)
+        except Exception:
+            # NOTE: What the device applied is unknown, read it again.
+            cache.invalidate(self.state_key)
+            raise
+        cache.apply(self.state_key, added=added, removed=removed)
         return result
 
+    def _prepare_commit(self, rpc_command, added=None, removed=None):
+        """Open a session and load an edit-config in the candidate
+        datastore, kept until `confirm_commit` or `abort_commit`.
+        """
+        self.netconf_cli.connect()
+        try:
+            self.netconf_cli.prepare_commit(rpc_command)
+        except Exception:
+            self._close_commit_session()
+            raise
+        self._pending_changes = {'added': added, 'removed': removed}
+
+    def _close_commit_session(self, reuse=False):
+        # NOTE: Closing the session rolls back a confirmed commit which was
+        # not confirmed, it is only reused after a confirm.
+        self._pending_changes = None
+        self.netconf_cli.disconnect(reuse=reuse)
+
+    def commit_confirmed(self):
+        """Commit the prepared change, rolled back by the device unless
+        `confirm_commit` follows in time.
+        """
+        try:
+            self.netconf_cli.commit_confirmed()
+        except Exception:
+            # NOTE: What the device applied is unknown, read it again.
+            state_cache.get_device_state_cache().invalidate(self.state_key)
+            raise
+
+    def confirm_commit(self):
+        """Make the prepared change permanent and release the session."""
+        cache = state_cache.get_device_state_cache()
+        try:
+            self.netconf_cli.confirm_commit()
+        except Exception:
+            cache.invalidate(self.state_key)
+            self._close_commit_session()
+            raise
+        cache.apply(self.state_key, **self._pending_changes)
+        self._close_commit_session(reuse=True)
+
+    def abort_commit(self):
+        """Drop the prepared change and close the session, the device rolls
+        back a confirmed commit of the change by itself.
+        """
+        try:
+            self.netconf_cli.abort_commit()
+        finally:
+            self._close_commit_session()
+
+    @staticmethod
+    def _slicing_resources(wan_vpn_name, access_vpn_name,
+                           access_vpn_vxlan_vni, wan_vpn_bd, access_vpn_bd,
+                           *args, **kwargs):
+        return {
+            'bridge_domains': [wan_vpn_bd, access_vpn_bd],
+            'evpn_instances': [wan_vpn_name, access_vpn_name],
+            'vnis': [access_vpn_vxlan_vni],
+        }
+
+    def warm_up(self):
+        """Open a NETCONF session, left in the pool of the process, and
+        take the snapshot of the device state when the snapshots are
+        enabled.
+        """
+        if CONF.device.state_cache_refresh_interval:
+            self.get_device_state()
+        else:
+            self.netconf_cli.connect()
+            self.netconf_cli.disconnect()
+
     def liveness(self):
         file_name = 'device_ping.xml'
         rpc_command = self._get_rpc_command_from_template_file(file_name)
@@ -81,6 +190,56 @@ class NetEngineDriver(DeviceDriver):
         rpc_command = self._get_rpc_command_from_template_file(file_name)
         return self._send_rpc_command_to_device(rpc_command)
 
+    @staticmethod
+    def _find_texts(data, path):
+        xpath = '/'.join("*[local-name()='%s']" % tag
+                         for tag in path.split('/'))
+        return set(elem.text for elem in data.xpath('//' + xpath)
+                   if elem.text)
+
+    def get_evpn_vpls_over_srv6_be_slicing_config(self, *args, **kwargs):
+        """Get the bridge domains, EVPN instances and VxLAN VNIs of the
+        running configuration, with one get-config per subtree pipelined on
+        a single session.
+
+        :return: a dict of the sets of bridge domain IDs, EVPN instance names
+            and VNIs, as strings.
+        """
+        file_name = 'get_evpn_vpls_over_srv6_be_slicing_config.xml'
+        rpc_commands = [
+            self._get_rpc_command_from_template_file(
+                file_name, {'SUBTREE': subtree})
+            for subtree in ('bd', 'evpn', 'nvo3')]
+        config = dict(bridge_domains=set(), evpn_instances=set(), vnis=set())
+        for result in self._send_rpc_commands_to_device(rpc_commands):
+            data = ET.fromstring(result.encode('UTF-8'))
+            config['bridge_domains'] |= self._find_texts(
+                data, 'bd/instances/instance/id')
+            config['evpn_instances'] |= self._find_texts(
+                data, 'evpn/instances/instance/name')
+            config['vnis'] |= self._find_texts(
+                data, 'vni-instances/vni-instance/vni')
+        state_cache.get_device_state_cache().set(self.state_key, config)
+        return config
+
+    def get_device_state(self, refresh=False):
+        """Get the snapshot of the bridge domains, EVPN instances and VxLAN
+        VNIs of the running configuration.
+
+        It is taken from the cache of the worker, unless it is stale or
+        ``refresh`` is set, in which case it is read in full again.
+
+        :return: a `state_cache.DeviceStateSnapshot`.
+        """
+        snapshot = None
+        if not refresh:
+            snapshot = state_cache.get_device_state_cache().get(
+                self.state_key)
+        if snapshot is None:
+            snapshot = state_cache.DeviceStateSnapshot(
+                self.get_evpn_vpls_over_srv6_be_slicing_config())
+        return snapshot
+
     def create_evpn_vpls_over_srv6_be_wan_and_evpn_vxlan_access_vpn(
             self, wan_vpn_name, wan_vpn_rd, wan_vpn_rt,
             preset_srv6_locator_arg, preset_srv6_locator,
@@ -94,7 +253,57 @@ class NetEngineDriver(DeviceDriver):
         the same time.
         """
         file_name = 'create_evpn_vpls_over_srv6_be_wan_and_evpn_vxlan_access_vpn.xml'  # noqa
-        kwargs = {
+        kwargs = self._get_create_evpn_vpls_over_srv6_be_slicing_kwargs(
+            wan_vpn_name, wan_vpn_rd, wan_vpn_rt, preset_srv6_locator_arg,
+            preset_srv6_locator, access_vpn_name, access_vpn_rd,
+            access_vpn_rt, access_vpn_vxlan_vni, preset_vxlan_nve_intf,
+            preset_vxlan_nve_intf_ipaddr, preset_vxlan_nve_peer_ipaddr,
+            splicing_vlan_id, wan_vpn_bd, preset_wan_vpn_bd_intf,
+            access_vpn_bd, preset_access_vpn_bd_intf)
+        rpc_command = self._get_rpc_command_from_template_file(file_name,
+                                                               kwargs)
+        return self._commit_rpc_command_to_device(
+            rpc_command, added=self._slicing_resources(
+                wan_vpn_name, access_vpn_name, access_vpn_vxlan_vni,
+                wan_vpn_bd, access_vpn_bd))
+
+    def prepare_create_evpn_vpls_over_srv6_be_wan_and_evpn_vxlan_access_vpn(  # noqa
+            self, wan_vpn_name, wan_vpn_rd, wan_vpn_rt,
+            preset_srv6_locator_arg, preset_srv6_locator,
+            access_vpn_name, access_vpn_rd, access_vpn_rt,
+            access_vpn_vxlan_vni, preset_vxlan_nve_intf,
+            preset_vxlan_nve_intf_ipaddr, preset_vxlan_nve_peer_ipaddr,
+            splicing_vlan_id, wan_vpn_bd, preset_wan_vpn_bd_intf,
+            access_vpn_bd, preset_access_vpn_bd_intf,
+            *args, **kwargs):
+        """Load the creation of EVPN VPLS over SRv6 BE WAN VPN and EVPN VxLAN
+        Access VPN in the candidate datastore, the first phase of a
+        coordinated commit, see `dci.device_manager.coordinated_commit`.
+        """
+        file_name = 'create_evpn_vpls_over_srv6_be_wan_and_evpn_vxlan_access_vpn.xml'  # noqa
+        kwargs = self._get_create_evpn_vpls_over_srv6_be_slicing_kwargs(
+            wan_vpn_name, wan_vpn_rd, wan_vpn_rt, preset_srv6_locator_arg,
+            preset_srv6_locator, access_vpn_name, access_vpn_rd,
+            access_vpn_rt, access_vpn_vxlan_vni, preset_vxlan_nve_intf,
+            preset_vxlan_nve_intf_ipaddr, preset_vxlan_nve_peer_ipaddr,
+            splicing_vlan_id, wan_vpn_bd, preset_wan_vpn_bd_intf,
+            access_vpn_bd, preset_access_vpn_bd_intf)
+        rpc_command = self._get_rpc_command_from_template_file(file_name,
+                                                               kwargs)
+        self._prepare_commit(rpc_command, added=self._slicing_resources(
+            wan_vpn_name, access_vpn_name, access_vpn_vxlan_vni,
+            wan_vpn_bd, access_vpn_bd))
+
+    @staticmethod
+    def _get_create_evpn_vpls_over_srv6_be_slicing_kwargs(
+            wan_vpn_name, wan_vpn_rd, wan_vpn_rt,
+            preset_srv6_locator_arg, preset_srv6_locator,
+            access_vpn_name, access_vpn_rd, access_vpn_rt,
+            access_vpn_vxlan_vni, preset_vxlan_nve_intf,
+            preset_vxlan_nve_intf_ipaddr, preset_vxlan_nve_peer_ipaddr,
+            splicing_vlan_id, wan_vpn_bd, preset_wan_vpn_bd_intf,
+            access_vpn_bd, preset_access_vpn_bd_intf):
+        return {
             # WAN VPN
             'WAN_VPN_NAME': wan_vpn_name,
             'WAN_VPN_RD': wan_vpn_rd,
@@ -118,9 +327,6 @@ class NetEngineDriver(DeviceDriver):
             'ACCESS_VPN_BD': access_vpn_bd,
             'PRESET_ACCESS_VPN_BD_INTERFACE': preset_access_vpn_bd_intf
         }
-        rpc_command = self._get_rpc_command_from_template_file(file_name,
-                                                               kwargs)
-        return self._send_rpc_command_to_device(rpc_command)
 
     def delete_evpn_vpls_over_srv6_be_wan_and_evpn_vxlan_access_vpn(
             self, wan_vpn_name, access_vpn_name, access_vpn_vxlan_vni,
@@ -131,7 +337,52 @@ class NetEngineDriver(DeviceDriver):
         the same time.
         """
         file_name = 'delete_evpn_vpls_over_srv6_be_wan_and_evpn_vxlan_access_vpn.xml'  # noqa
+        kwargs = self._get_delete_evpn_vpls_over_srv6_be_slicing_kwargs(
+            wan_vpn_name=wan_vpn_name,
+            access_vpn_name=access_vpn_name,
+            access_vpn_vxlan_vni=access_vpn_vxlan_vni,
+            preset_vxlan_nve_intf=preset_vxlan_nve_intf,
+            wan_vpn_bd=wan_vpn_bd,
+            preset_wan_vpn_bd_intf=preset_wan_vpn_bd_intf,
+            access_vpn_bd=access_vpn_bd,
+            preset_access_vpn_bd_intf=preset_access_vpn_bd_intf)
+        rpc_command = self._get_rpc_command_from_template_file(file_name,
+                                                               kwargs)
+        return self._commit_rpc_command_to_device(
+            rpc_command, removed=self._slicing_resources(
+                wan_vpn_name, access_vpn_name, access_vpn_vxlan_vni,
+                wan_vpn_bd, access_vpn_bd))
+
+    def bulk_delete_evpn_vpls_over_srv6_be_wan_and_evpn_vxlan_access_vpn(
+            self, slicings, *args, **kwargs):
+        """Delete the EVPN VPLS over SRv6 BE WAN VPNs and EVPN VxLAN Access
+        VPNs of several slicings with a single commit.
+
+        :param slicings: a list of dicts holding the keyword arguments of
+            `delete_evpn_vpls_over_srv6_be_wan_and_evpn_vxlan_access_vpn`.
+        """
+        file_name = 'bulk_delete_evpn_vpls_over_srv6_be_wan_and_evpn_vxlan_access_vpn.xml'  # noqa
         kwargs = {
+            'SLICINGS': [
+                self._get_delete_evpn_vpls_over_srv6_be_slicing_kwargs(
+                    **slicing)
+                for slicing in slicings]
+        }
+        rpc_command = self._get_rpc_command_from_template_file(file_name,
+                                                               kwargs)
+        removed = {kind: [] for kind in state_cache.KINDS}
+        for slicing in slicings:
+            for kind, names in self._slicing_resources(**slicing).items():
+                removed[kind].extend(names)
+        return self._commit_rpc_command_to_device(rpc_command,
+                                                  removed=removed)
+
+    @staticmethod
+    def _get_delete_evpn_vpls_over_srv6_be_slicing_kwargs(
+            wan_vpn_name, access_vpn_name, access_vpn_vxlan_vni,
+            preset_vxlan_nve_intf, wan_vpn_bd, preset_wan_vpn_bd_intf,
+            access_vpn_bd, preset_access_vpn_bd_intf, *args, **kwargs):
+        return {
             # WAN VPN
             'WAN_VPN_NAME': wan_vpn_name,
 
@@ -146,6 +397,3 @@ class NetEngineDriver(DeviceDriver):
             'ACCESS_VPN_BD': access_vpn_bd,
             'PRESET_ACCESS_VPN_BD_INTERFACE': preset_access_vpn_bd_intf
         }
-        rpc_command = self._get_rpc_command_from_template_file(file_name,
-                                                               kwargs)
-        return self._send_rpc_command_to_device(rpc_command)
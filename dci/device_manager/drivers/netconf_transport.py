@@ -0,0 +1,159 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""SSH transport profiles of the NETCONF sessions.
+
+A profile sets the timeouts, the SSH keepalives, the key exchange
+algorithms, the ciphers, the compression and the socket options of the
+sessions of the WAN nodes naming it, see ``[netconf_transport]``.
+
+ncclient builds the paramiko transport of a session itself, without a way
+to choose its algorithms. The TCP connection is opened here instead, with
+the socket options of the profile, and the paramiko transports pick the
+algorithms and the compression of the profile of the current context.
+"""
+
+import contextvars
+import socket
+import threading
+
+from ncclient import manager
+from oslo_log import log
+import paramiko
+
+from dci.common.i18n import _LW
+from dci.conf import CONF
+from dci.conf import netconf_transport as transport_conf
+
+
+LOG = log.getLogger(__name__)
+
+_CURRENT_PROFILE = contextvars.ContextVar('netconf_transport_profile',
+                                          default=None)
+_INSTALL_LOCK = threading.Lock()
+_INSTALLED = False
+
+
+class TransportProfile(object):
+    """The SSH transport options of the NETCONF sessions of a WAN node.
+
+    :param name: the name of the ``[netconf_transport:<name>]`` profile,
+                 None for the ``[netconf_transport]`` one. The options the
+                 profile leaves unset take the ``[netconf_transport]``
+                 values.
+    """
+
+    def __init__(self, name=None):
+        self.name = name
+        profile_conf = None
+        if name:
+            profile_conf = transport_conf.register_profile(CONF, name)
+
+        def _get(option):
+            if profile_conf is not None and \
+                    profile_conf[option] is not None:
+                return profile_conf[option]
+            return CONF.netconf_transport[option]
+
+        self.connect_timeout = (_get('connect_timeout') or
+                                CONF.device.netconf_connect_timeout)
+        self.rpc_timeout = (_get('rpc_timeout') or
+                            CONF.device.netconf_rpc_timeout)
+        self.keepalive_interval = _get('keepalive_interval')
+        self.kex_algorithms = _get('kex_algorithms') or []
+        self.ciphers = _get('ciphers') or []
+        self.compression = _get('compression')
+        self.tcp_nodelay = _get('tcp_nodelay')
+
+    def __repr__(self):
+        return '%s(%r)' % (self.__class__.__name__, self.name)
+
+
+def _preferred(wanted, supported, kind):
+    preferred = tuple(name for name in wanted if name in supported)
+    unknown = set(wanted) - set(preferred)
+    if unknown:
+        LOG.warning(_LW("Ignoring the SSH %(kind)s %(unknown)s, unknown to "
+                        "paramiko"), {'kind': kind,
+                                      'unknown': ', '.join(sorted(unknown))})
+    return preferred
+
+
+class _ProfiledTransport(paramiko.Transport):
+    """A paramiko transport applying the profile of the current context,
+    and behaving as a plain transport without one.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(_ProfiledTransport, self).__init__(*args, **kwargs)
+        profile = _CURRENT_PROFILE.get()
+        if profile is None:
+            return
+        if profile.kex_algorithms:
+            kex = _preferred(profile.kex_algorithms, self._kex_info,
+                             'key exchange algorithms')
+            if kex:
+                self._preferred_kex = kex
+        if profile.ciphers:
+            ciphers = _preferred(profile.ciphers, self._cipher_info,
+                                 'ciphers')
+            if ciphers:
+                self._preferred_ciphers = ciphers
+        if profile.compression:
+            self.use_compression()
+
+
+def _install():
+    # NOTE: ncclient creates its transports with paramiko.Transport, the
+    # other users of paramiko import the class itself and are unaffected.
+    global _INSTALLED
+    if not _INSTALLED:
+        with _INSTALL_LOCK:
+            if not _INSTALLED:
+                paramiko.Transport = _ProfiledTransport
+                _INSTALLED = True
+
+
+def _open_socket(host, port, profile, timeout):
+    sock = socket.create_connection((host, port), timeout=timeout)
+    try:
+        if profile.tcp_nodelay:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if profile.keepalive_interval:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    except Exception:
+        sock.close()
+        raise
+    return sock
+
+
+def connect(profile, host, port, timeout, **kwargs):
+    """Open a NETCONF session with ncclient, over an SSH transport tuned by
+    ``profile``.
+
+    :param kwargs: the other arguments of ``ncclient.manager.connect``.
+    """
+    _install()
+    sock = _open_socket(host, port, profile, timeout)
+    token = _CURRENT_PROFILE.set(profile)
+    try:
+        return manager.connect(host=host, port=port, timeout=timeout,
+                               sock=sock,
+                               keepalive=profile.keepalive_interval or None,
+                               **kwargs)
+    except Exception:
+        sock.close()
+        raise
+    finally:
+        _CURRENT_PROFILE.reset(token)
@@ -0,0 +1,43 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Run the blocking device driver calls off the eventlet hub.
+
+ncclient and paramiko do blocking socket and crypto work. Every method call
+of a device driver is handed to ``dci.common.executor``, so that a slow WAN
+node only holds a native thread instead of stalling the other requests of
+the API worker.
+"""
+
+import functools
+
+from dci.common import executor
+
+
+class ExecutorProxy(object):
+    """Wrap a device driver so that its method calls go through ``execute``.
+    """
+
+    def __init__(self, driver):
+        self._driver = driver
+
+    def __getattr__(self, name):
+        attr = getattr(self._driver, name)
+        if not callable(attr) or name.startswith('_'):
+            return attr
+
+        @functools.wraps(attr)
+        def wrapper(*args, **kwargs):
+            return executor.execute(attr, *args, **kwargs)
+        return wrapper
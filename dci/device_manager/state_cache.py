@@ -0,0 +1,110 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Cached snapshots of the slicing resources configured on the WAN nodes.
+
+A snapshot indexes the bridge domains, EVPN instances and NVE VNI members
+of the running configuration of a WAN node, read with a single get-config.
+The commits made through the driver apply their changes to the snapshot,
+and it is read again in full every ``[device] state_cache_refresh_interval``
+seconds, so that the pre-checks such as "is this bridge domain free?" are
+answered from memory.
+"""
+
+import threading
+import time
+
+from dci.conf import CONF
+
+
+KINDS = ('bridge_domains', 'evpn_instances', 'vnis')
+
+
+class DeviceStateSnapshot(object):
+    """The slicing resources of a WAN node, as sets of strings."""
+
+    def __init__(self, config):
+        for kind in KINDS:
+            setattr(self, kind, frozenset(str(name) for name in config[kind]))
+        self.taken_at = time.monotonic()
+
+    def as_dict(self):
+        return {kind: set(getattr(self, kind)) for kind in KINDS}
+
+    def is_bridge_domain_free(self, bridge_domain):
+        return str(bridge_domain) not in self.bridge_domains
+
+    def is_evpn_instance_free(self, name):
+        return name not in self.evpn_instances
+
+    def is_vni_free(self, vni):
+        return str(vni) not in self.vnis
+
+
+class DeviceStateCache(object):
+    """The snapshots of the WAN nodes known to this process."""
+
+    def __init__(self):
+        self._snapshots = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the snapshot of a WAN node, None if missing or stale."""
+        interval = CONF.device.state_cache_refresh_interval
+        with self._lock:
+            snapshot = self._snapshots.get(key)
+        if snapshot is None or not interval or (
+                time.monotonic() - snapshot.taken_at >= interval):
+            return None
+        return snapshot
+
+    def set(self, key, config):
+        """Replace the snapshot of a WAN node after a full read."""
+        snapshot = DeviceStateSnapshot(config)
+        if CONF.device.state_cache_refresh_interval:
+            with self._lock:
+                self._snapshots[key] = snapshot
+        return snapshot
+
+    def apply(self, key, added=None, removed=None):
+        """Apply the changes of a commit to the snapshot of a WAN node.
+
+        :param added: a dict mapping a kind, e.g. ``bridge_domains``, to the
+                      names the commit created.
+        :param removed: the same for the names the commit deleted.
+        """
+        with self._lock:
+            snapshot = self._snapshots.get(key)
+            if snapshot is None:
+                return
+            # NOTE: The sets are replaced rather than updated, so that the
+            # readers never see them change.
+            for kind, names in (added or {}).items():
+                setattr(snapshot, kind, getattr(snapshot, kind) | frozenset(
+                    str(name) for name in names))
+            for kind, names in (removed or {}).items():
+                setattr(snapshot, kind, getattr(snapshot, kind) - frozenset(
+                    str(name) for name in names))
+
+    def invalidate(self, key):
+        """Forget the snapshot of a WAN node, e.g. after a failed commit."""
+        with self._lock:
+            self._snapshots.pop(key, None)
+
+
+_CACHE = DeviceStateCache()
+
+
+def get_device_state_cache():
+    return _CACHE
@@ -0,0 +1,184 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Per WAN node work queue of the device configuration changes.
+
+The drivers lock the running datastore while they edit it, so two changes
+hitting the same WAN node at once, from any API worker, make one of them
+fail. Every change is instead enqueued in the database and applied when it
+reaches the head of the queue of its WAN node. Each waiting change keeps
+its lease alive, and so does the running change from a heartbeat thread,
+so the changes of a dead worker expire and do not block the queue.
+"""
+
+import datetime
+import os
+import socket
+
+from oslo_log import log
+from oslo_utils import timeutils
+
+from dci.common import deadline
+from dci.common import exception
+from dci.common import executor
+from dci.common import heartbeat
+from dci.common.i18n import _LI
+from dci.common import metrics
+from dci.conf import CONF
+from dci.db import api as dbapi
+
+
+LOG = log.getLogger(__name__)
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+
+
+def _lease_expiry():
+    return timeutils.utcnow() + datetime.timedelta(
+        seconds=CONF.device.queue_lease_timeout)
+
+
+class WANNodeWorkQueue(object):
+    """Serialise the configuration changes of the WAN nodes."""
+
+    def __init__(self, context=None):
+        self.context = context
+        self.dbapi = dbapi.get_instance()
+        self.holder = '%s:%d' % (socket.gethostname(), os.getpid())
+
+    def _pending(self, wan_node_uuid):
+        pending = self.dbapi.wan_node_work_item_list_pending(
+            self.context, wan_node_uuid, timeutils.utcnow())
+        metrics.set_gauge(metrics.WAN_NODE_QUEUE + '_depth', len(pending),
+                          wan_node=wan_node_uuid)
+        return pending
+
+    def _find_coalescable(self, wan_node_uuid, coalesce_key):
+        for item in self._pending(wan_node_uuid):
+            if item.state == QUEUED and item.coalesce_key == coalesce_key:
+                return item
+
+    def _wait_for_turn(self, wan_node_uuid, item_id, give_up_at):
+        while True:
+            pending = self._pending(wan_node_uuid)
+            if pending and pending[0].id == item_id:
+                return
+            if timeutils.utcnow() >= give_up_at:
+                raise exception.WANNodeQueueTimeout(
+                    timeout=CONF.device.queue_timeout,
+                    wan_node=wan_node_uuid)
+            self.dbapi.wan_node_work_item_update(
+                self.context, item_id, {'expires_at': _lease_expiry()})
+            executor.sleep(CONF.device.queue_poll_interval)
+
+    def _wait_for_item(self, wan_node_uuid, item, give_up_at):
+        """Wait for the outcome of the change a new one was coalesced with.
+
+        :returns: True when it succeeded, False when it expired before
+                  running, in which case the new change is enqueued.
+        """
+        while True:
+            item = self.dbapi.wan_node_work_item_get(self.context, item.id)
+            if item is None or (item.state in (QUEUED, RUNNING) and
+                                item.expires_at <= timeutils.utcnow()):
+                return False
+            if item.state == SUCCEEDED:
+                return True
+            if item.state == FAILED:
+                raise exception.WANNodeWorkFailed(
+                    operation=item.operation, wan_node=wan_node_uuid,
+                    err=item.error)
+            if timeutils.utcnow() >= give_up_at:
+                raise exception.WANNodeQueueTimeout(
+                    timeout=CONF.device.queue_timeout,
+                    wan_node=wan_node_uuid)
+            executor.sleep(CONF.device.queue_poll_interval)
+
+    def run(self, wan_node_uuid, operation, func, coalesce_key=None):
+        """Call ``func`` when the change reaches the head of the queue.
+
+        :param wan_node_uuid: the WAN node the change is applied to.
+        :param operation: the name of the change, e.g. the driver method.
+        :param func: callable applying the change to the WAN node.
+        :param coalesce_key: optional key of the change; a change waiting in
+                             the queue with the same key is not applied
+                             again, its outcome is shared instead and None
+                             is returned.
+        :raises: WANNodeQueueTimeout if the change did not get its turn in
+                 ``[device] queue_timeout`` seconds.
+        """
+        if not CONF.device.serialize_mutations:
+            return func()
+
+        # NOTE: Do not wait past the deadline of the request.
+        give_up_at = timeutils.utcnow() + datetime.timedelta(
+            seconds=deadline.timeout(CONF.device.queue_timeout, operation))
+        labels = {'wan_node': wan_node_uuid, 'operation': operation}
+
+        if coalesce_key and CONF.device.queue_coalescing:
+            item = self._find_coalescable(wan_node_uuid, coalesce_key)
+            if item is not None:
+                LOG.info(_LI("%(operation)s on WAN node %(wan_node)s "
+                             "coalesced with work item %(id)s"),
+                         dict(labels, id=item.id))
+                with metrics.timed(metrics.WAN_NODE_QUEUE,
+                                   coalesced='true', **labels):
+                    if self._wait_for_item(wan_node_uuid, item, give_up_at):
+                        return None
+
+        self.dbapi.wan_node_work_item_purge(self.context, timeutils.utcnow())
+        item = self.dbapi.wan_node_work_item_create(self.context, {
+            'wan_node_uuid': wan_node_uuid,
+            'operation': operation,
+            'coalesce_key': coalesce_key,
+            'state': QUEUED,
+            'holder': self.holder,
+            'expires_at': _lease_expiry(),
+        })
+        item_id = item.id
+
+        try:
+            with metrics.timed(metrics.WAN_NODE_QUEUE, coalesced='false',
+                               **labels):
+                self._wait_for_turn(wan_node_uuid, item_id, give_up_at)
+        except Exception:
+            self.dbapi.wan_node_work_item_delete(self.context, item_id)
+            raise
+
+        self.dbapi.wan_node_work_item_update(
+            self.context, item_id,
+            {'state': RUNNING, 'expires_at': _lease_expiry()})
+        renew_lease = heartbeat.Heartbeat(
+            CONF.device.queue_lease_timeout / 3.0,
+            lambda: self.dbapi.wan_node_work_item_update(
+                self.context, item_id, {'expires_at': _lease_expiry()}),
+            name='wan-node-queue-%s' % item_id)
+        try:
+            with renew_lease:
+                result = func()
+        except Exception as err:
+            # NOTE: Keep the outcome for the coalesced changes until the
+            # lease expires, then the item is purged.
+            self.dbapi.wan_node_work_item_update(
+                self.context, item_id,
+                {'state': FAILED, 'error': str(err),
+                 'expires_at': _lease_expiry()})
+            raise
+        self.dbapi.wan_node_work_item_update(
+            self.context, item_id,
+            {'state': SUCCEEDED, 'expires_at': _lease_expiry()})
+        return result
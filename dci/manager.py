@@ -12,12 +12,41 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
+import functools
+import threading
+
+from oslo_log import log
+
 from dci.common import constants
+from dci.common import deadline
+from dci.common import exception
+from dci.common.i18n import _LE
+from dci.common.i18n import _LI
+from dci.common.i18n import _LW
 from dci.common import utils
-from dci.device_manager.drivers.huawei import netengine
-from dci.sdnc_manager.tungsten_fabric import vnc_api_client as tf_vnc_api
+from dci.conf import CONF
+from dci.device_manager import api as device_api
+from dci.device_manager import coordinated_commit
+from dci.device_manager import work_queue
+from dci.sdnc_manager import api as sdnc_api
 from dci.task_flows import flows
-from dci.task_flows import tasks
+from dci.task_flows import persistence
+
+
+LOG = log.getLogger(__name__)
+
+# Number of draws of the bridge domains of a slicing, see
+# NetworkSlicingManager._pick_free_bridge_domains.
+BRIDGE_DOMAIN_DRAWS = 10
+
+
+def _get_sdnc_mgr(site):
+    return sdnc_api.SDNControllerManager(sdnc_conn_ref=site).driver_handle
+
+
+def _get_dev_mgr(wan_node):
+    return device_api.DeviceManager(device_conn_ref=wan_node).driver_handle
 
 
 def _prepare_l2vpn_slicing_configuration():
@@ -62,60 +91,182 @@ def _prepare_l2vpn_slicing_configuration():
     return configuration
 
 
+def get_slicing_values(flow_store):
+    """Return the fields of a slicing set by its creation flow."""
+    values = {}
+    for side in ('east', 'west'):
+        values.update({
+            side + '_dcn_vn_uuid': flow_store[side + '_vn_uuid'],
+            side + '_dcn_vn_vni': flow_store[side + '_vn_vni'],
+            side + '_dcn_vn_route_target': flow_store[side + '_vn_rt'],
+            side + '_access_vpn_vni': flow_store[side + '_vn_vni'],
+            side + '_access_vpn_route_target':
+                flow_store[side + '_access_vpn_rt'],
+            side + '_access_vpn_route_distinguisher':
+                flow_store[side + '_access_vpn_rd'],
+            side + '_wan_vpn_route_target': flow_store[side + '_wan_vpn_rt'],
+            side + '_wan_vpn_route_distinguisher':
+                flow_store[side + '_wan_vpn_rd'],
+            side + '_access_vpn_bridge_domain':
+                flow_store[side + '_access_vpn_bd'],
+            side + '_wan_vpn_bridge_domain': flow_store[side + '_wan_vpn_bd'],
+            side + '_splicing_vlan_id': flow_store['splicing_vlan_id'],
+        })
+    return values
+
+
 class NetworkSlicingManager(object):
 
     def __init__(self, obj_east_site, obj_west_site, slicing_name,
-                 slicing_type=constants.L2VPN_SLICING):  # noqa
+                 slicing_type=constants.L2VPN_SLICING, timeout=None):  # noqa
+        """Constructor of Network Slicing Manager.
+
+        :param timeout: optional overall time budget of the slicing
+            operation, in seconds, shared by the connections, the flow
+            tasks, the NETCONF RPCs and the VNC API calls.
+        """
         if slicing_type not in constants.SLICING_TYPE_LIST:
             raise
 
+        self.deadline = deadline.Deadline(timeout) if timeout else None
+
         self.slicing_type = slicing_type
-        self.obj_east_wan_node = obj_east_site.wan_nodes[0]
-        self.east_sdnc_mgr = self._get_sdnc_mgr(obj_east_site)
-        self.east_dev_mgr = self._get_dev_mgr(self.obj_east_wan_node)
+        with deadline.scope(self.deadline):
+            self.obj_east_wan_node = obj_east_site.wan_nodes[0]
+            self.east_sdnc_mgr = self._get_sdnc_mgr(obj_east_site)
+            self.east_dev_mgr = self._get_dev_mgr(self.obj_east_wan_node)
 
-        self.obj_west_wan_node = obj_west_site.wan_nodes[0]
-        self.west_sdnc_mgr = self._get_sdnc_mgr(obj_west_site)
-        self.west_dev_mgr = self._get_dev_mgr(self.obj_west_wan_node)
+            self.obj_west_wan_node = obj_west_site.wan_nodes[0]
+            self.west_sdnc_mgr = self._get_sdnc_mgr(obj_west_site)
+            self.west_dev_mgr = self._get_dev_mgr(self.obj_west_wan_node)
 
         self.vn_name = constants.VN_NAME_PREFIX + slicing_name
         self.wan_vpn_name = constants.WAN_VPN_NAME_PREFIX + slicing_name
         self.access_vpn_name = constants.ACCESS_VPN_NAME_PREFIX + slicing_name
 
+        # Timing records of the tasks of the last flow run.
+        self.stage_timings = []
+
+        # Logbook of the last persisted flow run.
+        self.flow_book = None
+
+        self.work_queue = work_queue.WANNodeWorkQueue()
+
     def _get_sdnc_mgr(self, site):
-        return tf_vnc_api.Client(
-            host=site.tf_api_server_host,
-            port=site.tf_api_server_port,
-            username=site.tf_username,
-            password=site.tf_password,
-            project=site.os_project_name)
+        return _get_sdnc_mgr(site)
 
     def _get_dev_mgr(self, wan_node):
-        return netengine.NetEngineDriver(
-            host=wan_node.netconf_host,
-            port=wan_node.netconf_port,
-            username=wan_node.netconf_username,
-            password=wan_node.netconf_password)
+        return _get_dev_mgr(wan_node)
+
+    def _pick_free_bridge_domains(self, flow_store):
+        """Draw the bridge domains of the slicing again while they are in
+        use on one of its WAN nodes.
+
+        The checks run against the cached snapshots of the WAN nodes, see
+        `dci.device_manager.state_cache`.
+        """
+        if not CONF.device.state_cache_refresh_interval:
+            return
+        try:
+            snapshots = [self.east_dev_mgr.get_device_state(),
+                         self.west_dev_mgr.get_device_state()]
+        except Exception as err:
+            LOG.warning(_LW("Failed to get the state of the WAN nodes, the "
+                            "bridge domains are not checked, details "
+                            "%s"), err)
+            return
+
+        for _draw in range(BRIDGE_DOMAIN_DRAWS):
+            wan_vpn_bd = flow_store['east_wan_vpn_bd']
+            access_vpn_bd = flow_store['east_access_vpn_bd']
+            if wan_vpn_bd != access_vpn_bd and all(
+                    snapshot.is_bridge_domain_free(wan_vpn_bd) and
+                    snapshot.is_bridge_domain_free(access_vpn_bd)
+                    for snapshot in snapshots):
+                return
+            flow_store['east_wan_vpn_bd'] = flow_store['west_wan_vpn_bd'] = \
+                utils.generate_random_bridge_domain()
+            flow_store['east_access_vpn_bd'] = \
+                flow_store['west_access_vpn_bd'] = \
+                utils.generate_random_bridge_domain()
+        raise exception.BridgeDomainExhausted(draws=BRIDGE_DOMAIN_DRAWS)
 
     def execute_create_evpn_vpls_over_srv6_be_slicing_flow(
             self, subnet_cidr,
             east_dcn_vn_subnet_allocation_pool,
-            west_dcn_vn_subnet_allocation_pool):
-
+            west_dcn_vn_subnet_allocation_pool, slicing=None,
+            idempotency_route=None):
+        """Run the flow creating the slicing.
+
+        :param slicing: optional API representation of the slicing, with
+            its uuid. When the flow persistence is enabled, it is recorded
+            in the logbook along with the progress of the flow, so that the
+            creation can be resumed if this process dies. Call
+            release_flow once the slicing is recorded.
+        :param idempotency_route: the route of the Idempotency-Key of the
+            request, if any, completed by a resumed creation.
+        """
         flow_name = "create_l2vpn_slicing_flow"
-        flow_list = [tasks.EastDCN_EVPNVxLAN(),
-                     tasks.WestDCN_EVPNVxLAN(),
-                     tasks.EastVPN_EVPNVPLSoSRv6BE(),
-                     tasks.WestVPN_EVPNVPLSoSRv6BE()]
+        coordinated = CONF.device.coordinated_commit
+        flow_api = flows.create_l2vpn_slicing_flow(flow_name, coordinated)
 
         flow_store = _prepare_l2vpn_slicing_configuration()
-        flow_store['ns_mgr'] = self
         flow_store['subnet_cidr'] = subnet_cidr
         flow_store['east_dcn_vn_subnet_ip_pool'] = east_dcn_vn_subnet_allocation_pool  # noqa
         flow_store['west_dcn_vn_subnet_ip_pool'] = west_dcn_vn_subnet_allocation_pool  # noqa
-        flow_engine = flows.get_flow(flow_name, flow_list, flow_store)
-        flow_engine.run()
+        with deadline.scope(self.deadline):
+            self._pick_free_bridge_domains(flow_store)
+
+        flow_detail = None
+        if slicing is not None and persistence.get_backend() is not None:
+            self.flow_book, flow_detail = persistence.create_flow_detail(
+                flow_name, slicing['uuid'],
+                flows.CREATE_L2VPN_SLICING_FACTORY, [flow_name, coordinated],
+                {'slicing': slicing, 'slicing_type': self.slicing_type,
+                 'idempotency_route': idempotency_route})
+        return self._run_create_flow(flow_api, flow_store, flow_detail)
+
+    def resume_create_evpn_vpls_over_srv6_be_slicing_flow(self, book,
+                                                          flow_detail):
+        """Resume a persisted slicing creation flow from its last
+        completed task.
+        """
+        self.flow_book = book
+        persistence.claim(flow_detail)
+        return self._run_create_flow(flows.flow_from_detail(flow_detail),
+                                     None, flow_detail)
+
+    def release_flow(self):
+        """Forget the persisted progress of the last flow run."""
+        if self.flow_book is not None:
+            persistence.destroy(self.flow_book)
+            self.flow_book = None
+
+    def _run_create_flow(self, flow_api, flow_store, flow_detail):
+        locations = {
+            'east': {'site_uuid': self.obj_east_wan_node.site_uuid,
+                     'wan_node_uuid': self.obj_east_wan_node.uuid},
+            'west': {'site_uuid': self.obj_west_wan_node.site_uuid,
+                     'wan_node_uuid': self.obj_west_wan_node.uuid},
+        }
+        timing_recorder = flows.StageTimingRecorder(
+            {task.name: locations.get(task.side, {}) for task in flow_api})
+        flow_engine = flows.load_flow(flow_api, flow_store,
+                                      flow_detail=flow_detail,
+                                      transient_store={'ns_mgr': self},
+                                      timing_recorder=timing_recorder)
+        try:
+            with deadline.scope(self.deadline):
+                flow_engine.run()
+        except Exception:
+            # NOTE: The flow was reverted, there is nothing left to resume.
+            self.release_flow()
+            raise
+        finally:
+            self.stage_timings = timing_recorder.records
 
+        flow_store = dict(flow_engine.storage.fetch_all())
+        flow_store.pop('ns_mgr', None)
         flow_store['east_dcn_vn_vni'] = flow_store['east_access_vpn_vni'] = flow_engine.storage.fetch('east_vn_vni')  # noqa
         flow_store['west_dcn_vn_vni'] = flow_store['west_access_vpn_vni'] = flow_engine.storage.fetch('west_vn_vni')  # noqa
         flow_store['east_dcn_vn_uuid'] = flow_engine.storage.fetch('east_vn_uuid')  # noqa
@@ -131,22 +282,23 @@ class NetworkSlicingManager(object):
             west_access_vpn_bridge_domain,
             west_access_vpn_vni):
 
-        self.delete_evpn_vxlan_dcn(self.east_sdnc_mgr)
-        self.delete_evpn_vxlan_dcn(self.west_sdnc_mgr)
+        with deadline.scope(self.deadline):
+            self.delete_evpn_vxlan_dcn(self.east_sdnc_mgr)
+            self.delete_evpn_vxlan_dcn(self.west_sdnc_mgr)
 
-        self.delete_evpn_vpls_over_srv6_be_wan_and_evpn_vxlan_access_vpn(
-            self.east_dev_mgr,
-            self.obj_east_wan_node,
-            wan_vpn_bd=east_wan_vpn_bridge_domain,
-            access_vpn_bd=east_access_vpn_bridge_domain,
-            access_vpn_vxlan_vni=east_access_vpn_vni)
+            self.delete_evpn_vpls_over_srv6_be_wan_and_evpn_vxlan_access_vpn(
+                self.east_dev_mgr,
+                self.obj_east_wan_node,
+                wan_vpn_bd=east_wan_vpn_bridge_domain,
+                access_vpn_bd=east_access_vpn_bridge_domain,
+                access_vpn_vxlan_vni=east_access_vpn_vni)
 
-        self.delete_evpn_vpls_over_srv6_be_wan_and_evpn_vxlan_access_vpn(
-            self.west_dev_mgr,
-            self.obj_west_wan_node,
-            wan_vpn_bd=west_wan_vpn_bridge_domain,
-            access_vpn_bd=west_access_vpn_bridge_domain,
-            access_vpn_vxlan_vni=west_access_vpn_vni)
+            self.delete_evpn_vpls_over_srv6_be_wan_and_evpn_vxlan_access_vpn(
+                self.west_dev_mgr,
+                self.obj_west_wan_node,
+                wan_vpn_bd=west_wan_vpn_bridge_domain,
+                access_vpn_bd=west_access_vpn_bridge_domain,
+                access_vpn_vxlan_vni=west_access_vpn_vni)
 
     def create_evpn_vxlan_dcn(self, sdnc_mgr, subnet_cidr,
                               subnet_allocation_pool, route_target):
@@ -170,12 +322,11 @@ class NetworkSlicingManager(object):
     def delete_evpn_vxlan_dcn(self, sdnc_mgr):
         sdnc_mgr.delete_virtual_network(self.vn_name)
 
-    def create_evpn_vpls_over_srv6_be_wan_and_evpn_vxlan_access_vpn(
-            self, dev_mgr, wan_node,
-            wan_vpn_rd, wan_vpn_rt, wan_vpn_bd,
-            access_vpn_rd, access_vpn_rt, access_vpn_bd,
-            access_vpn_vxlan_vni, splicing_vlan_id):
-        dev_mgr.create_evpn_vpls_over_srv6_be_wan_and_evpn_vxlan_access_vpn(
+    def _get_create_vpn_kwargs(self, wan_node, wan_vpn_rd, wan_vpn_rt,
+                               wan_vpn_bd, access_vpn_rd, access_vpn_rt,
+                               access_vpn_bd, access_vpn_vxlan_vni,
+                               splicing_vlan_id):
+        return dict(
             wan_vpn_name=self.wan_vpn_name,
             wan_vpn_rd=wan_vpn_rd,
             wan_vpn_rt=wan_vpn_rt,
@@ -195,10 +346,55 @@ class NetworkSlicingManager(object):
             preset_access_vpn_bd_intf=wan_node.preset_access_vpn_bd_intf
         )
 
+    def create_evpn_vpls_over_srv6_be_wan_and_evpn_vxlan_access_vpn(
+            self, dev_mgr, wan_node,
+            wan_vpn_rd, wan_vpn_rt, wan_vpn_bd,
+            access_vpn_rd, access_vpn_rt, access_vpn_bd,
+            access_vpn_vxlan_vni, splicing_vlan_id):
+        create_vpn = functools.partial(
+            dev_mgr.create_evpn_vpls_over_srv6_be_wan_and_evpn_vxlan_access_vpn,  # noqa
+            **self._get_create_vpn_kwargs(
+                wan_node, wan_vpn_rd, wan_vpn_rt, wan_vpn_bd, access_vpn_rd,
+                access_vpn_rt, access_vpn_bd, access_vpn_vxlan_vni,
+                splicing_vlan_id))
+        self.work_queue.run(wan_node.uuid, 'create_vpn', create_vpn)
+
+    def create_evpn_vpls_over_srv6_be_wan_and_evpn_vxlan_access_vpns(
+            self, vpns):
+        """Create the VPNs of several WAN nodes with a coordinated commit,
+        see `dci.device_manager.coordinated_commit`.
+
+        :param vpns: a list of dicts holding the keyword arguments of
+            `create_evpn_vpls_over_srv6_be_wan_and_evpn_vxlan_access_vpn`.
+        :raises: CoordinatedCommitFailed
+        """
+        participants = []
+        for vpn in vpns:
+            vpn = dict(vpn)
+            dev_mgr = vpn.pop('dev_mgr')
+            wan_node = vpn.pop('wan_node')
+            participants.append(coordinated_commit.Participant(
+                wan_node.uuid, dev_mgr, functools.partial(
+                    dev_mgr.prepare_create_evpn_vpls_over_srv6_be_wan_and_evpn_vxlan_access_vpn,  # noqa
+                    **self._get_create_vpn_kwargs(wan_node, **vpn))))
+
+        create_vpns = functools.partial(coordinated_commit.commit,
+                                        participants)
+        # NOTE: Hold the turn of every WAN node, taken in the order of
+        # their UUIDs so that two coordinated commits cannot wait for
+        # each other.
+        for wan_node_uuid in sorted(set(participant.name
+                                        for participant in participants),
+                                    reverse=True):
+            create_vpns = functools.partial(
+                self.work_queue.run, wan_node_uuid, 'create_vpn', create_vpns)
+        create_vpns()
+
     def delete_evpn_vpls_over_srv6_be_wan_and_evpn_vxlan_access_vpn(
             self, dev_mgr, wan_node, access_vpn_vxlan_vni,
             wan_vpn_bd, access_vpn_bd):
-        dev_mgr.delete_evpn_vpls_over_srv6_be_wan_and_evpn_vxlan_access_vpn(
+        delete_vpn = functools.partial(
+            dev_mgr.delete_evpn_vpls_over_srv6_be_wan_and_evpn_vxlan_access_vpn,  # noqa
             wan_vpn_name=self.wan_vpn_name,
             access_vpn_name=self.access_vpn_name,
             access_vpn_vxlan_vni=access_vpn_vxlan_vni,
@@ -209,3 +405,162 @@ class NetworkSlicingManager(object):
             access_vpn_bd=access_vpn_bd,
             preset_access_vpn_bd_intf=wan_node.preset_access_vpn_bd_intf
         )
+        # NOTE: The retries of a delete still waiting for its turn are not
+        # applied twice.
+        self.work_queue.run(wan_node.uuid, 'delete_vpn', delete_vpn,
+                            coalesce_key='delete_vpn:' + self.wan_vpn_name)
+
+
+class BulkNetworkSlicingManager(object):
+    """Tear down many network slicings at once.
+
+    The work is grouped by Tungsten Fabric cluster and by WAN node, so each
+    cluster and device is connected to once, the virtual networks are
+    deleted in parallel and every WAN node gets a single delete commit.
+    """
+
+    def __init__(self, obj_sites, progress_callback=None):
+        """Constructor of Bulk Network Slicing Manager.
+
+        :param obj_sites: the sites of the slicings, with their WAN nodes.
+        :param progress_callback: optional callable called as
+            ``progress_callback(stage, done, total)`` each time a virtual
+            network or a WAN node has been processed, with the counts of
+            the stage over all the sites.
+        """
+        self.obj_sites = {obj_site.uuid: obj_site for obj_site in obj_sites}
+        self.progress_callback = progress_callback
+        self.work_queue = work_queue.WANNodeWorkQueue()
+        # NOTE: The [done, failed, total] work items of every stage, in the
+        # order the stages started.
+        self.progress = collections.OrderedDict()
+        self._progress_lock = threading.Lock()
+
+    def _report_progress(self, stage, failed):
+        with self._progress_lock:
+            counts = self.progress[stage]
+            counts[0] += 1
+            counts[1] += int(failed)
+            done, total = counts[0], counts[2]
+        if self.progress_callback:
+            self.progress_callback(stage, done, total)
+
+    def _run_stage(self, stage, func, work_items):
+        """Run ``func`` on the work items in parallel, reporting progress.
+
+        :returns: a list of the errors, None for succeeded work items.
+        """
+        with self._progress_lock:
+            self.progress.setdefault(stage, [0, 0, 0])[2] += len(work_items)
+
+        def _run(work_item):
+            failed = True
+            try:
+                result = func(work_item)
+                failed = False
+                return result
+            finally:
+                self._report_progress(stage, failed)
+
+        return [err for _result, err in utils.concurrent_map(
+            _run, work_items, CONF.api.bulk_max_workers)]
+
+    def _delete_virtual_networks(self, site_uuid, vn_names):
+        """Delete the virtual networks of one Tungsten Fabric cluster."""
+        sdnc_mgr = _get_sdnc_mgr(self.obj_sites[site_uuid])
+        errors = self._run_stage('delete_virtual_networks',
+                                 sdnc_mgr.delete_virtual_network, vn_names)
+        return dict(zip(vn_names, errors))
+
+    def _delete_device_vpns(self, site_uuid, obj_slicings):
+        """Delete the VPNs of the slicings on the WAN node of a site."""
+        wan_node = self.obj_sites[site_uuid].wan_nodes[0]
+        slicings = []
+        for obj_slicing in obj_slicings:
+            side = 'east' if obj_slicing.east_site_uuid == site_uuid \
+                else 'west'
+            slicings.append({
+                'wan_vpn_name':
+                    constants.WAN_VPN_NAME_PREFIX + obj_slicing.name,
+                'access_vpn_name':
+                    constants.ACCESS_VPN_NAME_PREFIX + obj_slicing.name,
+                'access_vpn_vxlan_vni':
+                    obj_slicing[side + '_access_vpn_vni'],
+                'preset_vxlan_nve_intf': wan_node.preset_evpn_vxlan_nve_intf,
+                'wan_vpn_bd': obj_slicing[side + '_wan_vpn_bridge_domain'],
+                'preset_wan_vpn_bd_intf': wan_node.preset_wan_vpn_bd_intf,
+                'access_vpn_bd':
+                    obj_slicing[side + '_access_vpn_bridge_domain'],
+                'preset_access_vpn_bd_intf':
+                    wan_node.preset_access_vpn_bd_intf,
+            })
+
+        dev_mgr = _get_dev_mgr(wan_node)
+        self.work_queue.run(
+            wan_node.uuid, 'bulk_delete_vpn', functools.partial(
+                dev_mgr.bulk_delete_evpn_vpls_over_srv6_be_wan_and_evpn_vxlan_access_vpn,  # noqa
+                slicings))
+
+    def execute_bulk_delete_evpn_vpls_over_srv6_be_slicing_flow(
+            self, obj_slicings):
+        """Delete the slicings from Tungsten Fabric and the WAN nodes.
+
+        :returns: a dict mapping the UUID of every slicing to the first
+                  error met while tearing it down, or None on success.
+        """
+        errors = {}
+        vn_names_by_site = collections.defaultdict(set)
+        slicings_by_site = collections.defaultdict(list)
+        for obj_slicing in obj_slicings:
+            errors[obj_slicing.uuid] = None
+            site_uuids = (obj_slicing.east_site_uuid,
+                          obj_slicing.west_site_uuid)
+            for site_uuid in site_uuids:
+                if site_uuid not in self.obj_sites:
+                    errors[obj_slicing.uuid] = exception.ResourceNotFound(
+                        resource='Site', msg='with uuid=%s' % site_uuid)
+            if errors[obj_slicing.uuid] is None:
+                for site_uuid in site_uuids:
+                    vn_names_by_site[site_uuid].add(
+                        constants.VN_NAME_PREFIX + obj_slicing.name)
+                    slicings_by_site[site_uuid].append(obj_slicing)
+
+        def _record(obj_slicing, err):
+            if err is not None and errors[obj_slicing.uuid] is None:
+                errors[obj_slicing.uuid] = err
+
+        # Tungsten Fabric clusters, virtual networks deleted in parallel.
+        for site_uuid, vn_names in vn_names_by_site.items():
+            vn_names = sorted(vn_names)
+            try:
+                vn_errors = self._delete_virtual_networks(site_uuid,
+                                                          vn_names)
+            except Exception as err:
+                LOG.error(_LE("Failed to connect Tungsten Fabric of site "
+                              "[%(site)s], details %(err)s"),
+                          {'site': site_uuid, 'err': err})
+                vn_errors = dict.fromkeys(vn_names, err)
+            for obj_slicing in slicings_by_site[site_uuid]:
+                _record(obj_slicing, vn_errors.get(
+                    constants.VN_NAME_PREFIX + obj_slicing.name))
+
+        # WAN nodes, one batched delete commit per device in parallel.
+        site_uuids = sorted(slicings_by_site)
+        device_errors = self._run_stage(
+            'delete_device_vpns',
+            lambda site_uuid: self._delete_device_vpns(
+                site_uuid, slicings_by_site[site_uuid]),
+            site_uuids)
+        for site_uuid, err in zip(site_uuids, device_errors):
+            if err is not None:
+                LOG.error(_LE("Failed to delete VPNs on the WAN node of "
+                              "site [%(site)s], details %(err)s"),
+                          {'site': site_uuid, 'err': err})
+            for obj_slicing in slicings_by_site[site_uuid]:
+                _record(obj_slicing, err)
+
+        LOG.info(_LI("Bulk delete of %(total)d slicings finished, "
+                     "%(failed)d failed."),
+                 {'total': len(errors),
+                  'failed': len([err for err in errors.values() if err])})
+        return errors
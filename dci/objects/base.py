@@ -16,8 +16,10 @@ from oslo_log import log as logging
 from oslo_utils import versionutils
 from oslo_versionedobjects import base as object_base
 
+from dci.common import cache
 from dci import objects
 from dci.objects import fields as object_fields
+from dci.objects import inventory
 
 
 LOG = logging.getLogger(__name__)
@@ -54,6 +56,9 @@ class DCIObject(object_base.VersionedObject):
         'updated_at': object_fields.DateTimeField(nullable=True),
     }
 
+    # Names of the objects whose serialised form embeds this object.
+    cache_dependents = ()
+
     def as_dict(self):
         """Return the object represented as a dict.
 
@@ -95,6 +100,16 @@ class DCIObject(object_base.VersionedObject):
             objs.append(cls._from_db_object(cls(context), db_obj, context))
         return objs
 
+    @classmethod
+    def _invalidate_caches(cls):
+        """Drop the cached serialised resources and inventory entries
+        affected by a write.
+        """
+        response_cache = cache.get_response_cache()
+        for obj_name in (cls.obj_name(),) + tuple(cls.cache_dependents):
+            response_cache.invalidate(obj_name)
+            inventory.invalidate(obj_name)
+
     def obj_make_compatible(self, primitive, target_version):
         """Make an object representation compatible with a target version.
 
@@ -16,6 +16,7 @@ from oslo_log import log as logging
 from oslo_versionedobjects import base as object_base
 
 from dci.common import constants
+from dci.common import subnet_index
 from dci.db import api as dbapi
 from dci.objects import base
 from dci.objects import fields as object_fields
@@ -70,12 +71,21 @@ class EVPNVPLSoSRv6BESlicing(base.DCIObject,
         'west_splicing_vlan_id': object_fields.StringField(nullable=False),
     }
 
-    def create(self, context):
-        """Create a EVPN VPLS over SRv6 BE network slicing record in the DB."""
+    def create(self, context, idempotency=None):
+        """Create a EVPN VPLS over SRv6 BE network slicing record in the DB.
+
+        :param idempotency: optional ``(route, values)`` update of the
+                            Idempotency-Key record of the slicing, made in
+                            the same transaction, see
+                            ``dci.api.controllers.idempotency.completion``.
+        """
         values = self.obj_get_changes()
         db_evpn_vpls_over_srv6_be_slicing = \
-            self.dbapi.evpn_vpls_over_srv6_be_slicing_create(context, values)
+            self.dbapi.evpn_vpls_over_srv6_be_slicing_create(
+                context, values, idempotency=idempotency)
         self._from_db_object(self, db_evpn_vpls_over_srv6_be_slicing)
+        self._invalidate_caches()
+        subnet_index.get_subnet_index().add_slicing(self)
 
     @classmethod
     def get(cls, context, uuid):
@@ -115,8 +125,26 @@ class EVPNVPLSoSRv6BESlicing(base.DCIObject,
             self.dbapi.evpn_vpls_over_srv6_be_slicing_update(
                 context, self.uuid, updates)
         self._from_db_object(self, db_evpn_vpls_over_srv6_be_slicing)
+        self._invalidate_caches()
 
     def destroy(self, context):
         """Delete the EVPN VPLS over SRv6 BE network slicing from the DB."""
         self.dbapi.evpn_vpls_over_srv6_be_slicing_delete(context, self.uuid)
         self.obj_reset_changes()
+        self._invalidate_caches()
+        subnet_index.get_subnet_index().release(self.uuid)
+
+    @classmethod
+    def bulk_destroy(cls, context, uuids):
+        """Delete EVPN VPLS over SRv6 BE network slicings from the DB in a
+        single transaction.
+
+        :returns: the UUIDs of the deleted slicings.
+        """
+        deleted_uuids = \
+            cls.dbapi.evpn_vpls_over_srv6_be_slicing_bulk_delete(context,
+                                                                 uuids)
+        cls._invalidate_caches()
+        for uuid in deleted_uuids:
+            subnet_index.get_subnet_index().release(uuid)
+        return deleted_uuids
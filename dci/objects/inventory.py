@@ -0,0 +1,108 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Per process cache of the sites and WAN nodes read from the database.
+
+Every slicing request reads its sites, and their WAN nodes, by UUID. The
+objects read are kept as tuples of their field values, in the order of the
+sorted field names of their class, and a fresh object is built from them on
+every hit, so that the callers may change it. The writes of this worker
+drop the entries of the written type and of its ``cache_dependents``, and
+the entries expire after ``[api] inventory_cache_ttl`` seconds for the
+writes of the other workers.
+"""
+
+from dci.common import cache
+from dci.conf import CONF
+from dci import objects
+from dci.objects import fields as object_fields
+
+
+_INVENTORY_CACHE = None
+_FIELD_NAMES = {}
+
+
+def get_inventory_cache():
+    """Return the per-process cache of the sites and WAN nodes."""
+    global _INVENTORY_CACHE
+    if _INVENTORY_CACHE is None:
+        _INVENTORY_CACHE = cache.ResourceCache(CONF.api.inventory_cache_size,
+                                               CONF.api.inventory_cache_ttl)
+    return _INVENTORY_CACHE
+
+
+def _field_names(cls):
+    names = _FIELD_NAMES.get(cls)
+    if names is None:
+        names = _FIELD_NAMES[cls] = tuple(sorted(cls.fields))
+    return names
+
+
+def _pack(obj):
+    values = []
+    for name in _field_names(obj.__class__):
+        value = obj[name]
+        field = obj.fields[name]
+        if isinstance(field, object_fields.ListOfObjectsField):
+            value = tuple(_pack(item) for item in value)
+        elif isinstance(value, list):
+            value = tuple(value)
+        values.append(value)
+    return tuple(values)
+
+
+def _unpack(cls, values):
+    # NOTE: The row has the shape of a DB model, so that the classes build
+    # their objects, nested ones included, with their _from_db_object.
+    row = {}
+    for name, value in zip(_field_names(cls), values):
+        field = cls.fields[name]
+        if isinstance(field, object_fields.ListOfObjectsField):
+            item_cls = getattr(objects, field.objname)
+            value = [_unpack(item_cls, item) for item in value]
+        elif isinstance(value, tuple):
+            value = list(value)
+        row[name] = value
+    return row
+
+
+def generation(cls):
+    """Return the generation to store the object of ``cls`` about to be read
+    from the database with, see :meth:`put`.
+    """
+    return get_inventory_cache().generation(cls.obj_name())
+
+
+def get(cls, context, uuid):
+    """Return a new object of ``cls`` built from the cached entry of
+    ``uuid``, None when there is none.
+    """
+    values = get_inventory_cache().get(cls.obj_name(), uuid)
+    if values is None:
+        return None
+    return cls._from_db_object(cls(context), _unpack(cls, values), context)
+
+
+def put(obj, generation):
+    """Cache an object read from the database.
+
+    :param generation: the generation of the class of ``obj`` taken before
+                       the read.
+    """
+    get_inventory_cache().set(obj.obj_name(), obj.uuid, _pack(obj),
+                              generation=generation)
+
+
+def invalidate(obj_name):
+    get_inventory_cache().invalidate(obj_name)
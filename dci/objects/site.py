@@ -19,6 +19,7 @@ from dci.common import constants
 from dci.db import api as dbapi
 from dci.objects import base
 from dci.objects import fields as object_fields
+from dci.objects import inventory
 from dci.objects.wan_node import WANNode
 
 
@@ -100,12 +101,27 @@ class Site(base.DCIObject, object_base.VersionedObjectDictCompat):
         values = self.obj_get_changes()
         db_site = self.dbapi.site_create(context, values)
         self._from_db_object(self, db_site, context)
+        self._invalidate_caches()
+
+    @classmethod
+    def bulk_create(cls, context, obj_sites):
+        """Create DCI site records in the DB in a single transaction."""
+        values_list = [obj_site.obj_get_changes() for obj_site in obj_sites]
+        db_sites = cls.dbapi.site_bulk_create(context, values_list)
+        for obj_site, db_site in zip(obj_sites, db_sites):
+            cls._from_db_object(obj_site, db_site, context)
+        cls._invalidate_caches()
+        return obj_sites
 
     @classmethod
     def get(cls, context, uuid):
         """Find a DCI site and return an Obj DCI site."""
-        db_site = cls.dbapi.site_get(context, uuid)
-        obj_site = cls._from_db_object(cls(context), db_site, context)
+        obj_site = inventory.get(cls, context, uuid)
+        if obj_site is None:
+            generation = inventory.generation(cls)
+            db_site = cls.dbapi.site_get(context, uuid)
+            obj_site = cls._from_db_object(cls(context), db_site, context)
+            inventory.put(obj_site, generation)
         return obj_site
 
     @classmethod
@@ -128,8 +144,20 @@ class Site(base.DCIObject, object_base.VersionedObjectDictCompat):
         updates = self.obj_get_changes()
         db_site = self.dbapi.site_update(context, self.uuid, updates)
         self._from_db_object(self, db_site, context)
+        self._invalidate_caches()
 
     def destroy(self, context):
         """Delete the DCI site from the DB."""
         self.dbapi.site_delete(context, self.uuid)
         self.obj_reset_changes()
+        self._invalidate_caches()
+
+    @classmethod
+    def bulk_destroy(cls, context, uuids):
+        """Delete DCI sites from the DB in a single transaction.
+
+        :returns: the UUIDs of the deleted sites.
+        """
+        deleted_uuids = cls.dbapi.site_bulk_delete(context, uuids)
+        cls._invalidate_caches()
+        return deleted_uuids
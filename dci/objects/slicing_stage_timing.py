@@ -0,0 +1,71 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from oslo_log import log as logging
+from oslo_versionedobjects import base as object_base
+
+from dci.db import api as dbapi
+from dci.objects import base
+from dci.objects import fields as object_fields
+
+
+LOG = logging.getLogger(__name__)
+
+
+@base.DCIObjectRegistry.register
+class SlicingStageTiming(base.DCIObject,
+                         object_base.VersionedObjectDictCompat):
+
+    # Version 1.0: Initial version
+    VERSION = '1.0'
+
+    dbapi = dbapi.get_instance()
+
+    fields = {
+        'id': object_fields.IntegerField(nullable=False),
+        'slicing_uuid': object_fields.UUIDField(nullable=False),
+        'stage': object_fields.StringField(nullable=False),
+        'state': object_fields.StringField(nullable=False),
+        'site_uuid': object_fields.UUIDField(nullable=True),
+        'wan_node_uuid': object_fields.UUIDField(nullable=True),
+        'started_at': object_fields.DateTimeField(nullable=False),
+        'ended_at': object_fields.DateTimeField(nullable=True),
+        'revert_started_at': object_fields.DateTimeField(nullable=True),
+        'revert_ended_at': object_fields.DateTimeField(nullable=True),
+        'retries': object_fields.IntegerField(nullable=False),
+        'reverts': object_fields.IntegerField(nullable=False),
+    }
+
+    @classmethod
+    def bulk_create(cls, context, slicing_uuid, stage_timings):
+        """Record the stage timings of a slicing flow run in the DB.
+
+        :param stage_timings: the records of a StageTimingRecorder.
+        """
+        obj_timings = [cls(context, slicing_uuid=slicing_uuid, **timing)
+                       for timing in stage_timings]
+        values_list = [obj_timing.obj_get_changes()
+                       for obj_timing in obj_timings]
+        db_timings = cls.dbapi.slicing_stage_timing_bulk_create(
+            context, values_list)
+        for obj_timing, db_timing in zip(obj_timings, db_timings):
+            cls._from_db_object(obj_timing, db_timing, context)
+        return obj_timings
+
+    @classmethod
+    def list(cls, context, slicing_uuid):
+        """Return the stage timings of a slicing, oldest first."""
+        db_timings = cls.dbapi.slicing_stage_timing_list(context,
+                                                         slicing_uuid)
+        return cls._from_db_object_list(db_timings, context)
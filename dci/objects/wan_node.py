@@ -19,6 +19,7 @@ from dci.common import constants
 from dci.db import api as dbapi
 from dci.objects import base
 from dci.objects import fields as object_fields
+from dci.objects import inventory
 
 
 LOG = logging.getLogger(__name__)
@@ -28,10 +29,14 @@ LOG = logging.getLogger(__name__)
 class WANNode(base.DCIObject, object_base.VersionedObjectDictCompat):
 
     # Version 1.0: Initial version
-    VERSION = '1.0'
+    # Version 1.1: Add netconf_transport_profile
+    VERSION = '1.1'
 
     dbapi = dbapi.get_instance()
 
+    # Sites embed their WAN nodes.
+    cache_dependents = ('Site',)
+
     fields = {
         'uuid': object_fields.UUIDField(nullable=False),
         'name': object_fields.StringField(nullable=True),
@@ -41,6 +46,7 @@ class WANNode(base.DCIObject, object_base.VersionedObjectDictCompat):
         'netconf_port': object_fields.IntegerField(nullable=False),
         'netconf_username': object_fields.StringField(nullable=False),
         'netconf_password': object_fields.StringField(nullable=False),
+        'netconf_transport_profile': object_fields.StringField(nullable=True),
         'as_number': object_fields.IntegerField(nullable=True),
         'roles': object_fields.ListOfStringsField(nullable=False),
         'site_uuid': object_fields.UUIDField(nullable=False),
@@ -67,12 +73,28 @@ class WANNode(base.DCIObject, object_base.VersionedObjectDictCompat):
         values = self.obj_get_changes()
         db_wan_node = self.dbapi.wan_node_create(context, values)
         self._from_db_object(self, db_wan_node)
+        self._invalidate_caches()
+
+    @classmethod
+    def bulk_create(cls, context, obj_wan_nodes):
+        """Create WAN node records in the DB in a single transaction."""
+        values_list = [obj_wan_node.obj_get_changes()
+                       for obj_wan_node in obj_wan_nodes]
+        db_wan_nodes = cls.dbapi.wan_node_bulk_create(context, values_list)
+        for obj_wan_node, db_wan_node in zip(obj_wan_nodes, db_wan_nodes):
+            cls._from_db_object(obj_wan_node, db_wan_node)
+        cls._invalidate_caches()
+        return obj_wan_nodes
 
     @classmethod
     def get(cls, context, uuid):
         """Find a WAN node and return an Obj WAN node."""
-        db_wan_node = cls.dbapi.wan_node_get(context, uuid)
-        obj_wan_node = cls._from_db_object(cls(context), db_wan_node)
+        obj_wan_node = inventory.get(cls, context, uuid)
+        if obj_wan_node is None:
+            generation = inventory.generation(cls)
+            db_wan_node = cls.dbapi.wan_node_get(context, uuid)
+            obj_wan_node = cls._from_db_object(cls(context), db_wan_node)
+            inventory.put(obj_wan_node, generation)
         return obj_wan_node
 
     @classmethod
@@ -95,8 +117,20 @@ class WANNode(base.DCIObject, object_base.VersionedObjectDictCompat):
         updates = self.obj_get_changes()
         db_wan_node = self.dbapi.wan_node_update(context, self.uuid, updates)
         self._from_db_object(self, db_wan_node)
+        self._invalidate_caches()
 
     def destroy(self, context):
         """Delete the WAN node from the DB."""
         self.dbapi.wan_node_delete(context, self.uuid)
         self.obj_reset_changes()
+        self._invalidate_caches()
+
+    @classmethod
+    def bulk_destroy(cls, context, uuids):
+        """Delete WAN nodes from the DB in a single transaction.
+
+        :returns: the UUIDs of the deleted WAN nodes.
+        """
+        deleted_uuids = cls.dbapi.wan_node_bulk_delete(context, uuids)
+        cls._invalidate_caches()
+        return deleted_uuids
@@ -0,0 +1,222 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Drift detection between the slicings of the database and the real state
+of Tungsten Fabric and the WAN nodes.
+
+The state is read in bulk, with one virtual network list per Tungsten
+Fabric project and one get-config per WAN node, whatever the number of
+slicings, then every slicing is checked against these indexes in memory.
+"""
+
+import time
+
+from oslo_log import log
+
+from dci.common import constants
+from dci.common.i18n import _LE
+from dci.common.i18n import _LI
+from dci.common import utils
+from dci.conf import CONF
+from dci.device_manager import api as device_api
+from dci import objects
+from dci.sdnc_manager import api as sdnc_api
+
+
+LOG = log.getLogger(__name__)
+
+MISSING = 'missing'
+MISMATCH = 'mismatch'
+UNREACHABLE = 'unreachable'
+
+SIDES = ('east', 'west')
+
+
+def _project_key(obj_site):
+    # NOTE: Sites sharing a Tungsten Fabric project list it once.
+    return (obj_site.tf_api_server_host, obj_site.tf_api_server_port,
+            obj_site.os_project_name)
+
+
+def _list_virtual_networks(obj_site):
+    sdnc_mgr = sdnc_api.SDNControllerManager(
+        sdnc_conn_ref=obj_site).driver_handle
+    return sdnc_mgr.list_virtual_networks()
+
+
+def _get_slicing_config(obj_wan_node):
+    dev_mgr = device_api.DeviceManager(
+        device_conn_ref=obj_wan_node).driver_handle
+    return dev_mgr.get_evpn_vpls_over_srv6_be_slicing_config()
+
+
+class SlicingReconciler(object):
+    """Report the drift of the EVPN VPLS over SRv6 BE network slicings."""
+
+    def __init__(self, context=None):
+        self.context = context
+
+    @staticmethod
+    def _drift(problem, resource, name, obj_slicing=None, side=None,
+               site_uuid=None, wan_node_uuid=None, expected=None,
+               actual=None):
+        return {
+            'problem': problem,
+            'resource': resource,
+            'name': name,
+            'slicing_uuid': obj_slicing.uuid if obj_slicing else None,
+            'side': side,
+            'site_uuid': site_uuid,
+            'wan_node_uuid': wan_node_uuid,
+            'expected': expected,
+            'actual': actual,
+        }
+
+    @staticmethod
+    def _read_all(func, targets):
+        """Call ``func`` on every target in parallel.
+
+        :returns: the results and the errors, keyed like ``targets``.
+        """
+        keys = list(targets)
+        results, errors = {}, {}
+        for key, (result, err) in zip(keys, utils.concurrent_map(
+                func, [targets[key] for key in keys],
+                CONF.api.bulk_max_workers)):
+            if err is None:
+                results[key] = result
+            else:
+                errors[key] = err
+        return results, errors
+
+    def _check_virtual_network(self, obj_slicing, side, obj_site,
+                               virtual_networks):
+        vn_name = constants.VN_NAME_PREFIX + obj_slicing.name
+        drift = dict(obj_slicing=obj_slicing, side=side,
+                     site_uuid=obj_site.uuid)
+        vn = virtual_networks.get(vn_name)
+        if vn is None:
+            return [self._drift(MISSING, 'virtual_network', vn_name,
+                                **drift)]
+
+        drifts = []
+        expected_uuid = obj_slicing[side + '_dcn_vn_uuid']
+        if vn['uuid'] != expected_uuid:
+            drifts.append(self._drift(
+                MISMATCH, 'virtual_network.uuid', vn_name,
+                expected=expected_uuid, actual=vn['uuid'], **drift))
+        expected_vni = obj_slicing[side + '_dcn_vn_vni']
+        if str(vn['vni']) != str(expected_vni):
+            drifts.append(self._drift(
+                MISMATCH, 'virtual_network.vni', vn_name,
+                expected=expected_vni, actual=vn['vni'], **drift))
+        expected_rt = 'target:%s' % obj_slicing[side + '_dcn_vn_route_target']
+        if expected_rt not in vn['route_targets']:
+            drifts.append(self._drift(
+                MISMATCH, 'virtual_network.route_target', vn_name,
+                expected=expected_rt, actual=sorted(vn['route_targets']),
+                **drift))
+        return drifts
+
+    def _check_wan_node(self, obj_slicing, side, obj_wan_node, config):
+        drift = dict(obj_slicing=obj_slicing, side=side,
+                     site_uuid=obj_wan_node.site_uuid,
+                     wan_node_uuid=obj_wan_node.uuid)
+        expected = [
+            ('bridge_domains', 'bridge_domain',
+             obj_slicing[side + '_wan_vpn_bridge_domain']),
+            ('bridge_domains', 'bridge_domain',
+             obj_slicing[side + '_access_vpn_bridge_domain']),
+            ('evpn_instances', 'evpn_instance',
+             constants.WAN_VPN_NAME_PREFIX + obj_slicing.name),
+            ('evpn_instances', 'evpn_instance',
+             constants.ACCESS_VPN_NAME_PREFIX + obj_slicing.name),
+            ('vnis', 'vni', obj_slicing[side + '_access_vpn_vni']),
+        ]
+        return [self._drift(MISSING, resource, str(name), **drift)
+                for index, resource, name in expected
+                if str(name) not in config[index]]
+
+    def run(self):
+        """Compare every slicing with Tungsten Fabric and its WAN nodes.
+
+        :returns: a list of dicts describing the drifts found, empty when
+                  the real state matches the database.
+        """
+        started_at = time.monotonic()
+        obj_slicings = objects.EVPNVPLSoSRv6BESlicing.list(self.context)
+        obj_sites = {obj_site.uuid: obj_site
+                     for obj_site in objects.Site.list(self.context)}
+
+        # NOTE: Only read the projects and WAN nodes carrying slicings.
+        projects, wan_nodes = {}, {}
+        for obj_slicing in obj_slicings:
+            for side in SIDES:
+                obj_site = obj_sites.get(obj_slicing[side + '_site_uuid'])
+                if obj_site is None or not obj_site.wan_nodes:
+                    continue
+                projects.setdefault(_project_key(obj_site), obj_site)
+                wan_nodes.setdefault(obj_site.wan_nodes[0].uuid,
+                                     obj_site.wan_nodes[0])
+
+        virtual_networks, project_errors = self._read_all(
+            _list_virtual_networks, projects)
+        configs, wan_node_errors = self._read_all(
+            _get_slicing_config, wan_nodes)
+
+        drifts = []
+        for key, err in project_errors.items():
+            LOG.error(_LE("Failed to list the virtual networks of "
+                          "Tungsten Fabric project %(project)s, details "
+                          "%(err)s"), {'project': key, 'err': err})
+            drifts.append(self._drift(
+                UNREACHABLE, 'tungsten_fabric', '%s:%s/%s' % key,
+                site_uuid=projects[key].uuid, actual=str(err)))
+        for wan_node_uuid, err in wan_node_errors.items():
+            LOG.error(_LE("Failed to get the configuration of WAN node "
+                          "%(wan_node)s, details %(err)s"),
+                      {'wan_node': wan_node_uuid, 'err': err})
+            drifts.append(self._drift(
+                UNREACHABLE, 'wan_node', wan_nodes[wan_node_uuid].name,
+                site_uuid=wan_nodes[wan_node_uuid].site_uuid,
+                wan_node_uuid=wan_node_uuid, actual=str(err)))
+
+        for obj_slicing in obj_slicings:
+            for side in SIDES:
+                site_uuid = obj_slicing[side + '_site_uuid']
+                obj_site = obj_sites.get(site_uuid)
+                if obj_site is None or not obj_site.wan_nodes:
+                    drifts.append(self._drift(
+                        MISSING, 'site', site_uuid, obj_slicing=obj_slicing,
+                        side=side, site_uuid=site_uuid))
+                    continue
+
+                project_vns = virtual_networks.get(_project_key(obj_site))
+                if project_vns is not None:
+                    drifts.extend(self._check_virtual_network(
+                        obj_slicing, side, obj_site, project_vns))
+
+                obj_wan_node = obj_site.wan_nodes[0]
+                config = configs.get(obj_wan_node.uuid)
+                if config is not None:
+                    drifts.extend(self._check_wan_node(
+                        obj_slicing, side, obj_wan_node, config))
+
+        LOG.info(_LI("Checked %(slicings)d slicings against %(projects)d "
+                     "Tungsten Fabric projects and %(wan_nodes)d WAN nodes "
+                     "in %(elapsed).1fs, %(drifts)d drifts found."),
+                 {'slicings': len(obj_slicings), 'projects': len(projects),
+                  'wan_nodes': len(wan_nodes), 'drifts': len(drifts),
+                  'elapsed': time.monotonic() - started_at})
+        return drifts
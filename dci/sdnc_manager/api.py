@@ -0,0 +1,124 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import functools
+
+from oslo_log import log
+from oslo_utils import importutils
+
+from dci.common import connection_pool
+from dci.common.i18n import _LE
+from dci.conf import CONF
+
+
+LOG = log.getLogger(__name__)
+
+
+SDNC_DRIVER_MAPPING = {
+    'tungsten_fabric':
+        'dci.sdnc_manager.tungsten_fabric.vnc_api_client.Client',
+}
+
+
+def _get_client_pool():
+    # NOTE: The clients hold no resource to release but their HTTP session.
+    return connection_pool.get_pool(connection_pool.TF, lambda client: None)
+
+
+class PooledClient(object):
+    """Run every call of an SDN controller client on an idle client of the
+    pool of the process, see `dci.common.connection_pool`.
+
+    A client is taken, or created, when the proxy is built, so that an
+    unreachable SDN controller fails at once, then put back.
+
+    :param key: the endpoint and project of the clients.
+    :param factory: callable creating a client.
+    """
+
+    def __init__(self, key, factory):
+        self._key = key
+        self._factory = factory
+        self._release(self._acquire())
+
+    def _acquire(self):
+        client = _get_client_pool().get(self._key)
+        return client if client is not None else self._factory()
+
+    def _release(self, client):
+        _get_client_pool().put(self._key, client)
+
+    def __getattr__(self, name):
+        client = self._acquire()
+        try:
+            attr = getattr(client, name)
+        except Exception:
+            self._release(client)
+            raise
+        if not callable(attr) or name.startswith('_'):
+            self._release(client)
+            return attr
+
+        @functools.wraps(attr)
+        def wrapper(*args, **kwargs):
+            try:
+                return attr(*args, **kwargs)
+            finally:
+                self._release(client)
+        return wrapper
+
+
+class SDNControllerManager(object):
+
+    def __init__(self, sdnc_conn_ref, sdnc_type='tungsten_fabric',
+                 *args, **kwargs):
+        """Constructor of SDN Controller Manager.
+
+        The driver module, and so the SDN controller client library, is
+        only imported when the first manager is instantiated.
+
+        :param sdnc_conn_ref:
+            e.g.
+            {
+              "tf_api_server_host": "192.168.10.2",
+              "tf_api_server_port": 8082,
+              "tf_username": "admin",
+              "tf_password": "password",
+              "os_project_name": "admin",
+            }
+        """
+
+        try:
+            sdnc_driver = SDNC_DRIVER_MAPPING[sdnc_type]
+            factory = functools.partial(
+                importutils.import_object,
+                sdnc_driver,
+                host=sdnc_conn_ref['tf_api_server_host'],
+                port=sdnc_conn_ref['tf_api_server_port'],
+                username=sdnc_conn_ref['tf_username'],
+                password=sdnc_conn_ref['tf_password'],
+                project=sdnc_conn_ref['os_project_name'])
+            if CONF.connection_pool.tf_max_idle:
+                self.driver_handle = PooledClient(
+                    '%s:%s:%s:%s' % (sdnc_conn_ref['tf_api_server_host'],
+                                     sdnc_conn_ref['tf_api_server_port'],
+                                     sdnc_conn_ref['tf_username'],
+                                     sdnc_conn_ref['os_project_name']),
+                    factory)
+            else:
+                self.driver_handle = factory()
+        except Exception as err:
+            LOG.error(_LE("SDN controller driver instantiation failed, "
+                          "details %s"), err)
+            raise err
@@ -12,14 +12,20 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import functools
+
 from vnc_api import exceptions as vnc_api_exceptions
 from vnc_api import vnc_api
 
 from oslo_log import log
 
+from dci.common import circuit_breaker
+from dci.common import deadline
 from dci.common.i18n import _LE
 from dci.common.i18n import _LI
 from dci.common.i18n import _LW
+from dci.common import metrics
+from dci.common import tracing
 
 
 LOG = log.getLogger(__name__)
@@ -30,6 +36,38 @@ TF_DEFAULT_IPAM = 'dci-controller-default-ipam'
 TF_DEFAULT_ROUTR_TARGET = 'target:100:100'
 
 
+class DeadlineBoundVncApi(object):
+    """Bound the HTTP requests of the VNC API calls by the request deadline.
+
+    VncApi has no per call timeout, the timeout of the HTTP session it
+    shares between the calls is set to the budget left instead.
+    """
+
+    def __init__(self, client):
+        self._client = client
+        session = getattr(client, '_api_server_session', None)
+        self._session = session if hasattr(session, 'timeout') else None
+        self._default_timeout = getattr(self._session, 'timeout', None)
+
+    def _bound_timeout(self, operation):
+        timeout = deadline.timeout(None, operation)
+        if self._session is not None:
+            self._session.timeout = (self._default_timeout if timeout is None
+                                     else timeout)
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not callable(attr) or name.startswith('_'):
+            return attr
+
+        @functools.wraps(attr)
+        def wrapper(*args, **kwargs):
+            self._bound_timeout('vnc_api.%s' % name)
+            return attr(*args, **kwargs)
+        return wrapper
+
+
+@metrics.instrument(metrics.TF_CALL, 'call')
 class Client(object):
     """Tungsten Fabric client by VNC API Client.
     """
@@ -55,12 +93,23 @@ class Client(object):
             self._create_default_ipam_with_user_defined_subnet()
 
     def _connect(self, host, port, username, password, project):
+        breaker = circuit_breaker.get_breaker(
+            'tf:%s:%s' % (host, port),
+            ignored_exceptions=(vnc_api_exceptions.AuthFailed,))
         try:
-            self.client = vnc_api.VncApi(api_server_host=host,
-                                         api_server_port=port,
-                                         username=username,
-                                         password=password,
-                                         tenant_name=project)
+            deadline.check('vnc_api.connect')
+            with metrics.timed(metrics.TF_CALL, call='connect'), \
+                    tracing.span('vnc_api.connect', tracing.CLIENT,
+                                 **{'net.peer.name': host}):
+                self.client = tracing.traced_client(
+                    DeadlineBoundVncApi(breaker.call(
+                        vnc_api.VncApi,
+                        api_server_host=host,
+                        api_server_port=port,
+                        username=username,
+                        password=password,
+                        tenant_name=project)),
+                    'vnc_api', **{'net.peer.name': host})
         except Exception as err:
             LOG.error(_LE("Failed to connect Tungsten Fabric VNC API "
                           "Server [%(host)s], details %(err)s"),
@@ -179,6 +228,29 @@ class Client(object):
             raise err
         return vn_o
 
+    def list_virtual_networks(self):
+        """List the virtual networks of the project with a single request.
+
+        :return: a dict mapping the name of every virtual network to its
+            uuid, VNI and set of route targets.
+        """
+        vn_objs = self.client.virtual_networks_list(
+            parent_fq_name=[TF_DEFAULT_DOMAIN, self.project_name],
+            detail=True,
+            fields=['route_target_list', 'virtual_network_network_id'])
+        virtual_networks = {}
+        for vn_o in vn_objs:
+            route_targets = set()
+            if vn_o.get_route_target_list():
+                route_targets.update(
+                    vn_o.get_route_target_list().get_route_target() or [])
+            virtual_networks[vn_o.name] = {
+                'uuid': vn_o.uuid,
+                'vni': vn_o.virtual_network_network_id,
+                'route_targets': route_targets,
+            }
+        return virtual_networks
+
     def delete_virtual_network(self, vn_name):
         LOG.info(_LI("delete virtual network [%s]"), vn_name)
         try:
@@ -12,14 +12,176 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
 
+from oslo_utils import timeutils
 import taskflow.engines
 from taskflow.patterns import linear_flow as lt
+from taskflow import states
+
+from dci.common import tracing
+from dci.conf import CONF
+from dci.task_flows import persistence
+from dci.task_flows import tasks
+
+
+CREATE_L2VPN_SLICING_FACTORY = (
+    'dci.task_flows.flows.create_l2vpn_slicing_flow')
+
+
+class StageTimingRecorder(object):
+    """Record the start and end time, retries and reverts of every task.
+
+    :param locations: optional dict mapping a task name to the
+                      ``site_uuid`` and ``wan_node_uuid`` it works on.
+    """
+
+    def __init__(self, locations=None):
+        self.locations = locations or {}
+        self._records = collections.OrderedDict()
+
+    def _record(self, task_name):
+        record = self._records.get(task_name)
+        if record is None:
+            record = self._records[task_name] = dict(
+                stage=task_name.rsplit('.', 1)[-1],
+                state=states.PENDING,
+                started_at=None,
+                ended_at=None,
+                revert_started_at=None,
+                revert_ended_at=None,
+                retries=0,
+                reverts=0,
+                **self.locations.get(task_name, {}))
+        return record
+
+    def on_task_state(self, state, details):
+        record = self._record(details['task_name'])
+        now = timeutils.utcnow()
+        if state == states.RUNNING:
+            if record['started_at'] is not None:
+                record['retries'] += 1
+            record['started_at'] = now
+            record['ended_at'] = None
+        elif state in (states.SUCCESS, states.FAILURE):
+            record['ended_at'] = now
+        elif state == states.REVERTING:
+            record['reverts'] += 1
+            record['revert_started_at'] = now
+        elif state in (states.REVERTED, states.REVERT_FAILURE):
+            record['revert_ended_at'] = now
+        if state != states.PENDING:
+            record['state'] = state
+
+    @property
+    def records(self):
+        """The timing records of the tasks which ran, in start order."""
+        return [dict(record) for record in self._records.values()
+                if record['started_at'] is not None]
+
+
+class TaskTracer(object):
+    """Run the execution and the revert of every task in a trace span."""
+
+    def __init__(self, flow_name):
+        self.flow_name = flow_name
+        self._spans = {}
+
+    def on_task_state(self, state, details):
+        task_name = details['task_name']
+        stage = task_name.rsplit('.', 1)[-1]
+        if state in (states.RUNNING, states.REVERTING):
+            suffix = '.revert' if state == states.REVERTING else ''
+            self._spans[task_name] = tracing.start_span(
+                'task.%s%s' % (stage, suffix), tracing.INTERNAL,
+                {'flow.name': self.flow_name, 'task.name': stage})
+        elif state in (states.SUCCESS, states.FAILURE, states.REVERTED,
+                       states.REVERT_FAILURE):
+            task_span = self._spans.pop(task_name, None)
+            if task_span is not None and state in (states.FAILURE,
+                                                   states.REVERT_FAILURE):
+                task_span.record_exception(details.get('result'))
+            tracing.end_span(task_span)
+
+
+def create_l2vpn_slicing_flow(flow_name, coordinated=False):
+    """Build the flow creating an EVPN VPLS over SRv6 BE slicing.
+
+    It is the factory of the persisted flows, called again to rebuild them
+    when they are resumed.
+
+    :param coordinated: whether the VPNs of both WAN nodes are created with
+                        a coordinated commit, see
+                        ``[device] coordinated_commit``.
+    """
+    flow_api = lt.Flow(flow_name)
+    flow_api.add(tasks.EastDCN_EVPNVxLAN(),
+                 tasks.WestDCN_EVPNVxLAN())
+    if coordinated:
+        flow_api.add(tasks.VPNs_EVPNVPLSoSRv6BE())
+    else:
+        flow_api.add(tasks.EastVPN_EVPNVPLSoSRv6BE(),
+                     tasks.WestVPN_EVPNVPLSoSRv6BE())
+    return flow_api
+
+
+def flow_from_detail(flow_detail):
+    """Rebuild a persisted flow with its factory."""
+    return taskflow.engines.flow_from_detail(flow_detail)
+
+
+def fetch_results(flow_detail):
+    """Return the values stored and provided by a persisted flow, without
+    loading it in an engine.
+    """
+    results = {}
+    for atom_detail in flow_detail:
+        if isinstance(atom_detail.results, dict):
+            results.update(atom_detail.results)
+    return results
 
 
 def get_flow(flow_name, flow_list, flow_store, *args, **kwargs):
+    """Load a linear flow of the tasks in a serial engine.
+
+    :param timing_recorder: optional StageTimingRecorder notified of the
+                            state changes of the tasks.
+    """
     flow_api = lt.Flow(flow_name)
     flow_api.add(*flow_list)
-    return taskflow.engines.load(flow_api,
-                                 engine_conf={'engine': 'serial'},
-                                 store=flow_store)
+    return load_flow(flow_api, flow_store, **kwargs)
+
+
+def load_flow(flow_api, flow_store, flow_detail=None, transient_store=None,
+              timing_recorder=None):
+    """Load a flow in a serial engine.
+
+    :param flow_store: the values required by the tasks, None when the
+                       flow is resumed from its flow detail.
+    :param flow_detail: optional flow detail, see
+                        persistence.create_flow_detail, the progress of the
+                        flow is then recorded in the logbook.
+    :param transient_store: optional values required by the tasks which
+                            are not persisted, e.g. the managers holding
+                            the connections.
+    :param timing_recorder: optional StageTimingRecorder notified of the
+                            state changes of the tasks.
+    """
+    backend = persistence.get_backend() if flow_detail is not None else None
+    flow_engine = taskflow.engines.load(flow_api,
+                                        engine_conf={'engine': 'serial'},
+                                        store=flow_store,
+                                        flow_detail=flow_detail,
+                                        backend=backend)
+    if transient_store:
+        flow_engine.storage.inject(transient_store, transient=True)
+
+    if CONF.tracing.enabled:
+        flow_engine.atom_notifier.register(
+            flow_engine.atom_notifier.ANY,
+            TaskTracer(flow_api.name).on_task_state)
+
+    if timing_recorder is not None:
+        flow_engine.atom_notifier.register(
+            flow_engine.atom_notifier.ANY, timing_recorder.on_task_state)
+    return flow_engine
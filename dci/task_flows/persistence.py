@@ -0,0 +1,211 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Logbook of the slicing flows, stored in the controller database.
+
+Every persisted flow gets a logbook of its own, holding its flow detail,
+and a lease in the ``flow_leases`` table. The process running the flow
+renews the lease from a heartbeat thread, and any process of any host may
+take over the flow once its lease expired, e.g. because the worker running
+it died, and resume it.
+"""
+
+import contextlib
+import datetime
+import os
+import socket
+import threading
+
+from oslo_log import log
+from oslo_utils import timeutils
+from oslo_utils import uuidutils
+from taskflow.persistence import backends
+from taskflow.persistence import models
+
+from dci.common import heartbeat
+from dci.common.i18n import _LE
+from dci.conf import CONF
+from dci.db import api as dbapi
+
+
+LOG = log.getLogger(__name__)
+
+_BACKEND = None
+_BACKEND_LOCK = threading.Lock()
+
+# The holder name and the heartbeat of this process, with its PID, so that
+# the forked API workers get their own.
+_HOLDER = (None, None)
+_HEARTBEAT = (None, None)
+_OWNED = set()
+_OWNED_LOCK = threading.Lock()
+
+
+def get_backend():
+    """Return the taskflow persistence backend, None when disabled."""
+    global _BACKEND
+    if not CONF.taskflow.persistence:
+        return None
+    if _BACKEND is None:
+        with _BACKEND_LOCK:
+            if _BACKEND is None:
+                _BACKEND = backends.fetch(
+                    {'connection': CONF.database.connection})
+    return _BACKEND
+
+
+def _holder():
+    global _HOLDER
+    pid = os.getpid()
+    if _HOLDER[0] != pid:
+        # NOTE: Unique per process, even when a PID or a hostname is
+        # reused by a new one.
+        _HOLDER = (pid, '%s:%d:%s' % (socket.gethostname(), pid,
+                                      uuidutils.generate_uuid()))
+    return _HOLDER[1]
+
+
+def _lease_expiry():
+    return timeutils.utcnow() + datetime.timedelta(
+        seconds=CONF.taskflow.lease_timeout)
+
+
+def _renew_leases():
+    with _OWNED_LOCK:
+        flow_uuids = list(_OWNED)
+    dbapi.get_instance().flow_lease_renew(None, _holder(), flow_uuids,
+                                          _lease_expiry())
+
+
+def _own(flow_uuid):
+    global _HEARTBEAT
+    with _OWNED_LOCK:
+        pid = os.getpid()
+        if _HEARTBEAT[0] != pid:
+            _OWNED.clear()
+            _HEARTBEAT = (pid, heartbeat.Heartbeat(
+                CONF.taskflow.lease_timeout / 3.0, _renew_leases,
+                name='flow-leases').start())
+        _OWNED.add(flow_uuid)
+
+
+def _disown(flow_uuids):
+    with _OWNED_LOCK:
+        _OWNED.difference_update(flow_uuids)
+
+
+def _is_owned(flow_uuid):
+    with _OWNED_LOCK:
+        return flow_uuid in _OWNED
+
+
+def create_flow_detail(flow_name, flow_uuid, factory, factory_args, meta):
+    """Record a new flow in a logbook of its own.
+
+    :param factory: the import path of the function building the flow,
+                    called with ``factory_args`` to rebuild it on resume.
+    :param meta: JSON serialisable details needed to resume the flow.
+    :returns: the logbook and the flow detail.
+    """
+    book = models.LogBook('%s:%s' % (flow_name, flow_uuid))
+    flow_detail = models.FlowDetail(flow_name, uuid=flow_uuid)
+    flow_detail.meta.update(meta)
+    # NOTE: The layout taskflow.engines.flow_from_detail expects.
+    flow_detail.meta['factory'] = {'name': factory,
+                                   'args': list(factory_args),
+                                   'kwargs': {}}
+    book.add(flow_detail)
+
+    # NOTE: The lease is recorded before the logbook, a logbook without a
+    # lease is one of a flow recorded before the leases existed.
+    dbapi.get_instance().flow_lease_create(None, {
+        'flow_uuid': flow_uuid,
+        'holder': _holder(),
+        'expires_at': _lease_expiry(),
+    })
+    _own(flow_uuid)
+    try:
+        with contextlib.closing(get_backend().get_connection()) as conn:
+            conn.save_logbook(book)
+    except Exception:
+        _disown([flow_uuid])
+        dbapi.get_instance().flow_lease_delete(None, [flow_uuid])
+        raise
+    return book, flow_detail
+
+
+def claim(flow_detail):
+    """Record the current process as the one running the flow, once it
+    took its lease over, see :func:`take_over_orphaned`.
+    """
+    _own(flow_detail.uuid)
+
+
+def abandon(flow_detail):
+    """Stop renewing the lease of a flow this process failed to resume, so
+    that a later scan, of any process, retries it once the lease expired.
+    """
+    _disown([flow_detail.uuid])
+
+
+def destroy(book):
+    """Forget a flow, once its outcome is recorded elsewhere."""
+    flow_uuids = [flow_detail.uuid for flow_detail in book]
+    try:
+        with contextlib.closing(get_backend().get_connection()) as conn:
+            conn.destroy_logbook(book.uuid)
+        dbapi.get_instance().flow_lease_delete(None, flow_uuids)
+    except Exception as err:
+        LOG.error(_LE("Failed to destroy the logbook %(book)s, details "
+                      "%(err)s"), {'book': book.name, 'err': err})
+    finally:
+        _disown(flow_uuids)
+
+
+def _take_over(flow_detail, lease, now):
+    holder = _holder()
+    if lease is None:
+        taken = dbapi.get_instance().flow_lease_create(None, {
+            'flow_uuid': flow_detail.uuid,
+            'holder': holder,
+            'expires_at': _lease_expiry(),
+        })
+    elif lease.expires_at > now or _is_owned(flow_detail.uuid):
+        return False
+    else:
+        # NOTE: Only one of the processes scanning at once wins the lease.
+        taken = dbapi.get_instance().flow_lease_take_over(
+            None, flow_detail.uuid, holder, now, _lease_expiry())
+    if taken:
+        _own(flow_detail.uuid)
+    return taken
+
+
+def take_over_orphaned():
+    """Take over the flows whose lease expired, on any host.
+
+    :returns: the logbooks and flow details of the flows taken over, whose
+              leases are renewed by this process until they are destroyed.
+    """
+    now = timeutils.utcnow()
+    # NOTE: The leases are listed before the logbooks, the logbook of a
+    # flow created in between is found with its lease.
+    leases = {lease.flow_uuid: lease
+              for lease in dbapi.get_instance().flow_lease_list(None)}
+    with contextlib.closing(get_backend().get_connection()) as conn:
+        books = list(conn.get_logbooks())
+    return [(book, flow_detail)
+            for book in books
+            for flow_detail in book
+            if _take_over(flow_detail, leases.get(flow_detail.uuid), now)]
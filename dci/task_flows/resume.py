@@ -0,0 +1,138 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Resume the slicing creation flows of the API workers which died.
+
+A worker dying between the Tungsten Fabric and the NETCONF tasks of a
+creation leaves virtual networks without the VPNs of the WAN nodes. The
+flow is resumed from its last completed task, then the slicing is recorded
+as the API request would have done, along with the completion of its
+Idempotency-Key. A flow which was reverted, and its logbook destroyed,
+releases the key, so that the retry of the client creates the slicing. A
+flow which failed to resume before it ran, e.g. because a site or a device
+could not be reached, keeps its logbook and its key, and its lease is no
+longer renewed, so that a later scan retries it once the lease expired.
+"""
+
+from oslo_log import log
+from taskflow import states
+
+from dci.api.controllers import idempotency
+from dci.common import constants
+from dci.common import exception
+from dci.common.i18n import _LE
+from dci.common.i18n import _LI
+from dci.common.i18n import _LW
+from dci.db import api as dbapi
+from dci import manager
+from dci import objects
+from dci.task_flows import flows
+from dci.task_flows import persistence
+
+
+LOG = log.getLogger(__name__)
+
+
+def _fail_idempotency_key(context, flow_detail, err):
+    route = flow_detail.meta.get('idempotency_route')
+    if route:
+        idempotency.fail_resource(context, route, flow_detail.uuid, err)
+
+
+def _resume_create_slicing_flow(context, book, flow_detail):
+    slicing = flow_detail.meta.get('slicing')
+    route = flow_detail.meta.get('idempotency_route')
+    LOG.info(_LI("Resuming the flow %(flow)s of slicing %(uuid)s in state "
+                 "%(state)s"),
+             {'flow': flow_detail.name, 'uuid': flow_detail.uuid,
+              'state': flow_detail.state})
+
+    if slicing is None or flow_detail.state in (states.REVERTED,
+                                                states.FAILURE):
+        persistence.destroy(book)
+        _fail_idempotency_key(context, flow_detail,
+                              'The slicing creation flow was reverted.')
+        return
+
+    try:
+        objects.EVPNVPLSoSRv6BESlicing.get(context, slicing['uuid'])
+    except exception.ResourceNotFound:
+        pass
+    else:
+        # NOTE: The worker died after recording the slicing.
+        persistence.destroy(book)
+        return
+
+    if route and not idempotency.renew_lease(context, route,
+                                             flow_detail.uuid):
+        # NOTE: The retries of the client took the key over, the created
+        # slicing is still recorded so that it can be seen and deleted.
+        LOG.warning(_LW("The Idempotency-Key of slicing %s was taken over "
+                        "by a retry"), flow_detail.uuid)
+        route = None
+
+    if flow_detail.state == states.SUCCESS:
+        flow_store = flows.fetch_results(flow_detail)
+    else:
+        obj_east_site = objects.Site.get(
+            context, uuid=slicing['east_site_uuid'])
+        obj_west_site = objects.Site.get(
+            context, uuid=slicing['west_site_uuid'])
+        ns_mgr = manager.NetworkSlicingManager(
+            obj_east_site, obj_west_site,
+            slicing_name=slicing['name'],
+            slicing_type=flow_detail.meta.get('slicing_type',
+                                              constants.L2VPN_SLICING))
+        try:
+            flow_store = \
+                ns_mgr.resume_create_evpn_vpls_over_srv6_be_slicing_flow(
+                    book, flow_detail)
+        except Exception as err:
+            if ns_mgr.flow_book is None:
+                # NOTE: The flow was reverted and its logbook destroyed,
+                # the creation is given up.
+                _fail_idempotency_key(context, flow_detail, err)
+            raise
+
+    values = dict(slicing, **manager.get_slicing_values(flow_store))
+    values['state'] = constants.ACTIVE
+    obj_slicing = objects.EVPNVPLSoSRv6BESlicing(context, **values)
+    obj_slicing.create(context, idempotency=route and
+                       idempotency.completion(route))
+    persistence.destroy(book)
+    LOG.info(_LI("Slicing %s created by a resumed flow"), slicing['uuid'])
+
+
+def resume_slicing_flows(context=None):
+    """Resume the slicing creation flows whose lease expired, left by the
+    dead processes of any host.
+    """
+    if persistence.get_backend() is None:
+        return
+
+    # NOTE: A slicing recorded by a worker just before it died may not have
+    # reached the slave database yet.
+    token = dbapi.set_read_from_primary(True)
+    try:
+        for book, flow_detail in persistence.take_over_orphaned():
+            try:
+                _resume_create_slicing_flow(context, book, flow_detail)
+            except Exception as err:
+                LOG.error(_LE("Failed to resume the flow %(flow)s of "
+                              "slicing %(uuid)s, details %(err)s"),
+                          {'flow': flow_detail.name,
+                           'uuid': flow_detail.uuid, 'err': err})
+                persistence.abandon(flow_detail)
+    finally:
+        dbapi.reset_read_from_primary(token)
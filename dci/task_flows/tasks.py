@@ -13,9 +13,31 @@
 #    under the License.
 
 from taskflow import task
+from taskflow.types import failure
 
+from dci.common import deadline
+from dci.common import exception
 
-class EastDCN_EVPNVxLAN(task.Task):
+
+class SlicingTask(task.Task):
+    """A task of a slicing flow, bounded by the deadline of the request."""
+
+    # The site, east or west, the task works on.
+    side = None
+
+    def pre_execute(self):
+        # NOTE: Fail at once once the budget is spent, so that the flow
+        # reverts instead of piling up calls that would time out anyway.
+        deadline.check(self.name)
+
+    def pre_revert(self):
+        # NOTE: The reverts run to completion whatever the budget left.
+        deadline.lift()
+
+
+class EastDCN_EVPNVxLAN(SlicingTask):
+
+    side = 'east'
 
     default_provides = set(['east_vn_uuid', 'east_vn_vni'])
 
@@ -36,7 +58,9 @@ class EastDCN_EVPNVxLAN(task.Task):
         ns_mgr.delete_evpn_vxlan_dcn(ns_mgr.east_sdnc_mgr)
 
 
-class WestDCN_EVPNVxLAN(task.Task):
+class WestDCN_EVPNVxLAN(SlicingTask):
+
+    side = 'west'
 
     default_provides = set(['west_vn_uuid', 'west_vn_vni'])
 
@@ -58,7 +82,9 @@ class WestDCN_EVPNVxLAN(task.Task):
         ns_mgr.delete_evpn_vxlan_dcn(ns_mgr.west_sdnc_mgr)
 
 
-class EastVPN_EVPNVPLSoSRv6BE(task.Task):
+class EastVPN_EVPNVPLSoSRv6BE(SlicingTask):
+
+    side = 'east'
 
     default_provides = set([])
 
@@ -90,7 +116,9 @@ class EastVPN_EVPNVPLSoSRv6BE(task.Task):
         )
 
 
-class WestVPN_EVPNVPLSoSRv6BE(task.Task):
+class WestVPN_EVPNVPLSoSRv6BE(SlicingTask):
+
+    side = 'west'
 
     default_provides = set([])
 
@@ -120,3 +148,68 @@ class WestVPN_EVPNVPLSoSRv6BE(task.Task):
             wan_vpn_bd=west_wan_vpn_bd,
             access_vpn_bd=west_access_vpn_bd
         )
+
+
+class VPNs_EVPNVPLSoSRv6BE(SlicingTask):
+    """Create the VPNs of both WAN nodes with a coordinated commit, instead
+    of EastVPN_EVPNVPLSoSRv6BE then WestVPN_EVPNVPLSoSRv6BE.
+    """
+
+    default_provides = set([])
+
+    def execute(self, ns_mgr, east_wan_vpn_rd, east_wan_vpn_rt,
+                east_wan_vpn_bd, east_access_vpn_rd, east_access_vpn_rt,
+                east_access_vpn_bd, east_vn_vni, west_wan_vpn_rd,
+                west_wan_vpn_rt, west_wan_vpn_bd, west_access_vpn_rd,
+                west_access_vpn_rt, west_access_vpn_bd, west_vn_vni,
+                splicing_vlan_id, *args, **kwargs):
+        ns_mgr.create_evpn_vpls_over_srv6_be_wan_and_evpn_vxlan_access_vpns([
+            dict(dev_mgr=ns_mgr.east_dev_mgr,
+                 wan_node=ns_mgr.obj_east_wan_node,
+                 wan_vpn_rd=east_wan_vpn_rd,
+                 wan_vpn_rt=east_wan_vpn_rt,
+                 wan_vpn_bd=east_wan_vpn_bd,
+                 access_vpn_rd=east_access_vpn_rd,
+                 access_vpn_rt=east_access_vpn_rt,
+                 access_vpn_bd=east_access_vpn_bd,
+                 access_vpn_vxlan_vni=east_vn_vni,
+                 splicing_vlan_id=splicing_vlan_id),
+            dict(dev_mgr=ns_mgr.west_dev_mgr,
+                 wan_node=ns_mgr.obj_west_wan_node,
+                 wan_vpn_rd=west_wan_vpn_rd,
+                 wan_vpn_rt=west_wan_vpn_rt,
+                 wan_vpn_bd=west_wan_vpn_bd,
+                 access_vpn_rd=west_access_vpn_rd,
+                 access_vpn_rt=west_access_vpn_rt,
+                 access_vpn_bd=west_access_vpn_bd,
+                 access_vpn_vxlan_vni=west_vn_vni,
+                 splicing_vlan_id=splicing_vlan_id),
+        ])
+
+    def revert(self, ns_mgr, east_vn_vni, east_wan_vpn_bd, east_access_vpn_bd,
+               west_vn_vni, west_wan_vpn_bd, west_access_vpn_bd, result,
+               *args, **kwargs):
+        # NOTE: The WAN nodes rolled back by the coordinated commit itself
+        # are skipped. The error is lost when the flow was resumed, the
+        # VPNs of both WAN nodes are then deleted.
+        rolled_back = []
+        if isinstance(result, failure.Failure) and isinstance(
+                result.exception, exception.CoordinatedCommitFailed):
+            rolled_back = result.exception.kwargs.get('rolled_back', [])
+
+        if ns_mgr.obj_east_wan_node.uuid not in rolled_back:
+            ns_mgr.delete_evpn_vpls_over_srv6_be_wan_and_evpn_vxlan_access_vpn(  # noqa
+                dev_mgr=ns_mgr.east_dev_mgr,
+                wan_node=ns_mgr.obj_east_wan_node,
+                access_vpn_vxlan_vni=east_vn_vni,
+                wan_vpn_bd=east_wan_vpn_bd,
+                access_vpn_bd=east_access_vpn_bd
+            )
+        if ns_mgr.obj_west_wan_node.uuid not in rolled_back:
+            ns_mgr.delete_evpn_vpls_over_srv6_be_wan_and_evpn_vxlan_access_vpn(  # noqa
+                dev_mgr=ns_mgr.west_dev_mgr,
+                wan_node=ns_mgr.obj_west_wan_node,
+                access_vpn_vxlan_vni=west_vn_vni,
+                wan_vpn_bd=west_wan_vpn_bd,
+                access_vpn_bd=west_access_vpn_bd
+            )
@@ -0,0 +1,96 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Warm up the connection pools of an API worker when it starts.
+
+Without it, the first slicing requests served by a fresh worker pay for
+the Keystone authentications of the Tungsten Fabric clients and the SSH
+handshakes of the NETCONF sessions of their sites. A Tungsten Fabric client
+is authenticated for every project of the active sites, and a NETCONF
+session opened to every active WAN node, within
+``[connection_pool] warm_up_timeout`` seconds, then kept in the pools, see
+`dci.common.connection_pool`.
+"""
+
+import time
+
+from oslo_log import log
+
+from dci.common import constants
+from dci.common import deadline
+from dci.common.i18n import _LI
+from dci.common.i18n import _LW
+from dci.common import utils
+from dci.conf import CONF
+from dci.device_manager import api as device_api
+from dci import objects
+from dci.sdnc_manager import api as sdnc_api
+
+
+LOG = log.getLogger(__name__)
+
+
+def _warm_up_site(obj_site):
+    sdnc_api.SDNControllerManager(sdnc_conn_ref=obj_site)
+
+
+def _warm_up_wan_node(obj_wan_node):
+    device_api.DeviceManager(
+        device_conn_ref=obj_wan_node).driver_handle.warm_up()
+
+
+def warm_up(context=None):
+    """Fill the connection pools of this process for the active sites and
+    WAN nodes.
+
+    :returns: the number of connections which failed to open.
+    """
+    started_at = time.monotonic()
+    obj_sites = objects.Site.list(context,
+                                  filters={'state': constants.ACTIVE})
+
+    # NOTE: Sites sharing a Tungsten Fabric project share its clients.
+    targets = {}
+    for obj_site in obj_sites:
+        targets.setdefault(
+            ('tf', obj_site.tf_api_server_host, obj_site.tf_api_server_port,
+             obj_site.tf_username, obj_site.os_project_name),
+            (_warm_up_site, obj_site))
+        for obj_wan_node in obj_site.wan_nodes:
+            if obj_wan_node.state == constants.ACTIVE:
+                targets.setdefault(('wan_node', obj_wan_node.uuid),
+                                   (_warm_up_wan_node, obj_wan_node))
+
+    keys = list(targets)
+    with deadline.scope(deadline.Deadline(
+            CONF.connection_pool.warm_up_timeout)):
+        outcomes = utils.concurrent_map(
+            lambda target: target[0](target[1]),
+            [targets[key] for key in keys],
+            CONF.connection_pool.warm_up_concurrency)
+
+    failures = 0
+    for key, (_result, err) in zip(keys, outcomes):
+        if err is not None:
+            failures += 1
+            LOG.warning(_LW("Failed to warm up the connection to %(target)s, "
+                            "details %(err)s"),
+                        {'target': ':'.join(str(part) for part in key),
+                         'err': err})
+
+    LOG.info(_LI("Warmed up %(done)d of %(total)d connections in "
+                 "%(elapsed).1fs"),
+             {'done': len(keys) - failures, 'total': len(keys),
+              'elapsed': time.monotonic() - started_at})
+    return failures
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Benchmark the rendering of the large list responses of the API.
+
+A site collection and a slicing collection of ``--rows`` items, with their
+self links, are rendered with the WSME JSON renderer, with the renderer of
+``dci.api.expose`` in one piece, and in the chunks it streams. The script
+checks that the three renderings decode to the same document, and reports
+their times and sizes.
+
+    python tools/benchmark_json_renderer.py --rows 10000 --repeat 5
+"""
+
+import argparse
+import json
+import statistics
+import time
+import uuid
+
+import wsme.rest.json
+from wsme import types as wtypes
+
+from dci.api.controllers import link
+from dci.api.controllers.v1 import evpn_vpls_over_srv6_be_slicings
+from dci.api.controllers.v1 import sites
+from dci.api import expose
+
+
+PUBLIC_URL = 'http://dci-controller:6699'
+
+
+def _link(resource, resource_uuid):
+    return [link.Link(href='%s/v1/%s/%s' % (PUBLIC_URL, resource,
+                                            resource_uuid),
+                      rel='self')]
+
+
+def make_sites(rows):
+    collection = sites.SiteCollection()
+    collection.sites = []
+    for index in range(rows):
+        site_uuid = str(uuid.uuid4())
+        site = sites.Site(
+            uuid=site_uuid, name='site-%d' % index,
+            tf_api_server_host='10.0.%d.%d' % (index // 256, index % 256),
+            tf_api_server_port=8082, tf_username='admin',
+            tf_password='secret', os_project_name='admin', state='active',
+            wan_nodes=[{'uuid': str(uuid.uuid4()), 'name': 'pe-%d' % index,
+                        'vendor': 'huawei', 'netconf_host': '192.0.2.1',
+                        'netconf_port': 830, 'roles': ['pe'],
+                        'state': 'active'}])
+        site.links = _link('sites', site_uuid)
+        collection.sites.append(site)
+    return collection
+
+
+def make_slicings(rows):
+    module = evpn_vpls_over_srv6_be_slicings
+    collection = module.EVPNVPLSoSRv6BESlicingCollection()
+    collection.evpn_vpls_over_srv6_be_slicings = []
+    for index in range(rows):
+        slicing_uuid = str(uuid.uuid4())
+        subnet = '10.%d.%d' % (index // 256, index % 256)
+        slicing = module.EVPNVPLSoSRv6BESlicing(
+            uuid=slicing_uuid, name='slicing-%d' % index,
+            subnet_cidr=subnet + '.0/24', state='active',
+            east_site_uuid=str(uuid.uuid4()),
+            east_dcn_vn_subnet_allocation_pool=subnet + '.2-' + subnet +
+            '.127',
+            west_site_uuid=str(uuid.uuid4()),
+            west_dcn_vn_subnet_allocation_pool=subnet + '.128-' + subnet +
+            '.254')
+        slicing.links = _link('evpn_vpls_over_srv6_be_slicings',
+                              slicing_uuid)
+        collection.evpn_vpls_over_srv6_be_slicings.append(slicing)
+    return collection
+
+
+def render_wsme(datatype, value):
+    return wsme.rest.json.encode_result(value, datatype).encode('utf-8')
+
+
+def render_fast(datatype, value):
+    return expose.dumps(expose.converter(datatype)(value))
+
+
+def render_streamed(datatype, value):
+    return b''.join(expose.iter_collection(datatype, value, 1))
+
+
+RENDERERS = (('wsme', render_wsme),
+             ('fast', render_fast),
+             ('streamed', render_streamed))
+
+
+def measure(render, datatype, value, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = render(datatype, value)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples, body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000,
+                        help='Number of items per collection.')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Number of renderings per renderer.')
+    args = parser.parse_args()
+
+    collections = (
+        ('sites', sites.SiteCollection, make_sites(args.rows)),
+        ('slicings',
+         evpn_vpls_over_srv6_be_slicings.EVPNVPLSoSRv6BESlicingCollection,
+         make_slicings(args.rows)),
+    )
+    print('orjson: %s' % ('yes' if expose.orjson is not None else 'no'))
+    print('%-10s %-10s %10s %10s %10s %10s' % ('collection', 'renderer',
+                                               'min (ms)', 'median', 'max',
+                                               'size (KB)'))
+    for name, datatype, value in collections:
+        # NOTE: Resolves the types of the attributes, as exposing a
+        # controller returning the collection does.
+        wtypes.registry.register(datatype)
+        documents = []
+        for renderer, render in RENDERERS:
+            samples, body = measure(render, datatype, value, args.repeat)
+            documents.append(json.loads(body))
+            print('%-10s %-10s %10.1f %10.1f %10.1f %10.1f' % (
+                name, renderer, min(samples), statistics.median(samples),
+                max(samples), len(body) / 1024.0))
+        if any(document != documents[0] for document in documents[1:]):
+            raise SystemExit('The renderings of the %s differ' % name)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Benchmark the start time of the dci-controller-api workers.
+
+Every target is imported in a fresh interpreter, the way a worker spawned
+or restarted by the ProcessLauncher or Apache mod_wsgi imports it. The
+script reports the import time of each target and the heavy driver and
+SDN controller stacks it pulled in, which should only be loaded by the
+first request that needs them.
+
+    python tools/benchmark_startup.py --repeat 10
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+
+TARGETS = {
+    # The console script, before it forks the API workers.
+    'dci-api': 'dci.cmd.api',
+    # The entry point of Apache mod_wsgi.
+    'wsgi_app': 'dci.api.wsgi_app',
+    # The controllers loaded by every worker when it builds the app.
+    'controllers': 'dci.api.controllers.root',
+}
+
+HEAVY_MODULES = ('vnc_api', 'ncclient', 'paramiko', 'lxml', 'jinja2',
+                 'xmltodict', 'taskflow')
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import %(module)s
+elapsed = time.perf_counter() - start
+print(json.dumps({'elapsed': elapsed,
+                  'heavy': sorted(m for m in %(heavy)r if m in sys.modules)}))
+"""
+
+
+def measure(module):
+    probe = _PROBE % {'module': module, 'heavy': HEAVY_MODULES}
+    output = subprocess.check_output([sys.executable, '-c', probe])
+    return json.loads(output.decode('utf-8').splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Number of fresh interpreters per target.')
+    parser.add_argument('targets', nargs='*',
+                        help='Targets to benchmark among %s, by default all '
+                             'of them.' % ', '.join(sorted(TARGETS)))
+    args = parser.parse_args()
+    unknown = set(args.targets) - set(TARGETS)
+    if unknown:
+        parser.error('unknown targets %s' % ', '.join(sorted(unknown)))
+
+    print('%-12s %10s %10s %10s  %s' % ('target', 'min (ms)', 'median',
+                                        'max', 'heavy modules loaded'))
+    for target in args.targets or sorted(TARGETS):
+        samples = [measure(TARGETS[target]) for _ in range(args.repeat)]
+        elapsed = [sample['elapsed'] * 1000 for sample in samples]
+        print('%-12s %10.1f %10.1f %10.1f  %s' % (
+            target, min(elapsed), statistics.median(elapsed), max(elapsed),
+            ', '.join(samples[-1]['heavy']) or '-'))
+
+
+if __name__ == '__main__':
+    main()